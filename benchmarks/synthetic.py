@@ -0,0 +1,42 @@
+import random
+import shutil
+
+import numpy as np
+import pytest
+from pydub import AudioSegment  # type: ignore
+
+SAMPLE_RATE = 16000
+WORDS = (
+    "the model returned a transcript of the meeting and we reviewed every action item before the next call "
+    "audio quality was fine although some speakers overlapped near the end of the recording"
+).split()
+
+requires_ffmpeg = pytest.mark.skipif(
+    shutil.which("ffmpeg") is None and shutil.which("avconv") is None,
+    reason="MP3 export needs ffmpeg or avconv",
+)
+
+
+def make_audio(seconds: float) -> AudioSegment:
+    """Mono 16 kHz 16-bit noise, the format Whisper uploads are usually converted to."""
+    rng = np.random.default_rng(0)
+    samples = rng.integers(-3000, 3000, int(seconds * SAMPLE_RATE), dtype=np.int16)
+    return AudioSegment(data=samples.tobytes(), sample_width=2, frame_rate=SAMPLE_RATE, channels=1)
+
+
+def make_transcript(characters: int, seed: int = 0) -> str:
+    """Speech-like text of roughly the given length."""
+    rng = random.Random(seed)  # noqa: S311
+    words: list[str] = []
+    length = 0
+    while length < characters:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:characters]
+
+
+def make_chunk_transcripts(chunks: int, chunk_characters: int, overlap_characters: int) -> list[str]:
+    """Transcripts of consecutive chunks whose ends overlap, as voice_to_text produces them."""
+    text = make_transcript(chunks * chunk_characters + overlap_characters)
+    return [text[i * chunk_characters : (i + 1) * chunk_characters + overlap_characters] for i in range(chunks)]
@@ -0,0 +1,51 @@
+"""Cost of decoding audio into chunks and encoding them for upload."""
+
+import io
+
+import pytest
+
+from base.audio_stream import SilencePolicy, iter_audio_chunks, iter_silence_chunks
+from benchmarks.synthetic import make_audio, requires_ffmpeg
+from openai_backend.openai_audio_backend import OpenAIAudioBackend
+
+MINUTES = [1, 10, 60]
+
+
+@pytest.fixture(scope="module")
+def backend():
+    return OpenAIAudioBackend(api_key="sk-benchmark")
+
+
+@pytest.mark.parametrize("minutes", MINUTES)
+def test_stream_wav_chunks(benchmark, minutes):
+    buffer = io.BytesIO()
+    make_audio(minutes * 60).export(buffer, format="wav")
+
+    def decode():
+        buffer.seek(0)
+        return sum(1 for _ in iter_audio_chunks(buffer, 600000, 5000))
+
+    assert benchmark(decode) == -(-minutes * 60000 // 595000)
+
+
+@pytest.mark.parametrize("minutes", MINUTES)
+def test_stream_silence_chunks(benchmark, minutes):
+    buffer = io.BytesIO()
+    make_audio(minutes * 60).export(buffer, format="wav")
+
+    def decode():
+        buffer.seek(0)
+        return [chunk.end for chunk in iter_silence_chunks(buffer, 600000, SilencePolicy())]
+
+    # Synthetic noise has no silences, so every cut falls back to the quietest point near the chunk end.
+    assert benchmark(decode)[-1] == minutes * 60000
+
+
+@requires_ffmpeg
+@pytest.mark.parametrize("seconds", [10, 60, 600])
+def test_export_chunk(benchmark, backend, seconds):
+    chunk = make_audio(seconds)
+
+    buffer = benchmark.pedantic(backend._export_chunk, args=(chunk,), rounds=3, iterations=1)
+
+    assert buffer.getbuffer().nbytes > 0
@@ -0,0 +1,68 @@
+"""Per-call cost of merging service defaults with request arguments."""
+
+import pytest
+
+from base.ai_base import ConfigManager, _merge_nested
+
+SIZES = [10, 100, 1000]
+
+
+def make_manager(keys: int) -> ConfigManager:
+    config_manager = ConfigManager()
+    config_manager.config = {
+        "chat": {
+            "model": "gpt-4o",
+            "temperature": 0.7,
+            "options": {f"option_{i}": {"enabled": True, "weight": i} for i in range(keys)},
+            **{f"setting_{i}": i for i in range(keys)},
+        }
+    }
+    return config_manager
+
+
+@pytest.mark.parametrize("keys", SIZES)
+def test_combine_config_defaults(benchmark, keys):
+    config_manager = make_manager(keys)
+
+    result = benchmark(config_manager.combine_config, "chat")
+
+    assert result["model"] == "gpt-4o"
+
+
+@pytest.mark.parametrize("keys", SIZES)
+def test_combine_config_repeated_kwargs(benchmark, keys):
+    config_manager = make_manager(keys)
+
+    result = benchmark(config_manager.combine_config, "chat", model="gpt-4o-mini", temperature=0.2)
+
+    assert result["model"] == "gpt-4o-mini"
+
+
+@pytest.mark.parametrize("keys", SIZES)
+def test_combine_config_uncacheable_kwargs(benchmark, keys):
+    config_manager = make_manager(keys)
+    # A set cannot be keyed, so every call merges from scratch.
+    stop = {"\n\n"}
+
+    result = benchmark(config_manager.combine_config, "chat", stop=stop)
+
+    assert result["stop"] == stop
+
+
+@pytest.mark.parametrize("keys", SIZES)
+def test_merge_nested(benchmark, keys):
+    defaults = make_manager(keys).combine_config("chat")
+    updates = {"options": {f"option_{i}": {"weight": -i} for i in range(0, keys, 2)}, "temperature": 0.0}
+
+    result = benchmark(_merge_nested, defaults, updates)
+
+    assert result["options"]["option_0"] == {"enabled": True, "weight": 0}
+
+
+@pytest.mark.parametrize("keys", SIZES)
+def test_update_config(benchmark, keys):
+    config_manager = make_manager(keys)
+
+    benchmark(config_manager.update_config, chat={"temperature": 0.1})
+
+    assert config_manager.get_config("chat")["temperature"] == 0.1
@@ -0,0 +1,54 @@
+"""Cost of finding where consecutive chunk transcripts overlap."""
+
+import pytest
+
+from base.transcript_stitching import ChunkTranscript, TimedText, stitch_chunks
+from benchmarks.synthetic import make_chunk_transcripts, make_transcript
+from openai_backend.openai_audio_backend import OpenAIAudioBackend
+
+# About 900 characters are spoken per minute, so a ten minute chunk transcribes to roughly 9000 characters.
+CHUNK_CHARACTERS = 9000
+# The character overlap voice_to_text derives from its default 5000 ms audio overlap.
+OVERLAP_CHARACTERS = 400
+
+
+@pytest.fixture(scope="module")
+def backend():
+    return OpenAIAudioBackend(api_key="sk-benchmark")
+
+
+@pytest.mark.parametrize("overlap", [100, 200, 400, 800])
+def test_find_best_overlap(benchmark, backend, overlap):
+    text = make_transcript(CHUNK_CHARACTERS + overlap)
+    stitched_text, current_text = text[:CHUNK_CHARACTERS], text[CHUNK_CHARACTERS - overlap :]
+
+    index = benchmark.pedantic(
+        backend.find_best_overlap, args=(stitched_text, current_text, overlap), rounds=3, iterations=1
+    )
+
+    assert index != -1
+
+
+@pytest.mark.parametrize("hours", [0.5, 1])
+def test_stitch_transcriptions(benchmark, backend, hours):
+    transcriptions = make_chunk_transcripts(int(hours * 6), CHUNK_CHARACTERS, OVERLAP_CHARACTERS)
+
+    stitched = benchmark.pedantic(
+        backend.stitch_transcriptions, args=(transcriptions, OVERLAP_CHARACTERS), rounds=3, iterations=1
+    )
+
+    assert len(stitched) >= CHUNK_CHARACTERS
+
+
+@pytest.mark.parametrize("hours", [0.5, 1])
+def test_stitch_chunks_by_time(benchmark, hours):
+    # Ten minute chunks overlapping by ten seconds, with a timed segment about every five seconds.
+    transcripts = []
+    for index, text in enumerate(make_chunk_transcripts(int(hours * 6), CHUNK_CHARACTERS, OVERLAP_CHARACTERS)):
+        pieces = [text[i : i + 75] for i in range(0, len(text), 75)]
+        segments = [TimedText(i * 5.0, (i + 1) * 5.0, piece) for i, piece in enumerate(pieces)]
+        transcripts.append(ChunkTranscript(text, index * 595.0, 605.0, segments=segments))
+
+    stitched = benchmark.pedantic(stitch_chunks, args=(transcripts,), rounds=3, iterations=1)
+
+    assert len(stitched) >= CHUNK_CHARACTERS
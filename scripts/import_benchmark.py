@@ -0,0 +1,60 @@
+"""Time a text-only start of ai_backend in fresh interpreters and report which heavy dependencies it loads."""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+HEAVY_MODULES = ["openai", "numpy", "pydub", "openai_backend.openai_audio_backend"]
+# The audio backend and pydub, which only the audio backend needs.
+AUDIO_MODULES = ["pydub", "openai_backend.openai_audio_backend"]
+
+CHILD = """
+import json, sys, time
+started_at = time.perf_counter()
+from ai_backend import TextAI
+imported_at = time.perf_counter()
+TextAI(api_key="sk-import-benchmark")
+ready_at = time.perf_counter()
+print(json.dumps({
+    "import": imported_at - started_at,
+    "ready": ready_at - started_at,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+"""
+
+
+def run_once() -> dict:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [SRC_DIR, os.environ.get("PYTHONPATH")]))}
+    output = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", CHILD % HEAVY_MODULES], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10, help="number of fresh interpreters to time")
+    args = parser.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    import_ms = statistics.median(result["import"] for result in results) * 1000
+    ready_ms = statistics.median(result["ready"] for result in results) * 1000
+    loaded = results[-1]["loaded"]
+
+    print(f"import ai_backend:          {import_ms:8.1f} ms (median of {args.runs})")
+    print(f"import + TextAI() ready:    {ready_ms:8.1f} ms (median of {args.runs})")
+    print(f"heavy modules loaded:       {', '.join(loaded) or 'none'}")
+
+    audio_loaded = [name for name in AUDIO_MODULES if name in loaded]
+    if audio_loaded:
+        print(f"FAIL: a text-only start imported {', '.join(audio_loaded)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
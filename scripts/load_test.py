@@ -0,0 +1,142 @@
+"""Drive TextAI, ImageAI and AudioAI against the local fake OpenAI server and report throughput and latency."""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from ai_backend import AudioAI, ImageAI, MetricsAggregator, TextAI
+from base.fake_openai_server import FakeOpenAIServer, FakeServerSettings, Latency
+from base.metrics import metrics
+
+CAPABILITIES = ["chat", "stream", "embedding", "image", "speech", "transcription"]
+MESSAGES = [{"role": "system", "content": "You are terse."}, {"role": "user", "content": "Summarize the plan."}]
+
+
+def build_call(capability: str, base_url: str) -> Callable[[], Any]:
+    if capability in ("chat", "stream", "embedding"):
+        text_ai = TextAI(api_key="sk-load-test", base_url=base_url)
+        if capability == "chat":
+            return lambda: text_ai.text_chat(MESSAGES)
+        if capability == "stream":
+
+            def stream() -> Any:
+                chat_stream = text_ai.text_chat_stream(MESSAGES)
+                return None if chat_stream is None else "".join(chat_stream)
+
+            return stream
+        return lambda: text_ai.generate_embedding("The quick brown fox jumps over the lazy dog.")
+    if capability == "image":
+        image_ai = ImageAI(api_key="sk-load-test", base_url=base_url)
+        return lambda: image_ai.generate_image("A lighthouse at dusk")
+    audio_ai = AudioAI(api_key="sk-load-test", base_url=base_url)
+    if capability == "speech":
+        return lambda: audio_ai.backend.text_to_speech("Your order has shipped.")
+
+    from pydub import AudioSegment  # noqa: PLC0415
+
+    buffer = AudioSegment.silent(duration=30000, frame_rate=16000).export(format="wav")
+    audio = buffer.read()
+    return lambda: audio_ai.voice_to_text(audio)
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))]
+
+
+def run(call: Callable[[], Any], requests: int, concurrency: int) -> dict[str, Any]:
+    def timed(_: int) -> tuple[float, bool]:
+        started_at = time.perf_counter()
+        try:
+            ok = call() is not None
+        except Exception:
+            ok = False
+        return time.perf_counter() - started_at, ok
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, range(requests)))
+    elapsed = time.perf_counter() - started_at
+
+    latencies = sorted(latency for latency, _ in results)
+    failed = sum(not ok for _, ok in results)
+    return {
+        "requests": requests,
+        "failed": failed,
+        "seconds": elapsed,
+        "throughput": requests / elapsed,
+        **{f"p{p}_ms": percentile(latencies, p) * 1000 for p in (50, 90, 99)},
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("capabilities", nargs="*", choices=CAPABILITIES, default=["chat"], help="what to load")
+    parser.add_argument("--requests", type=int, default=200, help="requests per capability")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight at once")
+    parser.add_argument("--latency", type=float, default=0.05, help="median server latency in seconds")
+    parser.add_argument("--sigma", type=float, default=0.5, help="spread of the lognormal latency tail")
+    parser.add_argument("--stream-interval", type=float, default=0.0, help="seconds between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failing with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of requests rejected with a 429")
+    parser.add_argument("--retry-after", type=float, default=0.1, help="retry-after seconds sent with 429s")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible latencies and errors")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="show the backends' error logs")
+    args = parser.parse_args()
+    if not args.verbose:
+        # Injected failures are expected; one log line per failed request would bury the report.
+        logging.disable(logging.CRITICAL)
+
+    settings = FakeServerSettings(
+        latency=Latency(args.latency, args.sigma),
+        stream_interval=args.stream_interval,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    aggregator = MetricsAggregator()
+    metrics.add_hook(aggregator)
+
+    results: dict[str, Any] = {}
+    with FakeOpenAIServer(settings) as server:
+        for capability in args.capabilities:
+            if capability == "transcription" and shutil.which("ffmpeg") is None:
+                print("skipping transcription: ffmpeg is not installed", file=sys.stderr)
+                continue
+            results[capability] = run(build_call(capability, server.base_url), args.requests, args.concurrency)
+    metrics.remove_hook(aggregator)
+
+    if args.json:
+        print(json.dumps({"results": results, "provider_calls": aggregator.summary()}, indent=2))
+        return 0
+
+    columns = ("requests", "failed", "req/s", "p50 ms", "p90 ms", "p99 ms", "max ms")
+    print(f"{'capability':<14}" + "".join(f"{column:>9}" for column in columns))
+    for capability, result in results.items():
+        print(
+            f"{capability:<14}{result['requests']:>9}{result['failed']:>8}{result['throughput']:>9.1f}"
+            f"{result['p50_ms']:>9.1f}{result['p90_ms']:>9.1f}{result['p99_ms']:>9.1f}{result['max_ms']:>9.1f}"
+        )
+    # The SDK retries 429s and 5xx inside a call, so injected failures show up as latency rather than errors here.
+    print("\nbackend calls:")
+    for labels, summary in aggregator.summary().items():
+        print(
+            f"  {labels:<40} calls={summary['calls']:<6} errors={summary['errors']:<6} p95<={summary['latency_p95']}s"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
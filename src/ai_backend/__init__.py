@@ -4,6 +4,56 @@ __author__ = """Jason"""
 __email__ = "na"
 __version__ = "0.1.0"
 
-from .api import AudioAI, ImageAI, TextAI
+import importlib
+from typing import Any
 
-__all__ = ["TextAI", "ImageAI", "AudioAI"]
+from .api import AsyncAudioAI, AsyncImageAI, AsyncTextAI, AudioAI, ImageAI, TextAI
+
+# Helpers that pull in numpy or the provider SDKs are imported on first access.
+_lazy_exports = {
+    "ResponseCache": "base.response_cache",
+    "EmbeddingStore": "base.embedding_store",
+    "VectorIndex": "base.vector_index",
+    "RequestPolicy": "base.request_policy",
+    "MetricsAggregator": "base.metrics",
+    "TokenCounter": "base.token_counter",
+    "TrimPolicy": "base.token_counter",
+    "SingleFlight": "base.single_flight",
+    "Target": "base.target_pool",
+    "ModelRouter": "base.model_router",
+    "JsonStreamParser": "base.json_stream",
+    "TargetPool": "base.target_pool",
+    "SilencePolicy": "base.audio_stream",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _lazy_exports:
+        value = getattr(importlib.import_module(_lazy_exports[name]), name)
+        globals()[name] = value
+        return value
+    error_message = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(error_message)
+
+
+__all__ = [
+    "TextAI",
+    "ImageAI",
+    "AudioAI",
+    "AsyncTextAI",
+    "AsyncImageAI",
+    "AsyncAudioAI",
+    "ResponseCache",
+    "EmbeddingStore",
+    "VectorIndex",
+    "RequestPolicy",
+    "MetricsAggregator",
+    "TokenCounter",
+    "TrimPolicy",
+    "SingleFlight",
+    "Target",
+    "TargetPool",
+    "ModelRouter",
+    "JsonStreamParser",
+    "SilencePolicy",
+]
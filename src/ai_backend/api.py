@@ -1,8 +1,19 @@
-import io
-from typing import Any, Optional, Union
+from collections.abc import Iterable, Sequence
+from typing import TYPE_CHECKING, Any, Optional, Union
 
 from ai_backend.backend_manager import BackendManager
 
+if TYPE_CHECKING:
+    # Only needed for annotations; importing them eagerly would load numpy and openai on `import ai_backend`.
+    from base.audio_stream import AudioSource, SilencePolicy
+    from base.embedding_store import EmbeddingStore
+    from base.model_router import ModelRouter
+    from base.request_policy import RequestPolicy
+    from base.response_cache import ResponseCache
+    from base.single_flight import SingleFlight
+    from base.target_pool import Target, TargetPool
+    from base.token_counter import TrimPolicy
+
 
 class TextAI:
     def __init__(self, backend: Optional[str] = None, api_key: Optional[str] = None, **kwargs: dict[str, Any]) -> None:
@@ -19,7 +30,7 @@ class TextAI:
         self.backend_manager = BackendManager()
         self.backend_type = "text"
 
-        self.backend, self.backend_name = self.set_backend(backend, api_key, **kwargs)
+        self.set_backend(backend, api_key, **kwargs)
 
     def text_chat(self, messages: list, **kwargs: dict[str, Any]) -> Any:
         """Send messages to the backend for text-based chatting.
@@ -33,9 +44,248 @@ class TextAI:
         """
         return self.backend.text_chat(messages, **kwargs)
 
+    def text_chat_stream(self, messages: list, **kwargs: Any) -> Any:
+        """Send messages to the backend for text-based chatting and stream the reply.
+
+        Args:
+            messages (list): A list of messages for the chat.
+            **kwargs (dict[str, Any]): Additional keyword arguments specific to the backend's chat function.
+
+        Returns:
+            Any: An iterator of content deltas. Once exhausted it exposes the assembled message,
+                usage and time-to-first-token metrics.
+        """
+        return self.backend.text_chat_stream(messages, **kwargs)
+
+    def text_chat_structured(
+        self, messages: list, schema: Optional[dict[str, Any]] = None, item_path: Sequence[Any] = ("*",), **kwargs: Any
+    ) -> Any:
+        """Ask for a JSON reply and yield its values as soon as each one is complete.
+
+        Args:
+            messages (list): A list of messages for the chat.
+            schema (Optional[dict[str, Any]]): The JSON schema of the reply, or None for JSON mode.
+            item_path (Sequence[Any]): The values to yield, where "*" matches any key or index,
+                such as ("records", "*") for each element of a "records" array.
+            **kwargs (dict[str, Any]): Additional keyword arguments specific to the backend's chat function.
+
+        Returns:
+            Any: An iterator of events carrying each value and its path, validated against the schema.
+                Once exhausted it exposes the whole document as `value`.
+        """
+        return self.backend.text_chat_structured(messages, schema, item_path, **kwargs)
+
+    def generate_embedding(self, messages: list, **kwargs: Any) -> Any:
+        """Generate an embedding for the provided messages.
+
+        Args:
+            messages (list): The input to embed.
+            **kwargs (dict[str, Any]): Additional keyword arguments specific to the backend's embedding function.
+
+        Returns:
+            Any: The embedding from the backend.
+        """
+        return self.backend.generate_embedding(messages, **kwargs)
+
+    def generate_embeddings(self, texts: Sequence[str], **kwargs: Any) -> Any:
+        """Embed any number of texts in concurrent, size-limited sub-batches.
+
+        Args:
+            texts (Sequence[str]): The texts to embed.
+            **kwargs (dict[str, Any]): Batching options and additional keyword arguments for the backend.
+
+        Returns:
+            Any: A float32 matrix with one row per text, in input order.
+        """
+        return self.backend.generate_embeddings(texts, **kwargs)
+
+    def text_chat_batch(
+        self,
+        messages_list: Iterable[list],
+        item_kwargs: Optional[Iterable[dict[str, Any]]] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Run many chats through the provider's asynchronous batch endpoint and wait for the results.
+
+        Args:
+            messages_list (Iterable[list]): The message lists to send.
+            item_kwargs (Optional[Iterable[dict[str, Any]]]): Per-item keyword arguments, aligned with messages_list.
+            **kwargs (dict[str, Any]): Polling options and keyword arguments shared by every item.
+
+        Returns:
+            Any: One result per message list, in input order, with per-item errors captured.
+        """
+        return self.backend.text_chat_batch(messages_list, item_kwargs, **kwargs)
+
+    def generate_embedding_batch(self, texts: Sequence[str], **kwargs: Any) -> Any:
+        """Embed many texts through the provider's asynchronous batch endpoint and wait for the results.
+
+        Args:
+            texts (Sequence[str]): The texts to embed.
+            **kwargs (dict[str, Any]): Polling options and additional keyword arguments for the backend.
+
+        Returns:
+            Any: One embedding per text, in input order, with per-item errors captured.
+        """
+        return self.backend.generate_embedding_batch(texts, **kwargs)
+
+    def set_embedding_store(self, store: Optional["EmbeddingStore"]) -> None:
+        """Reuse embeddings already computed with the same model instead of requesting them again.
+
+        Args:
+            store (Optional["EmbeddingStore"]): The store to read from and append to, or None to disable it.
+        """
+        self.backend.set_embedding_store(store)
+
+    def set_cache(self, cache: Optional["ResponseCache"], *, force: bool = False) -> None:
+        """Cache text_chat responses by exact match on the messages and the merged configuration.
+
+        Args:
+            cache (Optional["ResponseCache"]): The cache to use, or None to disable caching.
+            force (bool): Cache responses even when the sampling temperature is above zero.
+        """
+        self.backend.set_cache(cache, force=force)
+
+    def set_model_router(self, router: Optional["ModelRouter"]) -> None:
+        """Send each text_chat call that does not name a model to the fastest healthy model of a router.
+
+        Pass `latency_slo=<seconds>` to text_chat to prefer the first model expected to answer within it,
+        falling back to faster models when it does not.
+
+        Args:
+            router (Optional["ModelRouter"]): The router to use, or None to use the configured model.
+        """
+        self.backend.set_model_router(router)
+
+    def set_request_policy(self, policy: Optional["RequestPolicy"]) -> None:
+        """Retry, time out and hedge text_chat requests according to a policy.
+
+        Args:
+            policy (Optional["RequestPolicy"]): The policy to use, or None for a single attempt per call.
+        """
+        self.backend.set_request_policy(policy)
+
+    def set_single_flight(self, single_flight: Optional["SingleFlight"]) -> None:
+        """Share one request between concurrent identical text_chat and generate_embedding calls.
+
+        Args:
+            single_flight (Optional["SingleFlight"]): Coalesces the calls and counts how many were shared,
+                or None to send every call.
+        """
+        self.backend.set_single_flight(single_flight)
+
+    def set_trim_policy(self, policy: Optional["TrimPolicy"]) -> None:
+        """Trim messages to fit the model's context window before they are sent.
+
+        Args:
+            policy (Optional["TrimPolicy"]): The policy to use, or None to send messages unchanged.
+        """
+        self.backend.set_trim_policy(policy)
+
+    def count_tokens(self, messages: list, **kwargs: Any) -> Any:
+        """Count the prompt tokens of messages for the configured chat model.
+
+        Args:
+            messages (list): The messages to count.
+            **kwargs (dict[str, Any]): Configuration overrides, such as the model.
+
+        Returns:
+            Any: The number of prompt tokens.
+        """
+        return self.backend.count_tokens(messages, **kwargs)
+
+    def text_chat_many(
+        self,
+        messages_list: Iterable[list],
+        item_kwargs: Optional[Iterable[dict[str, Any]]] = None,
+        max_concurrency: int = 8,
+        **kwargs: Any,
+    ) -> Any:
+        """Send many message lists to the backend concurrently.
+
+        Args:
+            messages_list (Iterable[list]): The message lists to send.
+            item_kwargs (Optional[Iterable[dict[str, Any]]]): Per-item keyword arguments, aligned with messages_list.
+            max_concurrency (int): The maximum number of requests in flight.
+            **kwargs (dict[str, Any]): Keyword arguments shared by every item.
+
+        Returns:
+            list[BatchResult]: One result per message list, in input order, with per-item errors captured.
+        """
+        return self.backend.text_chat_many(messages_list, item_kwargs, max_concurrency=max_concurrency, **kwargs)
+
+    def text_chat_many_as_completed(
+        self,
+        messages_list: Iterable[list],
+        item_kwargs: Optional[Iterable[dict[str, Any]]] = None,
+        max_concurrency: int = 8,
+        **kwargs: Any,
+    ) -> Any:
+        """Send many message lists to the backend concurrently and yield results as they complete.
+
+        Args:
+            messages_list (Iterable[list]): The message lists to send.
+            item_kwargs (Optional[Iterable[dict[str, Any]]]): Per-item keyword arguments, aligned with messages_list.
+            max_concurrency (int): The maximum number of requests in flight.
+            **kwargs (dict[str, Any]): Keyword arguments shared by every item.
+
+        Returns:
+            Iterator[BatchResult]: Results in completion order; `index` identifies the input item.
+        """
+        return self.backend.text_chat_many_as_completed(
+            messages_list, item_kwargs, max_concurrency=max_concurrency, **kwargs
+        )
+
+    def set_rate_limit(
+        self, model: str, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None
+    ) -> Any:
+        """Queue requests locally to stay within the provider's per-minute limits for a model.
+
+        Limits are shared by every backend in the process that uses the same API key.
+
+        Args:
+            model (str): The model the limits apply to.
+            requests_per_minute (Optional[float]): The request limit. None leaves requests unlimited.
+            tokens_per_minute (Optional[float]): The token limit. None leaves tokens unlimited.
+        """
+        return self.backend.set_rate_limit(model, requests_per_minute, tokens_per_minute)
+
+    def set_targets(
+        self, targets: Optional[Union["TargetPool", Sequence[Union["Target", tuple[str, Optional[str]]]]]]
+    ) -> Any:
+        """Spread requests across several API keys and endpoints.
+
+        Each request goes to the target with the fewest requests in flight; targets answering with 429s or
+        5xx errors are ejected for a while and probed again later.
+
+        Args:
+            targets: A TargetPool, Target or (api_key, base_url) pairs, or None to use the backend's own key again.
+
+        Returns:
+            Optional[TargetPool]: The pool in use.
+        """
+        return self.backend.set_targets(targets)
+
+    def target_stats(self) -> Any:
+        """Per-target request counts and ejection state, keyed by target label."""
+        return self.backend.target_stats()
+
+    def warm_up(self, connections: int = 1) -> Any:
+        """Open connections to the provider before the first request.
+
+        Clients and their connection pools are shared by every backend using the same API key and base URL.
+
+        Args:
+            connections (int): The number of connections to open concurrently.
+
+        Returns:
+            int: The number of connections that were opened successfully.
+        """
+        return self.backend.warm_up(connections)
+
     def set_backend(
         self, backend: Optional[str] = None, api_key: Optional[str] = None, **kwargs: dict[str, Any]
-    ) -> Any:
+    ) -> None:
         """Set the backend to be used for text-based AI operations.
 
         Args:
@@ -43,7 +293,9 @@ class TextAI:
             api_key (str): The API key for the backend.
             **kwargs (dict[str, Any]): Additional keyword arguments specific to the backend.
         """
-        backend_class, backend_name = self.backend_manager.set_backend(self.backend_type, backend, api_key, **kwargs)
+        self.backend, self.backend_name = self.backend_manager.set_backend(
+            self.backend_type, backend, api_key, **kwargs
+        )
 
 
 class ImageAI:
@@ -75,6 +327,53 @@ class ImageAI:
         """
         return self.backend.generate_image(prompt, **kwargs)
 
+    def set_rate_limit(
+        self, model: str, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None
+    ) -> Any:
+        """Queue requests locally to stay within the provider's per-minute limits for a model.
+
+        Limits are shared by every backend in the process that uses the same API key.
+
+        Args:
+            model (str): The model the limits apply to.
+            requests_per_minute (Optional[float]): The request limit. None leaves requests unlimited.
+            tokens_per_minute (Optional[float]): The token limit. None leaves tokens unlimited.
+        """
+        return self.backend.set_rate_limit(model, requests_per_minute, tokens_per_minute)
+
+    def set_targets(
+        self, targets: Optional[Union["TargetPool", Sequence[Union["Target", tuple[str, Optional[str]]]]]]
+    ) -> Any:
+        """Spread requests across several API keys and endpoints.
+
+        Each request goes to the target with the fewest requests in flight; targets answering with 429s or
+        5xx errors are ejected for a while and probed again later.
+
+        Args:
+            targets: A TargetPool, Target or (api_key, base_url) pairs, or None to use the backend's own key again.
+
+        Returns:
+            Optional[TargetPool]: The pool in use.
+        """
+        return self.backend.set_targets(targets)
+
+    def target_stats(self) -> Any:
+        """Per-target request counts and ejection state, keyed by target label."""
+        return self.backend.target_stats()
+
+    def warm_up(self, connections: int = 1) -> Any:
+        """Open connections to the provider before the first request.
+
+        Clients and their connection pools are shared by every backend using the same API key and base URL.
+
+        Args:
+            connections (int): The number of connections to open concurrently.
+
+        Returns:
+            int: The number of connections that were opened successfully.
+        """
+        return self.backend.warm_up(connections)
+
     def set_backend(
         self, backend: Optional[str] = None, api_key: Optional[str] = None, **kwargs: dict[str, Any]
     ) -> None:
@@ -109,13 +408,13 @@ class AudioAI:
 
     def voice_to_text(
         self,
-        audio_input: Union[bytes, io.BufferedReader],
+        audio_input: "AudioSource",
         **kwargs: Any,
     ) -> Any:
         """Convert voice messages to text using the backend's capabilities.
 
         Args:
-            messages (list): Audio files or streams to be converted.
+            audio_input (AudioSource): Audio bytes, a file path, a binary file object or a memory map.
             **kwargs (dict[str, Any]): Additional parameters for the backend's voice-to-text function.
 
         Returns:
@@ -123,6 +422,266 @@ class AudioAI:
         """
         return self.backend.voice_to_text(audio_input, **kwargs)
 
+    def set_rate_limit(
+        self, model: str, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None
+    ) -> Any:
+        """Queue requests locally to stay within the provider's per-minute limits for a model.
+
+        Limits are shared by every backend in the process that uses the same API key.
+
+        Args:
+            model (str): The model the limits apply to.
+            requests_per_minute (Optional[float]): The request limit. None leaves requests unlimited.
+            tokens_per_minute (Optional[float]): The token limit. None leaves tokens unlimited.
+        """
+        return self.backend.set_rate_limit(model, requests_per_minute, tokens_per_minute)
+
+    def set_silence_policy(self, policy: Optional["SilencePolicy"]) -> None:
+        """Cut audio into chunks at silences, so chunks need not overlap and long silences can be trimmed.
+
+        Args:
+            policy (Optional[SilencePolicy]): The policy to use, or None for fixed-length overlapping chunks.
+        """
+        self.backend.set_silence_policy(policy)
+
+    def set_targets(
+        self, targets: Optional[Union["TargetPool", Sequence[Union["Target", tuple[str, Optional[str]]]]]]
+    ) -> Any:
+        """Spread requests across several API keys and endpoints.
+
+        Each request goes to the target with the fewest requests in flight; targets answering with 429s or
+        5xx errors are ejected for a while and probed again later.
+
+        Args:
+            targets: A TargetPool, Target or (api_key, base_url) pairs, or None to use the backend's own key again.
+
+        Returns:
+            Optional[TargetPool]: The pool in use.
+        """
+        return self.backend.set_targets(targets)
+
+    def target_stats(self) -> Any:
+        """Per-target request counts and ejection state, keyed by target label."""
+        return self.backend.target_stats()
+
+    def warm_up(self, connections: int = 1) -> Any:
+        """Open connections to the provider before the first request.
+
+        Clients and their connection pools are shared by every backend using the same API key and base URL.
+
+        Args:
+            connections (int): The number of connections to open concurrently.
+
+        Returns:
+            int: The number of connections that were opened successfully.
+        """
+        return self.backend.warm_up(connections)
+
+    def set_backend(
+        self, backend: Optional[str] = None, api_key: Optional[str] = None, **kwargs: dict[str, Any]
+    ) -> None:
+        """Set the backend to be used for audio-based AI operations.
+
+        Args:
+            backend (str): The name of the backend to set.
+            api_key (str): The API key for the backend.
+            **kwargs (dict[str, Any]): Additional keyword arguments specific to the backend.
+        """
+        self.backend, self.backend_name = self.backend_manager.set_backend(
+            self.backend_type, backend, api_key, **kwargs
+        )
+
+
+class AsyncTextAI:
+    def __init__(self, backend: Optional[str] = None, api_key: Optional[str] = None, **kwargs: dict[str, Any]) -> None:
+        """Initialize an AsyncTextAI instance, the awaitable counterpart of TextAI.
+        Backends are resolved through the same BackendManager registry and configuration defaults as TextAI.
+
+        Args:
+            backend_name (Optional[str]): The name of the backend to use.
+                If None, the default backend is used.
+            api_key (Optional[str]): The API key for accessing the specified backend.
+                If None, it attempts to retrieve from the environment variables.
+        """
+        self.backend_manager = BackendManager()
+        self.backend_type = "text"
+
+        self.set_backend(backend, api_key, **kwargs)
+
+    async def text_chat(self, messages: list, **kwargs: Any) -> Any:
+        """Send messages to the backend for text-based chatting without blocking the event loop.
+
+        Args:
+            messages (list): A list of messages for the chat.
+            **kwargs (dict[str, Any]): Additional keyword arguments specific to the backend's chat function.
+
+        Returns:
+            Any: The response from the backend.
+        """
+        return await self.backend.atext_chat(messages, **kwargs)
+
+    async def text_chat_stream(self, messages: list, **kwargs: Any) -> Any:
+        """Send messages to the backend for text-based chatting and stream the reply.
+
+        Args:
+            messages (list): A list of messages for the chat.
+            **kwargs (dict[str, Any]): Additional keyword arguments specific to the backend's chat function.
+
+        Returns:
+            Any: An async iterator of content deltas. Once exhausted it exposes the assembled message,
+                usage and time-to-first-token metrics.
+        """
+        return await self.backend.atext_chat_stream(messages, **kwargs)
+
+    async def text_chat_structured(
+        self, messages: list, schema: Optional[dict[str, Any]] = None, item_path: Sequence[Any] = ("*",), **kwargs: Any
+    ) -> Any:
+        """Ask for a JSON reply and yield its values as soon as each one is complete.
+
+        Args:
+            messages (list): A list of messages for the chat.
+            schema (Optional[dict[str, Any]]): The JSON schema of the reply, or None for JSON mode.
+            item_path (Sequence[Any]): The values to yield, where "*" matches any key or index.
+            **kwargs (dict[str, Any]): Additional keyword arguments specific to the backend's chat function.
+
+        Returns:
+            Any: An async iterator of events carrying each value and its path, validated against the schema.
+                Once exhausted it exposes the whole document as `value`.
+        """
+        return await self.backend.atext_chat_structured(messages, schema, item_path, **kwargs)
+
+    async def text_chat_many(
+        self,
+        messages_list: Iterable[list],
+        item_kwargs: Optional[Iterable[dict[str, Any]]] = None,
+        max_concurrency: int = 8,
+        **kwargs: Any,
+    ) -> Any:
+        """Send many message lists to the backend concurrently on the event loop.
+
+        Args:
+            messages_list (Iterable[list]): The message lists to send.
+            item_kwargs (Optional[Iterable[dict[str, Any]]]): Per-item keyword arguments, aligned with messages_list.
+            max_concurrency (int): The maximum number of requests in flight.
+            **kwargs (dict[str, Any]): Keyword arguments shared by every item.
+
+        Returns:
+            list[BatchResult]: One result per message list, in input order, with per-item errors captured.
+        """
+        return await self.backend.atext_chat_many(messages_list, item_kwargs, max_concurrency=max_concurrency, **kwargs)
+
+    async def generate_embedding(self, messages: list, **kwargs: Any) -> Any:
+        """Generate an embedding for the provided messages without blocking the event loop.
+
+        Args:
+            messages (list): The input to embed.
+            **kwargs (dict[str, Any]): Additional keyword arguments specific to the backend's embedding function.
+
+        Returns:
+            Any: The embedding from the backend.
+        """
+        return await self.backend.agenerate_embedding(messages, **kwargs)
+
+    async def generate_embeddings(self, texts: Sequence[str], **kwargs: Any) -> Any:
+        """Embed any number of texts in concurrent, size-limited sub-batches without blocking the event loop.
+
+        Args:
+            texts (Sequence[str]): The texts to embed.
+            **kwargs (dict[str, Any]): Batching options and additional keyword arguments for the backend.
+
+        Returns:
+            Any: A float32 matrix with one row per text, in input order.
+        """
+        return await self.backend.agenerate_embeddings(texts, **kwargs)
+
+    def set_backend(
+        self, backend: Optional[str] = None, api_key: Optional[str] = None, **kwargs: dict[str, Any]
+    ) -> None:
+        """Set the backend to be used for text-based AI operations.
+
+        Args:
+            backend (str): The name of the backend to set.
+            api_key (str): The API key for the backend.
+            **kwargs (dict[str, Any]): Additional keyword arguments specific to the backend.
+        """
+        self.backend, self.backend_name = self.backend_manager.set_backend(
+            self.backend_type, backend, api_key, **kwargs
+        )
+
+
+class AsyncImageAI:
+    def __init__(self, backend: Optional[str] = None, api_key: Optional[str] = None, **kwargs: dict[str, Any]) -> None:
+        """Initialize an AsyncImageAI instance, the awaitable counterpart of ImageAI.
+
+        Args:
+            backend_name (Optional[str]): The name of the backend to use.
+                If None, the default backend is used.
+            api_key (Optional[str]): The API key for accessing the specified backend.
+                If None, it attempts to retrieve from the environment variables.
+        """
+        self.backend_manager = BackendManager()
+        self.backend_type = "image"
+
+        self.set_backend(backend, api_key, **kwargs)
+
+    async def generate_image(self, prompt: str, **kwargs: Any) -> Any:
+        """Generate images based on the provided prompt without blocking the event loop.
+
+        Args:
+            prompt (str): Text prompt for image generation.
+            **kwargs (dict[str, Any]): Additional parameters for the backend's image generation function.
+
+        Returns:
+            Any: The generated images from the backend.
+        """
+        return await self.backend.agenerate_image(prompt, **kwargs)
+
+    def set_backend(
+        self, backend: Optional[str] = None, api_key: Optional[str] = None, **kwargs: dict[str, Any]
+    ) -> None:
+        """Set the backend to be used for image-based AI operations.
+
+        Args:
+            backend (str): The name of the backend to set.
+            api_key (str): The API key for the backend.
+            **kwargs (dict[str, Any]): Additional keyword arguments specific to the backend.
+        """
+        self.backend, self.backend_name = self.backend_manager.set_backend(
+            self.backend_type, backend, api_key, **kwargs
+        )
+
+
+class AsyncAudioAI:
+    def __init__(self, backend: Optional[str] = None, api_key: Optional[str] = None, **kwargs: dict[str, Any]) -> None:
+        """Initialize an AsyncAudioAI instance, the awaitable counterpart of AudioAI.
+
+        Args:
+            backend_name (Optional[str]): The name of the backend to use.
+                If None, the default backend is used.
+            api_key (Optional[str]): The API key for accessing the specified backend.
+                If None, it attempts to retrieve from the environment variables.
+        """
+        self.backend_manager = BackendManager()
+        self.backend_type = "audio"
+
+        self.set_backend(backend, api_key, **kwargs)
+
+    async def voice_to_text(
+        self,
+        audio_input: "AudioSource",
+        **kwargs: Any,
+    ) -> Any:
+        """Convert voice messages to text without blocking the event loop.
+
+        Args:
+            audio_input (AudioSource): Audio bytes, a file path, a binary file object or a memory map.
+            **kwargs (dict[str, Any]): Additional parameters for the backend's voice-to-text function.
+
+        Returns:
+            Any: The textual representation of the spoken content.
+        """
+        return await self.backend.avoice_to_text(audio_input, **kwargs)
+
     def set_backend(
         self, backend: Optional[str] = None, api_key: Optional[str] = None, **kwargs: dict[str, Any]
     ) -> None:
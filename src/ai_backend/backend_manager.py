@@ -1,32 +1,136 @@
 # base/backend_manager.py
-from typing import Any, Optional
+import importlib
+import importlib.metadata
+import logging
+import sys
+import threading
+from typing import Any, Optional, Union
 
-from openai_backend.openai_audio_backend import OpenAIAudioBackend
-from openai_backend.openai_image_backend import OpenAIImageBackend
-from openai_backend.openai_text_backend import OpenAITextBackend
+logger = logging.getLogger(__name__)
+
+# Third-party packages register backends under this entry point group. Entry point names are
+# "<backend type>.<backend name>" and values are "module:Class", for example
+# [project.entry-points."ai_backend.backends"] "text.mistral" = "mistral_backend.text:MistralTextBackend".
+BACKEND_ENTRY_POINT_GROUP = "ai_backend.backends"
+
+# Backends are referenced as "module:Class" and only imported when first used, so a text-only program
+# never imports the audio stack.
+_backends: dict[str, dict[str, Any]] = {
+    "text": {
+        "openai": "openai_backend.openai_text_backend:OpenAITextBackend",
+    },
+    "image": {
+        "openai": "openai_backend.openai_image_backend:OpenAIImageBackend",
+    },
+    "audio": {
+        "openai": "openai_backend.openai_audio_backend:OpenAIAudioBackend",
+    },
+}
+_default_backend: dict[str, str] = {
+    "text": "openai",
+    "image": "openai",
+    "audio": "openai",
+}
+_lock = threading.RLock()
+_entry_points_loaded = False
+
+
+def register_backend(backend_type: str, backend_name: str, backend: Union[str, type], *, default: bool = False) -> None:
+    """
+    Register a backend class for every BackendManager in the process.
+
+    Args:
+        backend_type (str): The backend type, such as "text".
+        backend_name (str): The name the backend is selected by.
+        backend (Union[str, type]): The backend class, or a "module:Class" reference imported on first use.
+        default (bool): Make this backend the default for its type.
+    """
+    with _lock:
+        _backends.setdefault(backend_type, {})[backend_name] = backend
+        if default or backend_type not in _default_backend:
+            _default_backend[backend_type] = backend_name
+
+
+def load_entry_points() -> None:
+    """Register the backends advertised by installed packages. Only the first call scans the installed packages."""
+    global _entry_points_loaded  # noqa: PLW0603
+    with _lock:
+        if _entry_points_loaded:
+            return
+        _entry_points_loaded = True
+
+        if sys.version_info >= (3, 10):
+            group = importlib.metadata.entry_points(group=BACKEND_ENTRY_POINT_GROUP)
+        else:
+            group = importlib.metadata.entry_points().get(BACKEND_ENTRY_POINT_GROUP, [])
+
+        for entry_point in group:
+            backend_type, _, backend_name = entry_point.name.partition(".")
+            if not backend_name:
+                logger.error(f"Ignoring backend entry point {entry_point.name!r}: expected '<type>.<name>'.")
+                continue
+            # Built-in and explicitly registered backends take precedence.
+            _backends.setdefault(backend_type, {}).setdefault(backend_name, entry_point.value)
+            _default_backend.setdefault(backend_type, backend_name)
+
+
+def resolve_backend(reference: Union[str, type]) -> type:
+    """Import the class behind a "module:Class" reference. Classes are returned unchanged."""
+    if not isinstance(reference, str):
+        return reference
+    module_name, _, class_name = reference.partition(":")
+    backend_class: type = getattr(importlib.import_module(module_name), class_name)
+    return backend_class
 
 
 class BackendManager:
     def __init__(self) -> None:
-        self.backends: dict[str, dict[str, Any]] = {
-            "text": {
-                "openai": OpenAITextBackend,
-            },
-            "image": {
-                "openai": OpenAIImageBackend,
-            },
-            "audio": {
-                "openai": OpenAIAudioBackend,
-            },
-        }
-        self.default_backend: dict[str, str] = {
-            "text": "openai",
-            "image": "openai",
-            "audio": "openai",
-        }
+        # Shared by every manager, so creating one costs nothing and registrations apply everywhere.
+        self.backends = _backends
+        self.default_backend = _default_backend
 
         self.backend_class = None
 
+    def get_backend_class(self, backend_type: str, backend_name: Optional[str] = None) -> tuple[type, str]:
+        """
+        Look up a backend class, importing it on first use.
+
+        Installed entry points are only consulted when the backend is not built in or registered.
+
+        Args:
+            backend_type (str): The backend type, such as "text".
+            backend_name (Optional[str]): The backend name. None selects the default for the type.
+
+        Returns:
+            tuple[type, str]: The backend class and its name.
+
+        Raises:
+            ValueError: If the type or backend is unknown.
+        """
+        with _lock:
+            if backend_type not in self.backends or (
+                backend_name is not None and backend_name not in self.backends[backend_type]
+            ):
+                load_entry_points()
+
+            if backend_type not in self.backends:
+                error_message = f"Backend Type {backend_type} not supported."
+                raise ValueError(error_message)
+            if backend_name is None:
+                backend_name = self.default_backend[backend_type]
+            elif backend_name not in self.backends[backend_type]:
+                error_message = f"Backend {backend_name} not supported for Backend Type {backend_type}."
+                raise ValueError(error_message)
+
+            backend_class = resolve_backend(self.backends[backend_type][backend_name])
+            self.backends[backend_type][backend_name] = backend_class
+            return backend_class, backend_name
+
+    def available_backends(self, backend_type: str) -> list[str]:
+        """Return the names of every backend of a type, including those provided by installed packages."""
+        load_entry_points()
+        return sorted(self.backends.get(backend_type, {}))
+
     def set_backend(
         self,
         backend_type: str,
@@ -34,17 +138,5 @@ class BackendManager:
         api_key: Optional[str] = None,
         **kwargs: dict[str, Any],
     ) -> Any:
-        if backend_type in self.backends:
-            if backend_name in self.backends[backend_type]:
-                backend_class = self.backends[backend_type][backend_name]
-            elif backend_name is None:
-                backend_name = self.default_backend[backend_type]
-                backend_class = self.backends[backend_type][backend_name]
-            else:
-                error_message = f"Backend {backend_name} not supported for Backend Type {backend_type}."
-                raise ValueError(error_message)
-
-            return backend_class(api_key=api_key, **kwargs), backend_name
-        else:
-            error_message = f"Backend Type {backend_type} not supported."
-            raise ValueError(error_message)
+        backend_class, backend_name = self.get_backend_class(backend_type, backend_name)
+        return backend_class(api_key=api_key, **kwargs), backend_name
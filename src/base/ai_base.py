@@ -1,30 +1,108 @@
 import logging
 import os
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, Optional
+from collections.abc import Awaitable, Hashable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Optional, TypeVar, Union
 
-from openai import Client, OpenAI
+from openai import AsyncOpenAI, Client
+
+from base.client_registry import clients
+from base.metrics import CallTracker
+from base.metrics import track_call as track_provider_call
+from base.rate_limiter import RateLimiter, rate_limiters
+from base.request_policy import RequestPolicy, RequestStats, last_request_stats
+from base.target_pool import PooledClient, Target, TargetPool, TargetStats
+
+T = TypeVar("T")
 
 logger = logging.getLogger(__name__)
 
 
+# Merged configurations cached per manager before the cache is reset.
+MAX_COMBINED_CONFIGS = 512
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """
+    An immutable view of every service configuration at one point in time.
+
+    Attributes:
+        version (int): Incremented by every change, so a snapshot can be compared with a later one cheaply.
+        services (Mapping[str, Any]): Read-only configuration of every service.
+    """
+
+    version: int
+    services: Mapping[str, Any]
+
+
+def _freeze(value: Any) -> Any:
+    # Read-only views all the way down, so a snapshot cannot be changed through nested dictionaries.
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    return value
+
+
+def _copy_nested(value: Any) -> Any:
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: _copy_nested(item) for key, item in value.items()}
+    return value
+
+
+def _merge_nested(target: dict[str, Any], updates: Mapping[str, Any]) -> dict[str, Any]:
+    # Recursively merge updates into a new dictionary, leaving target untouched.
+    merged = dict(target)
+    for key, value in updates.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge_nested(merged[key], value)
+        else:
+            merged[key] = _copy_nested(value)
+    return merged
+
+
+def _signature(value: Any) -> Hashable:
+    # A hashable stand-in for keyword arguments; raises TypeError for values that cannot be keyed.
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted((key, _signature(item)) for key, item in value.items())))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_signature(item) for item in value))
+    hash(value)
+    return (type(value).__name__, value)
+
+
 class ConfigManager:
     def __init__(self) -> None:
-        # Initialize the configuration dictionary. This dictionary will store configurations for different services.
-        self.config: dict[str, dict[str, Any]] = {}
+        # Configurations for different services live in an immutable snapshot. Every change builds a new
+        # snapshot under the lock and swaps it in, so readers on other threads never see a partial update.
+        self._lock = threading.RLock()
+        self._services: dict[str, Any] = {}
+        self._snapshot = ConfigSnapshot(0, MappingProxyType({}))
+        self._combined: dict[Hashable, tuple[dict[str, Any], tuple[str, ...]]] = {}
 
         # Setup logging for the ConfigManager. This will help in debugging and logging errors or important information.
         self.logger = logging.getLogger("ConfigManager")
-        self.logger.setLevel(logging.DEBUG)  # Set logging level to DEBUG to capture all types of log messages
-        handler = logging.StreamHandler()  # Create a stream handler to output logs to the console
-        handler.setLevel(logging.DEBUG)  # Set the level for the handler
-        formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        )  # Define the log message format
-        handler.setFormatter(formatter)  # Set the formatter for the handler
-        self.logger.addHandler(handler)  # Add the handler to the logger
+        _configure_logger(self.logger)
+
+    @property
+    def config(self) -> Mapping[str, Any]:
+        """A read-only view of every service configuration. Assign a dictionary to replace them all."""
+        return self._snapshot.services
+
+    @config.setter
+    def config(self, value: Mapping[str, Any]) -> None:
+        with self._lock:
+            self._publish({service: _copy_nested(params) for service, params in value.items()})
 
-    def get_config(self, service: str) -> dict[str, Any]:
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        """The current configuration snapshot."""
+        return self._snapshot
+
+    def get_config(self, service: str) -> Any:
         """
         Retrieve the configuration for a specific service.
 
@@ -32,7 +110,7 @@ class ConfigManager:
             service (str): The name of the service to retrieve the configuration for.
 
         Returns:
-            dict[str, Any]: The configuration dictionary for the specified service.
+            Any: A read-only view of the configuration for the specified service.
                 Returns an empty dictionary if the service is not found.
         """
         return self.config.get(service, {})
@@ -41,6 +119,8 @@ class ConfigManager:
         """
         Update the configuration for one or more services.
 
+        All updates are applied together, or none are if one of them is invalid.
+
         Args:
             kwargs (dict[str, Any]): Keyword arguments where the key is the service name and the value
                 is the configuration dictionary.
@@ -48,47 +128,36 @@ class ConfigManager:
         Raises:
             TypeError: If the updates provided are not in the expected format (dict or str).
         """
-        for service, updates in kwargs.items():
-            if service in self.config:
-                # If the service already has a configuration, update it with the new values.
-                if isinstance(updates, dict):
-                    self._update_nested_dict(self.config[service], updates)
-                elif isinstance(updates, str):
-                    # Allow setting the entire configuration to a string value directly.
-                    self.config[service] = updates
+        with self._lock:
+            services = dict(self._services)
+            for service, updates in kwargs.items():
+                if service in services:
+                    # If the service already has a configuration, update it with the new values.
+                    if isinstance(updates, dict):
+                        current = services[service]
+                        services[service] = (
+                            _merge_nested(current, updates) if isinstance(current, dict) else _copy_nested(updates)
+                        )
+                    elif isinstance(updates, str):
+                        # Allow setting the entire configuration to a string value directly.
+                        services[service] = updates
+                    else:
+                        # Log and raise an error if the updates are not of the expected type.
+                        error_message = (
+                            f"Invalid type for '{service}'. Expected dict or str, got {type(updates).__name__}."
+                        )
+                        self.logger.error(error_message)
+                        raise TypeError(error_message)
+                elif isinstance(updates, (dict, str)):
+                    # Allow setting a new configuration to a dict or a string value directly.
+                    services[service] = _copy_nested(updates)
                 else:
                     # Log and raise an error if the updates are not of the expected type.
-                    error_message = f"Invalid type for '{service}'. Expected dict or str, got {type(updates).__name__}."
+                    error_message = f"Invalid type for new configuration '{service}'. \
+                        Expected dict or str, got {type(updates).__name__}."
                     self.logger.error(error_message)
                     raise TypeError(error_message)
-            elif isinstance(updates, dict):
-                self.config[service] = updates
-            elif isinstance(updates, str):
-                # Allow setting a new configuration to a string value directly.
-                self.config[service] = updates
-            else:
-                # Log and raise an error if the updates are not of the expected type.
-                error_message = f"Invalid type for new configuration '{service}'. \
-                    Expected dict or str, got {type(updates).__name__}."
-                self.logger.error(error_message)
-                raise TypeError(error_message)
-
-    def _update_nested_dict(self, target: dict[str, Any], updates: dict[str, Any]) -> None:
-        """
-        Recursively update a nested dictionary with new values.
-
-        Args:
-            target (dict[str, Any]): The original dictionary to be updated.
-            updates (dict[str, Any]): The dictionary with new values to update the original dictionary with.
-        """
-        for key, value in updates.items():
-            if isinstance(value, dict) and key in target and isinstance(target[key], dict):
-                # If both target and updates have dictionaries for the same key,
-                # update the nested dictionary recursively.
-                self._update_nested_dict(target[key], value)
-            else:
-                # Otherwise, simply set the value in the target dictionary.
-                target[key] = value
+            self._publish(services)
 
     def set_default(self, service: str, **kwargs: dict[str, Any]) -> None:
         """
@@ -106,7 +175,10 @@ class ConfigManager:
             self.logger.error(error_message)
             raise ValueError(error_message)
 
-        self.config[service] = self.combine_config(service, **kwargs)
+        with self._lock:
+            services = dict(self._services)
+            services[service] = self._merge_kwargs(service, kwargs)
+            self._publish(services)
 
     def add_default(self, service: str, params: dict[str, Any]) -> None:
         """
@@ -126,14 +198,17 @@ class ConfigManager:
             self.logger.error(error_message)
             raise ValueError(error_message)
 
-        for key, value in params.items():
-            if key not in self.config[service]:
-                self.config[service][key] = value
-            else:
-                # Log and raise an error if the value is not a dictionary.
-                error_message = f"{key} already exists in '{service}'."
-                self.logger.error(error_message)
-                raise TypeError(error_message)
+        with self._lock:
+            updated = dict(self._services[service])
+            for key, value in params.items():
+                if key not in updated:
+                    updated[key] = _copy_nested(value)
+                else:
+                    # Log and raise an error if the value is not a dictionary.
+                    error_message = f"{key} already exists in '{service}'."
+                    self.logger.error(error_message)
+                    raise TypeError(error_message)
+            self._publish({**self._services, service: updated})
 
     def add_service(self, service: str, params: dict[str, Any]) -> None:
         """
@@ -153,18 +228,22 @@ class ConfigManager:
             self.logger.error(error_message)
             raise ValueError(error_message)
 
-        if service not in self.config:
-            self.config[service] = params
-        else:
-            # Log and raise an error if the service already has a configuration.
-            error_message = f"Configuration for '{service}' already exists."
-            self.logger.error(error_message)
-            raise ValueError(error_message)
+        with self._lock:
+            if service not in self._services:
+                self._publish({**self._services, service: _copy_nested(params)})
+            else:
+                # Log and raise an error if the service already has a configuration.
+                error_message = f"Configuration for '{service}' already exists."
+                self.logger.error(error_message)
+                raise ValueError(error_message)
 
     def combine_config(self, service: str, **kwargs: dict[str, Any]) -> dict[str, Any]:
         """
         Combine the default configuration with the provided configuration.
 
+        Merged results are cached per service and keyword arguments until the configuration changes,
+        and every call returns its own copy that the caller may modify.
+
         Args:
             service (str): The name of the service.
             kwargs (Any): Keyword arguments representing the new configuration values
@@ -177,26 +256,77 @@ class ConfigManager:
             ValueError: If the service does not exist in the default configurations.
             TypeError: If the provided configuration values are not in the expected format.
         """
-        if service not in self.config:
+        cache_key: Optional[Hashable] = (service, tuple([(key, type(value), value) for key, value in kwargs.items()]))
+        snapshot = self._snapshot
+        try:
+            cached = self._combined.get(cache_key)
+        except TypeError:
+            # Nested values get a structural key; values that cannot be keyed at all are merged without caching.
+            try:
+                cache_key = (service, _signature(kwargs))
+                cached = self._combined.get(cache_key)
+            except TypeError:
+                cache_key, cached = None, None
+
+        if cached is None:
+            combined = self._merge_kwargs(service, kwargs)
+            cached = (combined, tuple(key for key, value in combined.items() if isinstance(value, dict)))
+            with self._lock:
+                # Only cache results merged from the configuration that is still current.
+                if cache_key is not None and snapshot is self._snapshot:
+                    if len(self._combined) >= MAX_COMBINED_CONFIGS:
+                        self._combined.clear()
+                    self._combined[cache_key] = cached
+
+        # Copy nested dictionaries as well, so callers can modify the result without touching the cache.
+        combined, nested_keys = cached
+        result = dict(combined)
+        for key in nested_keys:
+            result[key] = _copy_nested(combined[key])
+        return result
+
+    def _merge_kwargs(self, service: str, kwargs: dict[str, Any]) -> dict[str, Any]:
+        services = self._services
+        if service not in services:
             # Log and raise an error if the service is not found in the default configurations.
             error_message = f"Service '{service}' not found in default configurations."
             self.logger.error(error_message)
             raise ValueError(error_message)
 
-        # Create a copy of the default configuration to avoid modifying the original.
-        config = self.config[service].copy()
+        # Merge into a new dictionary so the defaults are never modified.
+        return _merge_nested(services[service], kwargs)
 
-        # Iterate over the provided configuration values and update the default configuration.
-        for key, value in kwargs.items():
-            if isinstance(value, dict):
-                self._update_nested_dict(config, {key: value})
-            else:
-                config[key] = value
+    def _publish(self, services: dict[str, Any]) -> None:
+        # Callers hold the lock. The published dictionaries are never modified afterwards.
+        self._services = services
+        self._snapshot = ConfigSnapshot(self._snapshot.version + 1, _freeze(services))
+        self._combined = {}
+
+
+_configured_loggers: set[str] = set()
+_configured_loggers_lock = threading.Lock()
 
-        return config
+
+def _configure_logger(config_logger: logging.Logger) -> None:
+    # Attach the console handler once per process rather than once per ConfigManager, so lines are not repeated.
+    with _configured_loggers_lock:
+        if config_logger.name in _configured_loggers:
+            return
+        _configured_loggers.add(config_logger.name)
+        config_logger.setLevel(logging.DEBUG)  # Set logging level to DEBUG to capture all types of log messages
+        handler = logging.StreamHandler()  # Create a stream handler to output logs to the console
+        handler.setLevel(logging.DEBUG)  # Set the level for the handler
+        formatter = logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        )  # Define the log message format
+        handler.setFormatter(formatter)  # Set the formatter for the handler
+        config_logger.addHandler(handler)  # Add the handler to the logger
 
 
 class AIBackend(ABC):
+    # The backend label attached to metrics.
+    provider = "unknown"
+
     def __init__(self, config_manager: ConfigManager, api_key: Optional[str]) -> None:
         if not isinstance(config_manager, ConfigManager):
             config_manager_error = "config_manager must be an instance of ConfigManager"
@@ -214,9 +344,24 @@ class AIBackend(ABC):
                 logger.error(error)
                 raise ValueError(error)
 
+        self.api_key = api_key
         self.client = self.create_client(api_key)
+        # Set only by backends that route async calls through their own client, such as a target pool.
+        self._async_client: Any = None
         self.config_manager = config_manager
 
+    @property
+    def async_client(self) -> Any:
+        """
+        The asynchronous client for this backend.
+
+        It is looked up on every access rather than kept on the backend, because async clients are bound to
+        the event loop they were created in; the client registry shares one per loop.
+        """
+        if self._async_client is not None:
+            return self._async_client
+        return self.create_async_client(self.api_key)
+
     def set_default(self, service: str, **kwargs: dict[str, Any]) -> None:
         self.config_manager.set_default(service, **kwargs)
 
@@ -236,21 +381,205 @@ class AIBackend(ABC):
         """Subclass must implement this method to create and return the client with the given API key."""
         pass
 
-    def log_error(self, message: str, exc: Exception) -> None:
+    def create_async_client(self, api_key: str) -> Any:
+        """Create and return an asynchronous client. Subclasses with native async support override this."""
+        error_message = f"{type(self).__name__} does not provide an asynchronous client."
+        raise NotImplementedError(error_message)
+
+    def log_error(self, message: str, exc: BaseException) -> None:
         logger.error(f"{message}: {exc!s}")
 
     def log_request_response(self, request: Any, response: Any) -> None:
         """Logs details of the request and response for debugging."""
-        logger.debug(f"Request: {request}")
-        logger.debug(f"Response: {response}")
+        # Formatting large payloads is costly, so skip it unless debug logging is on.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Request: {request}")
+            logger.debug(f"Response: {response}")
+
+    @contextmanager
+    def track_call(self, service: str, model: str, request_payload: Any = None) -> Iterator[CallTracker]:
+        """
+        Time a provider call, report it to the metrics hooks and log it at debug level.
+
+        Set `response` on the yielded tracker once the provider has answered, so token usage can be recorded.
+
+        Args:
+            service (str): The service being called, such as "chat".
+            model (str): The model used.
+            request_payload (Any): What is sent to the provider.
+        """
+        with track_provider_call(self.provider, service, model, request_payload) as tracker:
+            yield tracker
+        self.log_request_response(request_payload, tracker.response)
 
 
 class OpenAIBackend(AIBackend):
-    def __init__(self, config_manager: ConfigManager, api_key: Optional[str]) -> None:
+    provider = "openai"
+
+    def __init__(self, config_manager: ConfigManager, api_key: Optional[str], base_url: Optional[str] = None) -> None:
+        # Set before the base initializer, which creates the client.
+        self.base_url = base_url
         super().__init__(config_manager, api_key)
+        self.request_policy = RequestPolicy(max_attempts=1)
+        self.target_pool: Optional[TargetPool] = None
 
     def get_env_var_name(self) -> str:
         return "OPENAI_API_KEY"
 
     def create_client(self, api_key: str) -> Client:
-        return OpenAI(api_key=api_key)
+        return clients.openai_client(api_key, self.base_url)
+
+    def create_async_client(self, api_key: str) -> AsyncOpenAI:
+        return clients.openai_async_client(api_key, self.base_url)
+
+    def warm_up(self, connections: int = 1) -> int:
+        """
+        Open connections in the shared pool of this backend's client before the first request.
+
+        Args:
+            connections (int): The number of connections to open concurrently.
+
+        Returns:
+            int: The number of connections that were opened successfully. With a target pool, connections
+            are opened to every target and the total is returned.
+        """
+        if self.target_pool is not None:
+            return sum(
+                clients.warm_up(target.api_key, target.base_url, connections) for target in self.target_pool.targets
+            )
+        return clients.warm_up(self.api_key, self.base_url, connections)
+
+    def set_targets(
+        self, targets: Optional[Union[TargetPool, Sequence[Union[Target, tuple[str, Optional[str]]]]]]
+    ) -> Optional[TargetPool]:
+        """
+        Spread this backend's requests across several API keys and endpoints.
+
+        Each call goes to the target with the fewest requests in flight, and targets that answer with a 429,
+        a 5xx or not at all are ejected for a while before being probed again. See TargetPool.
+
+        Rate limits set with set_rate_limit stay keyed by the backend's own API key, so they cap the pool
+        as a whole.
+
+        Args:
+            targets: A TargetPool, the targets to build one from as Target or (api_key, base_url) pairs, or None
+                to send every request with the backend's own API key and base URL again.
+
+        Returns:
+            Optional[TargetPool]: The pool in use, whose stats() shows how requests are spread.
+        """
+        if not targets:
+            self.target_pool = None
+            self.client = self.create_client(self.api_key)
+            self._async_client = None
+            return None
+        pool = targets if isinstance(targets, TargetPool) else TargetPool(targets)
+        self.target_pool = pool
+        self.client = PooledClient(pool, lambda target: clients.openai_client(target.api_key, target.base_url))
+        self._async_client = PooledClient(
+            pool, lambda target: clients.openai_async_client(target.api_key, target.base_url), is_async=True
+        )
+        return pool
+
+    @contextmanager
+    def pinned_client(self) -> Iterator[Any]:
+        """
+        The client for a sequence of calls that must reach the same API key and endpoint, such as the steps of
+        a batch. With a target pool, one target is chosen for the whole block; otherwise this is the client.
+        """
+        if isinstance(self.client, PooledClient):
+            with self.client.pinned() as client:
+                yield client
+        else:
+            yield self.client
+
+    def target_stats(self) -> dict[str, TargetStats]:
+        """Per-target request counts and ejection state, or an empty dictionary without a target pool."""
+        return self.target_pool.stats() if self.target_pool is not None else {}
+
+    def set_rate_limit(
+        self, model: str, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None
+    ) -> RateLimiter:
+        """
+        Limit the requests and tokens per minute sent for a model with this backend's API key.
+
+        Limits are process-wide: every backend using the same API key and model shares them, whatever its
+        type. Calls over the limit wait locally instead of failing with a rate limit error.
+
+        Args:
+            model (str): The model the limits apply to.
+            requests_per_minute (Optional[float]): The request limit. None leaves requests unlimited.
+            tokens_per_minute (Optional[float]): The token limit. None leaves tokens unlimited.
+
+        Returns:
+            RateLimiter: The shared limiter for the API key and model.
+        """
+        return rate_limiters.configure(self.api_key, model, requests_per_minute, tokens_per_minute)
+
+    def rate_limiter(self, model: str) -> Optional[RateLimiter]:
+        """Return the shared limiter for a model, or None if no limits were set."""
+        return rate_limiters.get(self.api_key, model)
+
+    def acquire_rate_limit(self, model: str, tokens: int = 0) -> Optional[RateLimiter]:
+        """Wait until a request for model with an estimated number of tokens fits within the limits."""
+        limiter = self.rate_limiter(model)
+        if limiter is not None:
+            limiter.acquire(tokens)
+        return limiter
+
+    async def aacquire_rate_limit(self, model: str, tokens: int = 0) -> Optional[RateLimiter]:
+        """Asynchronous counterpart of acquire_rate_limit."""
+        limiter = self.rate_limiter(model)
+        if limiter is not None:
+            await limiter.aacquire(tokens)
+        return limiter
+
+    def reconcile_rate_limit(self, limiter: Optional[RateLimiter], estimated_tokens: int, response: Any) -> None:
+        """Correct a token estimate with the usage reported in a response."""
+        if limiter is not None:
+            total_tokens = getattr(getattr(response, "usage", None), "total_tokens", None)
+            limiter.reconcile(estimated_tokens, total_tokens if isinstance(total_tokens, int) else None)
+
+    def set_request_policy(self, policy: Optional[RequestPolicy]) -> None:
+        """
+        Retry, time out and hedge requests according to a policy.
+
+        While the policy allows more than one attempt, the client's own retries are turned off so attempts
+        are not multiplied.
+
+        Args:
+            policy (Optional[RequestPolicy]): The policy to use, or None for a single attempt per call.
+        """
+        self.request_policy = policy if policy is not None else RequestPolicy(max_attempts=1)
+
+    @property
+    def last_request_stats(self) -> Optional[RequestStats]:
+        """Attempts, hedges and elapsed time of the most recent policy-driven call in this thread or task."""
+        return last_request_stats()
+
+    def call_with_policy(self, request: Callable[[Any, Optional[float]], T], deadline: Optional[float] = None) -> T:
+        """
+        Run a request under the request policy.
+
+        Args:
+            request (Callable[[Any, Optional[float]], T]): Performs one attempt given the client to use and the
+                per-attempt timeout.
+            deadline (Optional[float]): Seconds after which each attempt is abandoned without the client's own
+                retries, so the caller can fall back quickly.
+        """
+        client = self._policy_client(self.client, deadline)
+        return self.request_policy.call(lambda timeout: request(client, timeout))
+
+    async def acall_with_policy(
+        self, request: Callable[[Any, Optional[float]], Awaitable[T]], deadline: Optional[float] = None
+    ) -> T:
+        """Asynchronous counterpart of call_with_policy."""
+        client = self._policy_client(self.async_client, deadline)
+        return await self.request_policy.acall(lambda timeout: request(client, timeout))
+
+    def _policy_client(self, client: Any, deadline: Optional[float] = None) -> Any:
+        if deadline is not None:
+            return client.with_options(max_retries=0, timeout=deadline)
+        if self.request_policy.max_attempts > 1:
+            return client.with_options(max_retries=0)
+        return client
@@ -1,19 +1,23 @@
+import asyncio
 import io
 from abc import ABC, abstractmethod
-from typing import Any, Optional, Union
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+if TYPE_CHECKING:
+    from base.audio_stream import AudioSource
 
 
 class AudioInterface(ABC):
     @abstractmethod
     def voice_to_text(
-        self, audio_input: Union[bytes, io.BufferedReader], chunk_length: int, overlap: int, **kwargs: dict[str, Any]
+        self, audio_input: "AudioSource", chunk_length: int, overlap: int, **kwargs: dict[str, Any]
     ) -> Any:
         """
         Transcribes voice or audio input into text.
 
         Parameters:
-            audio_input (Union[bytes, io.BufferedReader]): The audio data to be transcribed.
-                This can be raw byte data or a data stream.
+            audio_input (AudioSource): The audio data to be transcribed.
+                This can be raw byte data, a file path, a data stream or a memory map.
             **kwargs: Additional keyword arguments to customize the transcription process,
                 such as specifying the language, dialect, or any model-specific parameters.
 
@@ -22,6 +26,14 @@ class AudioInterface(ABC):
         """
         pass
 
+    async def avoice_to_text(self, audio_input: "AudioSource", **kwargs: Any) -> Any:
+        """
+        Asynchronous counterpart of voice_to_text.
+
+        Backends without a native asynchronous client run the blocking call in a worker thread.
+        """
+        return await asyncio.to_thread(self.voice_to_text, audio_input, **kwargs)
+
     @abstractmethod
     def text_to_speech(self, text: str, **kwargs: dict[str, Any]) -> Any:
         """
@@ -69,6 +81,14 @@ class TextInterface(ABC):
         """
         pass
 
+    async def atext_chat(self, messages: list, response_type: Optional[str] = None, **kwargs: Any) -> Any:
+        """
+        Asynchronous counterpart of text_chat.
+
+        Backends without a native asynchronous client run the blocking call in a worker thread.
+        """
+        return await asyncio.to_thread(self.text_chat, messages, response_type, **kwargs)
+
     @abstractmethod
     def generate_embedding(self, messages: list, **kwargs: dict[str, Any]) -> Any:
         """
@@ -83,6 +103,14 @@ class TextInterface(ABC):
         """
         pass
 
+    async def agenerate_embedding(self, messages: list, **kwargs: Any) -> Any:
+        """
+        Asynchronous counterpart of generate_embedding.
+
+        Backends without a native asynchronous client run the blocking call in a worker thread.
+        """
+        return await asyncio.to_thread(self.generate_embedding, messages, **kwargs)
+
 
 class ImageInterface(ABC):
     @abstractmethod
@@ -101,6 +129,14 @@ class ImageInterface(ABC):
         """
         pass
 
+    async def agenerate_image(self, prompt: str, **kwargs: Any) -> Any:
+        """
+        Asynchronous counterpart of generate_image.
+
+        Backends without a native asynchronous client run the blocking call in a worker thread.
+        """
+        return await asyncio.to_thread(self.generate_image, prompt, **kwargs)
+
     @abstractmethod
     def image_to_text(self, image_url: str, **kwargs: dict[str, Any]) -> Any:
         """
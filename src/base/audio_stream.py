@@ -0,0 +1,394 @@
+import contextlib
+import io
+import mmap
+import os
+import shutil
+import subprocess
+import threading
+import wave
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import IO, Any, BinaryIO, Callable, Optional, Union
+
+import numpy as np
+from pydub import AudioSegment  # type: ignore
+
+AudioSource = Union[bytes, bytearray, memoryview, str, "os.PathLike[str]", BinaryIO, mmap.mmap]
+
+# Frames read from the source at a time, so memory does not depend on the chunk length more than it must.
+_READ_FRAMES = 1 << 16
+# Milliseconds of audio whose loudness is measured together when looking for silence.
+_LEVEL_WINDOW = 10
+_SAMPLE_TYPES: dict[int, Any] = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+
+@dataclass(frozen=True)
+class SilencePolicy:
+    """
+    Where to cut audio into chunks, and how much silence to upload.
+
+    Attributes:
+        threshold (float): Loudness in dBFS below which audio counts as silence.
+        min_silence (int): Milliseconds of silence that make a place to cut.
+        search_window (int): Milliseconds before the longest allowed chunk end in which to look for silence.
+        fallback_overlap (int): Milliseconds by which chunks overlap on each side of a cut made where there
+            is no silence.
+        max_silence (Optional[int]): Silences longer than this many milliseconds are shortened to it before
+            upload, and chunks with nothing but silence are skipped. None uploads silence unchanged.
+    """
+
+    threshold: float = -40.0
+    min_silence: int = 500
+    search_window: int = 30000
+    fallback_overlap: int = 1000
+    max_silence: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class AudioChunk:
+    """
+    A chunk of a recording and where it was cut from.
+
+    Attributes:
+        audio (AudioSegment): The audio to transcribe, with long silences shortened if the policy says so.
+        start (int): Milliseconds from the start of the recording to the start of the chunk.
+        end (int): Milliseconds from the start of the recording to the end of the chunk.
+        gaps (tuple[tuple[float, float], ...]): The silences shortened in `audio`, as pairs of where the cut
+            is in `audio` and how much was removed there, in milliseconds and in order.
+    """
+
+    audio: Any
+    start: int
+    end: int
+    gaps: tuple[tuple[float, float], ...] = ()
+
+    def untrimmed(self, milliseconds: float) -> float:
+        """
+        Map a time in `audio` to the same moment in the recording, undoing the shortened silences.
+
+        Args:
+            milliseconds (float): Milliseconds from the start of `audio`.
+
+        Returns:
+            float: Milliseconds from the start of the chunk in the recording.
+        """
+        removed = 0.0
+        for position, length in self.gaps:
+            if milliseconds < position:
+                break
+            removed += length
+        return milliseconds + removed
+
+
+def iter_audio_chunks(source: AudioSource, chunk_length: int, overlap: int) -> Iterator[Any]:
+    """
+    Decode audio incrementally and yield it in overlapping chunks.
+
+    Chunks start every `chunk_length - overlap` milliseconds and last `chunk_length + overlap` milliseconds,
+    the same cuts as slicing the fully decoded audio. Only the audio of the chunk being assembled is held,
+    so memory stays at about one chunk however long the recording is.
+
+    PCM WAV is read with the standard library. Other formats are decoded to WAV by ffmpeg as they are read.
+
+    Args:
+        source (AudioSource): Encoded audio as bytes, a file path, a binary file object or a memory map.
+            File objects are read from their current position and are not closed.
+        chunk_length (int): Milliseconds of audio between the starts of consecutive chunks, plus `overlap`.
+        overlap (int): Milliseconds added to each end of the step between chunks.
+
+    Yields:
+        AudioSegment: The chunks, in order.
+
+    Raises:
+        ValueError: If the source type is not supported, the chunk length does not exceed the overlap,
+            or the audio is not PCM WAV and ffmpeg is not installed.
+    """
+    if chunk_length <= overlap:
+        error_message = f"chunk_length ({chunk_length}) must be longer than overlap ({overlap})."
+        raise ValueError(error_message)
+    _check_source(source)
+    # Arguments are checked before the first chunk is requested, the decoding happens as chunks are.
+    return _decode(source, lambda reader: _fixed_chunks(reader, chunk_length, overlap))
+
+
+def iter_silence_chunks(
+    source: AudioSource, chunk_length: int, policy: Optional["SilencePolicy"] = None
+) -> Iterator[AudioChunk]:
+    """
+    Decode audio incrementally and cut it into chunks that end in silence.
+
+    Each chunk ends in the longest silence found in the last `policy.search_window` milliseconds before
+    `chunk_length`, so consecutive chunks need not overlap and words are not split. Where there is no
+    silence, the chunk is cut at the quietest moment and overlaps the next by `policy.fallback_overlap`
+    on each side. Memory stays at about one chunk, as with `iter_audio_chunks`.
+
+    Args:
+        source (AudioSource): Encoded audio as bytes, a file path, a binary file object or a memory map.
+        chunk_length (int): The longest chunk to produce, in milliseconds.
+        policy (Optional[SilencePolicy]): What counts as silence and how much of it to keep.
+            Defaults to SilencePolicy().
+
+    Yields:
+        AudioChunk: The chunks, in order, with where they are in the recording.
+
+    Raises:
+        ValueError: If the source type is not supported, or the audio is not PCM WAV and ffmpeg is not installed.
+    """
+    _check_source(source)
+    policy = policy if policy is not None else SilencePolicy()
+    return _decode(source, lambda reader: _silence_chunks(reader, chunk_length, policy))
+
+
+def _check_source(source: AudioSource) -> None:
+    if not isinstance(source, (bytes, bytearray, memoryview, str, os.PathLike)) and not hasattr(source, "read"):
+        error_message = f"Unsupported audio input type: {type(source).__name__}."
+        raise ValueError(error_message)
+
+
+def _decode(source: AudioSource, chunker: Callable[[wave.Wave_read], Iterator[Any]]) -> Iterator[Any]:
+    with _open_source(source) as stream:
+        header = _peek(stream, 12)
+        if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+            start = stream.tell() if _seekable(stream) else None
+            try:
+                yield from _read_wav(stream, chunker)
+                return
+            except wave.Error:
+                # Compressed or extensible WAV; ffmpeg handles what the wave module does not.
+                if start is None:
+                    raise
+                stream.seek(start)
+        with _ffmpeg_wav(source, stream) as decoded:
+            yield from _read_wav(decoded, chunker)
+
+
+def _read_wav(stream: IO[bytes], chunker: Callable[[wave.Wave_read], Iterator[Any]]) -> Iterator[Any]:
+    with wave.open(stream, "rb") as reader:
+        yield from chunker(reader)
+
+
+@contextlib.contextmanager
+def _open_source(source: AudioSource) -> Iterator[Any]:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            yield file
+    else:
+        yield source
+
+
+def _seekable(stream: Any) -> bool:
+    # Memory maps can seek but have no seekable().
+    return isinstance(stream, mmap.mmap) or stream.seekable()
+
+
+def _peek(stream: Any, size: int) -> bytes:
+    if not _seekable(stream):
+        # Buffered readers of pipes and sockets can still look ahead without consuming.
+        return bytes(stream.peek(size)[:size])
+    position = stream.tell()
+    header = stream.read(size)
+    stream.seek(position)
+    return bytes(header)
+
+
+def _read_frames(reader: wave.Wave_read, pending: bytearray, size: int) -> bool:
+    # Tops pending up to size bytes and returns False once the recording is exhausted.
+    frame_size = reader.getsampwidth() * reader.getnchannels()
+    while len(pending) < size:
+        data = reader.readframes(min(_READ_FRAMES, (size - len(pending)) // frame_size))
+        if not data:
+            return False
+        pending += data
+    return True
+
+
+def _segment(reader: wave.Wave_read, data: bytes) -> Any:
+    return AudioSegment(
+        data=data, sample_width=reader.getsampwidth(), frame_rate=reader.getframerate(), channels=reader.getnchannels()
+    )
+
+
+def _fixed_chunks(reader: wave.Wave_read, chunk_length: int, overlap: int) -> Iterator[Any]:
+    rate = reader.getframerate()
+    frame_size = reader.getsampwidth() * reader.getnchannels()
+
+    def frames_at(milliseconds: int) -> int:
+        return milliseconds * rate // 1000
+
+    pending = bytearray()
+    # pending holds the recording from frame pending_start on; chunk_start is in milliseconds.
+    pending_start = 0
+    chunk_start = 0
+    exhausted = False
+    while True:
+        needed = (frames_at(chunk_start + chunk_length + overlap) - pending_start) * frame_size
+        exhausted = exhausted or not _read_frames(reader, pending, needed)
+        if not pending:
+            return
+        yield _segment(reader, bytes(pending[:needed]))
+
+        chunk_start += chunk_length - overlap
+        next_frame = frames_at(chunk_start)
+        del pending[: (next_frame - pending_start) * frame_size]
+        pending_start = next_frame
+        if exhausted and not pending:
+            return
+
+
+def _silence_chunks(reader: wave.Wave_read, chunk_length: int, policy: SilencePolicy) -> Iterator[AudioChunk]:
+    rate = reader.getframerate()
+    frame_size = reader.getsampwidth() * reader.getnchannels()
+    limit = chunk_length * rate // 1000
+
+    pending = bytearray()
+    pending_start = 0
+    while True:
+        more = _read_frames(reader, pending, limit * frame_size)
+        if not pending:
+            return
+        if more:
+            end, next_start = _boundary(reader, bytes(pending[: limit * frame_size]), chunk_length, policy)
+        else:
+            end = next_start = len(pending) // frame_size
+
+        data = bytes(pending[: end * frame_size])
+        gaps: tuple[tuple[float, float], ...] = ()
+        if policy.max_silence is not None:
+            data, gaps = _trim_silence(reader, data, policy)
+        if data:
+            start, stop = pending_start * 1000 // rate, (pending_start + end) * 1000 // rate
+            yield AudioChunk(_segment(reader, data), start, stop, gaps)
+
+        del pending[: next_start * frame_size]
+        pending_start += next_start
+        if not more and not pending:
+            return
+
+
+def _boundary(reader: wave.Wave_read, data: bytes, chunk_length: int, policy: SilencePolicy) -> tuple[int, int]:
+    # Returns where the chunk ends and where the next one starts, in frames from the start of data.
+    window_frames = max(reader.getframerate() * _LEVEL_WINDOW // 1000, 1)
+    levels = _levels(reader, data)
+    first = max(chunk_length - policy.search_window, chunk_length // 2) // _LEVEL_WINDOW
+    region = levels[first:]
+    if not len(region):
+        end = len(data) // (reader.getsampwidth() * reader.getnchannels())
+        return end, end
+
+    runs = [
+        (run_end - run_start, run_start, run_end)
+        for run_start, run_end in _silent_runs(region < policy.threshold)
+        if (run_end - run_start) * _LEVEL_WINDOW >= policy.min_silence
+    ]
+    if runs:
+        # The longest silence, and of equally long ones the latest, which makes the longest chunk.
+        _, run_start, run_end = max(runs)
+        cut = (first + (run_start + run_end) // 2) * window_frames
+        return cut, cut
+
+    # No silence to cut in; the quietest moment splits the fewest words, and the overlap recovers them.
+    # The chunk is cut early enough for its end overlap to stay within chunk_length.
+    quiet = region[: max(len(region) - policy.fallback_overlap // _LEVEL_WINDOW, 1)]
+    cut = (first + int(np.argmin(quiet))) * window_frames + window_frames // 2
+    overlap = policy.fallback_overlap * reader.getframerate() // 1000
+    return cut + overlap, max(cut - overlap, window_frames)
+
+
+def _trim_silence(
+    reader: wave.Wave_read, data: bytes, policy: SilencePolicy
+) -> tuple[bytes, tuple[tuple[float, float], ...]]:
+    # A longer silence keeps half of max_silence at each end, or only at its inner end where the chunk was
+    # cut in it, since the neighbouring chunk keeps the other half. A chunk of nothing but silence is dropped.
+    # Where each silence was shortened is returned with the audio, so timestamps can be mapped back.
+    frame_size = reader.getsampwidth() * reader.getnchannels()
+    window_frames = max(reader.getframerate() * _LEVEL_WINDOW // 1000, 1)
+    window_bytes = window_frames * frame_size
+    window_ms = window_frames * 1000 / reader.getframerate()
+    silent = _levels(reader, data) < policy.threshold
+    if silent.all():
+        return b"", ()
+    keep = (policy.max_silence or 0) // _LEVEL_WINDOW // 2
+    kept = []
+    gaps = []
+    position = 0
+    removed = 0
+    for run_start, run_end in _silent_runs(silent):
+        head = 0 if run_start == 0 else keep
+        tail = 0 if run_end == len(silent) else keep
+        if run_end - run_start <= head + tail:
+            continue
+        kept.append(data[position : (run_start + head) * window_bytes])
+        gaps.append(((run_start + head - removed) * window_ms, (run_end - tail - run_start - head) * window_ms))
+        removed += run_end - tail - run_start - head
+        position = (run_end - tail) * window_bytes
+    kept.append(data[position:])
+    return b"".join(kept), tuple(gaps)
+
+
+def _levels(reader: wave.Wave_read, data: bytes) -> "np.ndarray":
+    # The loudness of each complete level window, in dB relative to full scale.
+    sample_width = reader.getsampwidth()
+    if sample_width not in _SAMPLE_TYPES:
+        # 24-bit samples are widened to 32 bits by adding a zero low byte.
+        packed = np.frombuffer(data, dtype=np.uint8).reshape(-1, sample_width)
+        widened = np.zeros((len(packed), 4), dtype=np.uint8)
+        widened[:, 4 - sample_width :] = packed
+        data, sample_width = widened.tobytes(), 4
+    samples = np.frombuffer(data, dtype=_SAMPLE_TYPES[sample_width]).astype(np.float64)
+    if sample_width == 1:
+        # 8-bit WAV samples are unsigned.
+        samples -= 128
+    samples /= float(1 << (8 * sample_width - 1))
+
+    window_samples = max(reader.getframerate() * _LEVEL_WINDOW // 1000, 1) * reader.getnchannels()
+    count = len(samples) // window_samples
+    windows = samples[: count * window_samples].reshape(count, window_samples)
+    levels: np.ndarray = 20 * np.log10(np.maximum(np.sqrt(np.mean(windows**2, axis=1)), 1e-10))
+    return levels
+
+
+def _silent_runs(silent: "np.ndarray") -> list[tuple[int, int]]:
+    # The start and end of every run of True, end excluded.
+    edges = np.diff(np.concatenate(([0], silent.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()))
+
+
+@contextlib.contextmanager
+def _ffmpeg_wav(source: AudioSource, stream: Any) -> Iterator[IO[bytes]]:
+    converter = shutil.which(AudioSegment.converter)
+    if converter is None:
+        error_message = "Decoding audio other than PCM WAV needs ffmpeg, which was not found."
+        raise ValueError(error_message)
+
+    from_path = isinstance(source, (str, os.PathLike))
+    input_path = os.fspath(source) if isinstance(source, (str, os.PathLike)) else "pipe:0"
+    command = [converter, "-loglevel", "error", "-i", input_path, "-vn", "-acodec", "pcm_s16le", "-f", "wav", "pipe:1"]
+    process = subprocess.Popen(  # noqa: S603
+        command,
+        stdin=subprocess.DEVNULL if from_path else subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+
+    feeder = None
+    if not from_path:
+        # Writing and reading in the same thread would deadlock once both pipe buffers are full.
+        feeder = threading.Thread(target=_feed, args=(stream, process.stdin), daemon=True)
+        feeder.start()
+    try:
+        yield process.stdout  # type: ignore[misc]
+    finally:
+        process.kill()
+        process.wait()
+        if feeder is not None:
+            feeder.join()
+        if process.stdout is not None:
+            process.stdout.close()
+
+
+def _feed(stream: Any, stdin: Any) -> None:
+    with contextlib.suppress(BrokenPipeError, ValueError, OSError):
+        with stdin:
+            shutil.copyfileobj(stream, stdin)
@@ -0,0 +1,202 @@
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from openai import DEFAULT_CONNECTION_LIMITS, AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OPENAI_BASE_URL = "https://api.openai.com/v1"
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """
+    Connection pool settings for shared HTTP clients.
+
+    Attributes:
+        max_connections (int): The maximum number of open connections per client.
+        max_keepalive_connections (int): The maximum number of idle connections kept open.
+        keepalive_expiry (float): Seconds an idle connection is kept open.
+        http2 (Optional[bool]): Whether to negotiate HTTP/2. None uses it when the h2 package is installed.
+    """
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 60.0
+    http2: Optional[bool] = None
+
+    def limits(self) -> Any:
+        # Built with the SDK's own HTTP library, which differs between SDK versions.
+        return type(DEFAULT_CONNECTION_LIMITS)(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def use_http2(self) -> bool:
+        if self.http2 is None:
+            return importlib.util.find_spec("h2") is not None
+        return self.http2
+
+
+class ClientRegistry:
+    def __init__(self, settings: Optional[PoolSettings] = None) -> None:
+        """
+        Process-wide OpenAI clients keyed by API key and base URL.
+
+        Backends created with the same key and base URL share one client and therefore one connection pool,
+        so short-lived backends reuse warm connections. Asynchronous clients are also keyed by event loop,
+        because their connections cannot be used from another loop, and are dropped once their loop closes.
+
+        Args:
+            settings (Optional[PoolSettings]): The pool settings for clients created from now on.
+        """
+        self.settings = settings or PoolSettings()
+        self._lock = threading.Lock()
+        self._clients: dict[tuple[str, str], OpenAI] = {}
+        self._http_clients: dict[tuple[str, str], DefaultHttpxClient] = {}
+        self._async_clients: weakref.WeakKeyDictionary[
+            Any, dict[tuple[str, str], tuple[AsyncOpenAI, DefaultAsyncHttpxClient]]
+        ] = weakref.WeakKeyDictionary()
+        # Clients created outside a running loop are not shared, but are still closed by close() and aclose().
+        self._detached_async_clients: weakref.WeakSet[AsyncOpenAI] = weakref.WeakSet()
+
+    def configure(self, settings: PoolSettings) -> None:
+        """Use new pool settings for clients created from now on. Existing clients keep their pools."""
+        with self._lock:
+            self.settings = settings
+
+    def openai_client(self, api_key: str, base_url: Optional[str] = None) -> OpenAI:
+        """Return the shared client for an API key and base URL, creating it on first use."""
+        return self._get_client(api_key, base_url)[0]
+
+    def openai_async_client(self, api_key: str, base_url: Optional[str] = None) -> AsyncOpenAI:
+        """Return the shared asynchronous client for an API key and base URL in the running event loop."""
+        return self._get_async_client(api_key, base_url)[0]
+
+    def warm_up(self, api_key: str, base_url: Optional[str] = None, connections: int = 1) -> int:
+        """
+        Open connections to the API ahead of the first real request.
+
+        Each connection is opened with a lightweight authenticated request whose response is ignored,
+        and is then kept alive in the shared pool.
+
+        Args:
+            api_key (str): The API key of the client to warm up.
+            base_url (Optional[str]): The base URL of the client to warm up.
+            connections (int): The number of connections to open concurrently.
+
+        Returns:
+            int: The number of connections that were opened successfully.
+        """
+        client, http_client = self._get_client(api_key, base_url)
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            opened = list(executor.map(lambda _: self._ping(client, http_client), range(connections)))
+        return sum(opened)
+
+    async def awarm_up(self, api_key: str, base_url: Optional[str] = None, connections: int = 1) -> int:
+        """Asynchronous counterpart of warm_up for the client of the running event loop."""
+        client, http_client = self._get_async_client(api_key, base_url)
+        opened = await asyncio.gather(*(self._aping(client, http_client) for _ in range(connections)))
+        return sum(opened)
+
+    def close(self) -> None:
+        """
+        Close every client and forget all clients.
+
+        Asynchronous clients can only be closed on their own event loop, so their closing is scheduled on
+        loops that are still running. Use aclose from within a loop to wait for its clients to close.
+        """
+        with self._lock:
+            clients = list(self._clients.values())
+            loop_clients = list(self._async_clients.items())
+            self._clients.clear()
+            self._http_clients.clear()
+            self._async_clients.clear()
+            self._detached_async_clients.clear()
+        for client in clients:
+            client.close()
+        for loop, async_clients in loop_clients:
+            if loop.is_running():
+                for async_client, _ in async_clients.values():
+                    asyncio.run_coroutine_threadsafe(async_client.close(), loop)
+
+    async def aclose(self) -> None:
+        """Close the asynchronous clients of the running event loop and those created outside any loop."""
+        with self._lock:
+            loop_clients = self._async_clients.pop(asyncio.get_running_loop(), {})
+            detached = list(self._detached_async_clients)
+            self._detached_async_clients.clear()
+        closing = [client.close() for client, _ in loop_clients.values()] + [client.close() for client in detached]
+        for result in await asyncio.gather(*closing, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.warning(f"Closing an asynchronous client failed: {result!s}")
+
+    def _get_client(self, api_key: str, base_url: Optional[str]) -> tuple[OpenAI, DefaultHttpxClient]:
+        base_url = resolve_base_url(base_url)
+        key = (fingerprint(api_key), base_url)
+        with self._lock:
+            if key not in self._clients:
+                http_client = DefaultHttpxClient(limits=self.settings.limits(), http2=self.settings.use_http2())
+                self._clients[key] = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+                self._http_clients[key] = http_client
+            return self._clients[key], self._http_clients[key]
+
+    def _get_async_client(self, api_key: str, base_url: Optional[str]) -> tuple[AsyncOpenAI, DefaultAsyncHttpxClient]:
+        base_url = resolve_base_url(base_url)
+        key = (fingerprint(api_key), base_url)
+        try:
+            loop: Any = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        with self._lock:
+            # A client holds on to its loop, so the loop would never be dropped from the weak keys by itself.
+            for closed_loop in [known for known in self._async_clients if known.is_closed()]:
+                del self._async_clients[closed_loop]
+            # Outside a running loop there is nothing to share safely, so the client is not registered.
+            loop_clients = self._async_clients.setdefault(loop, {}) if loop is not None else {}
+            if key not in loop_clients:
+                http_client = DefaultAsyncHttpxClient(limits=self.settings.limits(), http2=self.settings.use_http2())
+                client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+                loop_clients[key] = (client, http_client)
+                if loop is None:
+                    self._detached_async_clients.add(client)
+            return loop_clients[key]
+
+    def _ping(self, client: OpenAI, http_client: DefaultHttpxClient) -> bool:
+        try:
+            http_client.get(f"{client.base_url}models", headers=client.auth_headers)
+        except Exception as e:
+            logger.warning(f"Connection warm-up failed: {e!s}")
+            return False
+        return True
+
+    async def _aping(self, client: AsyncOpenAI, http_client: DefaultAsyncHttpxClient) -> bool:
+        try:
+            await http_client.get(f"{client.base_url}models", headers=client.auth_headers)
+        except Exception as e:
+            logger.warning(f"Connection warm-up failed: {e!s}")
+            return False
+        return True
+
+
+def resolve_base_url(base_url: Optional[str]) -> str:
+    """Return the base URL a client would use, honouring the OPENAI_BASE_URL environment variable."""
+    return (base_url or os.environ.get("OPENAI_BASE_URL") or DEFAULT_OPENAI_BASE_URL).rstrip("/")
+
+
+def fingerprint(api_key: str) -> str:
+    # Keep the keys themselves out of long-lived dictionary keys.
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+clients = ClientRegistry()
@@ -0,0 +1,181 @@
+import asyncio
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Union
+
+
+@dataclass
+class BatchResult:
+    """The outcome of one item of a batch call.
+
+    Attributes:
+        index (int): Position of the item in the caller's input.
+        value (Any): The value returned for the item, None if it failed.
+        error (Optional[BaseException]): The exception raised for the item, None if it succeeded.
+    """
+
+    index: int
+    value: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _validate_concurrency(max_concurrency: int) -> None:
+    if max_concurrency < 1:
+        error_message = f"max_concurrency must be at least 1, got {max_concurrency}."
+        raise ValueError(error_message)
+
+
+def run_bounded_as_completed(
+    func: Callable[..., Any], items: Iterable[Any], max_concurrency: int = 8
+) -> Iterator[BatchResult]:
+    """
+    Call func on every item using at most max_concurrency worker threads and yield results as they complete.
+
+    Items are pulled from the iterable lazily so arbitrarily long inputs never have more than
+    max_concurrency calls in flight. Exceptions are captured on the result rather than raised.
+
+    Args:
+        func (Callable[..., Any]): The function to call with each item.
+        items (Iterable[Any]): The inputs.
+        max_concurrency (int): The maximum number of concurrent calls.
+
+    Yields:
+        BatchResult: One result per item, in completion order.
+    """
+    _validate_concurrency(max_concurrency)
+    iterator = enumerate(items)
+    in_flight: dict[Future, int] = {}
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+
+        def submit_next() -> bool:
+            try:
+                index, item = next(iterator)
+            except StopIteration:
+                return False
+            in_flight[executor.submit(func, item)] = index
+            return True
+
+        while len(in_flight) < max_concurrency and submit_next():
+            pass
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = in_flight.pop(future)
+                error = future.exception()
+                yield BatchResult(index, None if error else future.result(), error)
+                submit_next()
+
+
+def run_bounded(func: Callable[..., Any], items: Iterable[Any], max_concurrency: int = 8) -> list[BatchResult]:
+    """
+    Call func on every item using at most max_concurrency worker threads.
+
+    Args:
+        func (Callable[..., Any]): The function to call with each item.
+        items (Iterable[Any]): The inputs.
+        max_concurrency (int): The maximum number of concurrent calls.
+
+    Returns:
+        list[BatchResult]: One result per item, in input order.
+    """
+    results = list(run_bounded_as_completed(func, items, max_concurrency))
+    results.sort(key=lambda result: result.index)
+    return results
+
+
+async def iterate_in_thread(items: Iterable[Any]) -> AsyncIterator[Any]:
+    """
+    Iterate a blocking iterable in a worker thread, one item at a time.
+
+    Useful for generators that read files or decode data lazily, whose every step would otherwise block
+    the event loop.
+
+    Args:
+        items (Iterable[Any]): The iterable to consume.
+
+    Yields:
+        Any: The items, in order.
+    """
+    iterator = iter(items)
+    done = object()
+    while True:
+        item = await asyncio.to_thread(next, iterator, done)
+        if item is done:
+            return
+        yield item
+
+
+async def arun_bounded_as_completed(
+    func: Callable[..., Awaitable[Any]],
+    items: Union[Iterable[Any], AsyncIterable[Any]],
+    max_concurrency: int = 8,
+) -> AsyncIterator[BatchResult]:
+    """
+    Await func on every item with at most max_concurrency calls in flight and yield results as they complete.
+
+    Items are pulled lazily, from an asynchronous iterable too, so producing them overlaps the calls.
+
+    Args:
+        func (Callable[..., Awaitable[Any]]): The coroutine function to await with each item.
+        items (Union[Iterable[Any], AsyncIterable[Any]]): The inputs.
+        max_concurrency (int): The maximum number of concurrent calls.
+
+    Yields:
+        BatchResult: One result per item, in completion order.
+    """
+    _validate_concurrency(max_concurrency)
+    iterator = items.__aiter__() if isinstance(items, AsyncIterable) else iter(items)
+    index = 0
+    in_flight: dict[asyncio.Task, int] = {}
+
+    async def submit_next() -> bool:
+        nonlocal index
+        try:
+            item = await iterator.__anext__() if isinstance(iterator, AsyncIterator) else next(iterator)
+        except (StopIteration, StopAsyncIteration):
+            return False
+        in_flight[asyncio.ensure_future(func(item))] = index
+        index += 1
+        return True
+
+    try:
+        while len(in_flight) < max_concurrency and await submit_next():
+            pass
+
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                error = task.exception()
+                yield BatchResult(in_flight.pop(task), None if error else task.result(), error)
+                await submit_next()
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+
+async def arun_bounded(
+    func: Callable[..., Awaitable[Any]],
+    items: Union[Iterable[Any], AsyncIterable[Any]],
+    max_concurrency: int = 8,
+) -> list[BatchResult]:
+    """
+    Await func on every item with at most max_concurrency calls in flight.
+
+    Args:
+        func (Callable[..., Awaitable[Any]]): The coroutine function to await with each item.
+        items (Union[Iterable[Any], AsyncIterable[Any]]): The inputs.
+        max_concurrency (int): The maximum number of concurrent calls.
+
+    Returns:
+        list[BatchResult]: One result per item, in input order.
+    """
+    results = [result async for result in arun_bounded_as_completed(func, items, max_concurrency)]
+    results.sort(key=lambda result: result.index)
+    return results
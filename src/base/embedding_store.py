@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Sequence
+from typing import Optional
+
+import numpy as np
+
+KEY_SIZE = 16
+
+
+class EmbeddingStore:
+    def __init__(self, path: str, dimensions: Optional[int] = None) -> None:
+        """
+        A persistent embedding cache backed by an append-only, memory-mapped float32 file.
+
+        Each stored vector is addressed by a hash of its text and the namespace (usually the embedding model)
+        it was produced with. Row i of the vector file belongs to key i of the key file, so the index is just
+        the list of 16-byte key digests and is rebuilt on open. Vectors are served straight from the
+        memory map, so the store can grow beyond RAM.
+
+        Args:
+            path (str): Directory holding the store. It is created if missing.
+            dimensions (Optional[int]): The vector size. Inferred from the first vectors added when None.
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._keys_path = os.path.join(path, "keys.bin")
+        self._meta_path = os.path.join(path, "meta.json")
+        self._lock = threading.Lock()
+
+        self.dimensions = self._load_dimensions(dimensions)
+        self._index: dict[bytes, int] = {}
+        self._rows = 0
+        self._vectors: Optional[np.memmap] = None
+        self._load_index()
+
+    @staticmethod
+    def key(text: str, namespace: str) -> bytes:
+        """Return the digest under which the embedding of text in namespace is stored."""
+        return hashlib.blake2b(f"{namespace}\0{text}".encode(), digest_size=KEY_SIZE).digest()
+
+    def __len__(self) -> int:
+        return self._rows
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """A read-only (rows, dimensions) view of every stored vector, mapped from disk."""
+        with self._lock:
+            return self._mapped_vectors()
+
+    def get(self, text: str, namespace: str) -> Optional[np.ndarray]:
+        """
+        Retrieve one stored vector without copying it.
+
+        Args:
+            text (str): The embedded text.
+            namespace (str): The namespace the vector was stored under.
+
+        Returns:
+            Optional[np.ndarray]: A read-only view of the vector, or None if it is not stored.
+        """
+        with self._lock:
+            row = self._index.get(self.key(text, namespace))
+            if row is None:
+                return None
+            vector: np.ndarray = self._mapped_vectors()[row]
+            return vector
+
+    def lookup(self, texts: Sequence[str], namespace: str) -> tuple[np.ndarray, list[int]]:
+        """
+        Find the stored rows for many texts.
+
+        Args:
+            texts (Sequence[str]): The texts to look up.
+            namespace (str): The namespace the vectors were stored under.
+
+        Returns:
+            tuple[np.ndarray, list[int]]: The row of every text in `vectors`, -1 where it is missing,
+                and the positions of the missing texts.
+        """
+        rows = np.full(len(texts), -1, dtype=np.int64)
+        missing: list[int] = []
+        with self._lock:
+            for position, text in enumerate(texts):
+                row = self._index.get(self.key(text, namespace))
+                if row is None:
+                    missing.append(position)
+                else:
+                    rows[position] = row
+        return rows, missing
+
+    def add(self, texts: Sequence[str], namespace: str, vectors: np.ndarray) -> None:
+        """
+        Append vectors to the store. Texts that are already stored are skipped.
+
+        Args:
+            texts (Sequence[str]): The embedded texts.
+            namespace (str): The namespace to store the vectors under.
+            vectors (np.ndarray): One row per text.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape != (len(texts), *vectors.shape[-1:]):
+            error_message = "vectors must be a matrix with one row per text."
+            raise ValueError(error_message)
+
+        with self._lock:
+            if self.dimensions is None:
+                self.dimensions = vectors.shape[1]
+                with open(self._meta_path, "w") as meta_file:
+                    json.dump({"dimensions": self.dimensions}, meta_file)
+            elif vectors.shape[1] != self.dimensions:
+                error_message = f"Expected vectors of size {self.dimensions}, got {vectors.shape[1]}."
+                raise ValueError(error_message)
+
+            new_keys: dict[bytes, int] = {}
+            for position, text in enumerate(texts):
+                key = self.key(text, namespace)
+                if key not in self._index and key not in new_keys:
+                    new_keys[key] = position
+            if not new_keys:
+                return
+
+            # Vectors go first so a crash between the two writes never leaves a key without its vector.
+            with open(self._vectors_path, "ab") as vectors_file:
+                vectors_file.write(np.ascontiguousarray(vectors[list(new_keys.values())]).tobytes())
+            with open(self._keys_path, "ab") as keys_file:
+                keys_file.write(b"".join(new_keys))
+
+            for row, key in enumerate(new_keys, start=self._rows):
+                self._index[key] = row
+            self._rows += len(new_keys)
+            self._vectors = None
+
+    def _load_dimensions(self, dimensions: Optional[int]) -> Optional[int]:
+        if not os.path.exists(self._meta_path):
+            if dimensions is not None:
+                with open(self._meta_path, "w") as meta_file:
+                    json.dump({"dimensions": dimensions}, meta_file)
+            return dimensions
+
+        with open(self._meta_path) as meta_file:
+            stored: int = json.load(meta_file)["dimensions"]
+        if dimensions is not None and dimensions != stored:
+            error_message = f"Store at {self.path} holds vectors of size {stored}, not {dimensions}."
+            raise ValueError(error_message)
+        return stored
+
+    def _load_index(self) -> None:
+        if self.dimensions is None or not os.path.exists(self._keys_path):
+            return
+
+        with open(self._keys_path, "rb") as keys_file:
+            keys = keys_file.read()
+        vector_rows = os.path.getsize(self._vectors_path) // (4 * self.dimensions)
+        # Drop a partially written tail left by an interrupted append.
+        rows = min(len(keys) // KEY_SIZE, vector_rows)
+        if rows * KEY_SIZE != len(keys) or rows != vector_rows:
+            with open(self._keys_path, "r+b") as keys_file:
+                keys_file.truncate(rows * KEY_SIZE)
+            with open(self._vectors_path, "r+b") as vectors_file:
+                vectors_file.truncate(rows * 4 * self.dimensions)
+
+        self._index = {keys[row * KEY_SIZE : (row + 1) * KEY_SIZE]: row for row in range(rows)}
+        self._rows = rows
+
+    def _mapped_vectors(self) -> np.ndarray:
+        if self._rows == 0 or self.dimensions is None:
+            return np.empty((0, self.dimensions or 0), dtype=np.float32)
+        if self._vectors is None:
+            self._vectors = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r", shape=(self._rows, self.dimensions)
+            )
+        return self._vectors
@@ -0,0 +1,435 @@
+"""A local OpenAI-compatible server for end-to-end and load testing without network access or a real key."""
+
+import email.parser
+import email.policy
+import hashlib
+import itertools
+import json
+import math
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Optional
+
+# Roughly what a 128 kbit/s MP3 takes per second, used to estimate the duration of uploaded audio.
+MP3_BYTES_PER_SECOND = 16000
+
+
+@dataclass(frozen=True)
+class Latency:
+    """
+    A lognormal response latency, the usual shape of API latencies: most calls are near the median
+    with a long tail of slow ones.
+
+    Attributes:
+        median (float): The median latency in seconds. 0 responds immediately.
+        sigma (float): The spread of the tail. 0 always waits exactly the median.
+    """
+
+    median: float = 0.0
+    sigma: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.median <= 0:
+            return 0.0
+        if self.sigma <= 0:
+            return self.median
+        return rng.lognormvariate(math.log(self.median), self.sigma)
+
+
+@dataclass
+class FakeServerSettings:
+    """
+    How the fake server behaves.
+
+    Attributes:
+        latency (Latency): The latency of every endpoint without its own entry in `endpoint_latency`.
+        endpoint_latency (dict[str, Latency]): Latencies by path, such as "/v1/chat/completions".
+        model_latency (dict[str, Latency]): Latencies by requested model, taking precedence over the path.
+        stream_interval (float): Seconds between streamed chat chunks.
+        error_rate (float): The fraction of requests that fail with a 500.
+        rate_limit_rate (float): The fraction of requests that are rejected with a 429.
+        retry_after (float): The retry-after header sent with injected 429s.
+        polls_until_complete (int): The number of times a batch is polled before it completes.
+        seed (Optional[int]): Seeds latency and error sampling for reproducible runs.
+    """
+
+    latency: Latency = field(default_factory=Latency)
+    endpoint_latency: dict[str, Latency] = field(default_factory=dict)
+    model_latency: dict[str, Latency] = field(default_factory=dict)
+    stream_interval: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 0.0
+    polls_until_complete: int = 1
+    seed: Optional[int] = None
+
+
+def count_tokens(text: Any) -> int:
+    # The same four characters per token estimate the backends use.
+    return len(str(text)) // 4 + 1
+
+
+def error_body(message: str, error_type: str, code: Optional[str] = None) -> dict[str, Any]:
+    return {"error": {"message": message, "type": error_type, "param": None, "code": code}}
+
+
+def chat_response(body: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+    last_message = body["messages"][-1]["content"]
+    if last_message == "fail":
+        return 400, error_body("Invalid request", "invalid_request_error")
+    # Asked for JSON, the fake replies with the last message verbatim, so tests can send the JSON they expect back.
+    wants_json = body.get("response_format", {}).get("type") in ("json_object", "json_schema")
+    reply = last_message if wants_json else f"echo: {last_message}"
+    prompt_tokens = sum(count_tokens(message.get("content", "")) for message in body["messages"])
+    completion_tokens = count_tokens(reply)
+    return 200, {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": 0,
+        "model": body["model"],
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def chat_stream_chunks(body: dict[str, Any]) -> list[dict[str, Any]]:
+    """Split a chat completion into the chunks the streaming endpoint sends."""
+    _, response = chat_response(body)
+    reply = response["choices"][0]["message"]["content"]
+
+    def chunk(delta: dict[str, Any], finish_reason: Optional[str] = None) -> dict[str, Any]:
+        return {
+            "id": response["id"],
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+
+    words = reply.split(" ")
+    chunks = [chunk({"role": "assistant", "content": ""})]
+    chunks += [chunk({"content": word if i == 0 else f" {word}"}) for i, word in enumerate(words)]
+    chunks.append(chunk({}, "stop"))
+    if body.get("stream_options", {}).get("include_usage"):
+        chunks.append({**chunk({}), "choices": [], "usage": response["usage"]})
+    return chunks
+
+
+def embedding_response(body: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+    inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+    prompt_tokens = sum(count_tokens(text) for text in inputs)
+    return 200, {
+        "object": "list",
+        "model": body["model"],
+        "data": [
+            {"object": "embedding", "index": index, "embedding": [float(len(text)), 1.0]}
+            for index, text in enumerate(inputs)
+        ],
+        "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens},
+    }
+
+
+def image_response(body: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+    digest = hashlib.sha256(body["prompt"].encode("utf-8")).hexdigest()[:16]
+    images = []
+    for i in range(body.get("n", 1)):
+        if body.get("response_format") == "b64_json":
+            images.append({"b64_json": "iVBORw0KGgo=", "revised_prompt": body["prompt"]})
+        else:
+            images.append({"url": f"https://images.invalid/{digest}-{i}.png", "revised_prompt": body["prompt"]})
+    return 200, {"created": 0, "data": images}
+
+
+def transcription_response(audio: bytes, response_format: str) -> tuple[int, Any]:
+    duration = len(audio) / MP3_BYTES_PER_SECOND
+    text = f"Transcribed {len(audio)} bytes of audio."
+    if response_format == "text":
+        return 200, text
+    if response_format != "verbose_json":
+        return 200, {"text": text}
+    return 200, {
+        "task": "transcribe",
+        "language": "english",
+        "duration": duration,
+        "text": text,
+        "segments": [
+            {
+                "id": 0,
+                "seek": 0,
+                "start": 0.0,
+                "end": duration,
+                "text": text,
+                "tokens": [],
+                "temperature": 0.0,
+                "avg_logprob": 0.0,
+                "compression_ratio": 1.0,
+                "no_speech_prob": 0.0,
+            }
+        ],
+    }
+
+
+def speech_response(body: dict[str, Any]) -> bytes:
+    # An MP3-looking payload whose size grows with the input, like real speech.
+    return b"ID3" + bytes(len(body["input"]) * 100)
+
+
+HANDLERS: dict[str, Callable[[dict[str, Any]], tuple[int, Any]]] = {
+    "/v1/chat/completions": chat_response,
+    "/v1/embeddings": embedding_response,
+    "/v1/images/generations": image_response,
+}
+
+
+class FakeOpenAIState:
+    def __init__(self, settings: Optional[FakeServerSettings] = None) -> None:
+        """Everything the fake server has received and stored, plus its failure schedule."""
+        self.settings = settings or FakeServerSettings()
+        self.files: dict[str, dict[str, Any]] = {}
+        self.batches: dict[str, dict[str, Any]] = {}
+        self.polls: dict[str, int] = {}
+        self.requests: list[tuple[str, str, Optional[str]]] = []
+        self.ids = itertools.count()
+        self.lock = threading.Lock()
+        self.rng = random.Random(self.settings.seed)  # noqa: S311
+        self.scheduled_failures: deque[int] = deque()
+
+    def fail_next(self, status_code: int, count: int = 1) -> None:
+        """Fail the next `count` API requests with the given status, such as 429 or 500."""
+        with self.lock:
+            self.scheduled_failures.extend([status_code] * count)
+
+    def injected_failure(self, path: str, model: Optional[str] = None) -> tuple[Optional[int], float]:
+        """Return the status to fail a request with, if any, and how long to wait before responding."""
+        with self.lock:
+            distribution = self.settings.model_latency.get(model or "") or self.settings.endpoint_latency.get(
+                path, self.settings.latency
+            )
+            latency = distribution.sample(self.rng)
+            if self.scheduled_failures:
+                return self.scheduled_failures.popleft(), latency
+            roll = self.rng.random()
+            if roll < self.settings.rate_limit_rate:
+                return HTTPStatus.TOO_MANY_REQUESTS, latency
+            if roll < self.settings.rate_limit_rate + self.settings.error_rate:
+                return HTTPStatus.INTERNAL_SERVER_ERROR, latency
+            return None, latency
+
+    def add_file(self, content: bytes, purpose: str) -> dict[str, Any]:
+        file_id = f"file-{next(self.ids)}"
+        self.files[file_id] = {"content": content, "purpose": purpose}
+        return {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": 0,
+            "filename": "batch.jsonl",
+            "purpose": purpose,
+            "status": "processed",
+        }
+
+    def create_batch(self, request: dict[str, Any]) -> dict[str, Any]:
+        batch_id = f"batch-{next(self.ids)}"
+        self.batches[batch_id] = {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": request["endpoint"],
+            "input_file_id": request["input_file_id"],
+            "completion_window": request["completion_window"],
+            "created_at": 0,
+            "status": "validating",
+            "output_file_id": None,
+            "error_file_id": None,
+        }
+        self.polls[batch_id] = 0
+        return self.batches[batch_id]
+
+    def retrieve_batch(self, batch_id: str) -> dict[str, Any]:
+        batch = self.batches[batch_id]
+        self.polls[batch_id] += 1
+        if batch["status"] != "completed" and self.polls[batch_id] > self.settings.polls_until_complete:
+            self.process(batch)
+        elif batch["status"] == "validating":
+            batch["status"] = "in_progress"
+        return batch
+
+    def process(self, batch: dict[str, Any]) -> None:
+        outputs: list[str] = []
+        errors: list[str] = []
+        for line in self.files[batch["input_file_id"]]["content"].decode().splitlines():
+            request = json.loads(line)
+            status_code, body = HANDLERS[request["url"]](request["body"])
+            record = {
+                "id": f"batch-req-{next(self.ids)}",
+                "custom_id": request["custom_id"],
+                "response": {"status_code": status_code, "request_id": "req", "body": body},
+                "error": None,
+            }
+            (outputs if status_code == HTTPStatus.OK else errors).append(json.dumps(record))
+        # Results come back out of order, as the real endpoint does not guarantee ordering.
+        outputs.reverse()
+        if outputs:
+            batch["output_file_id"] = self.add_file("\n".join(outputs).encode(), "batch_output")["id"]
+        if errors:
+            batch["error_file_id"] = self.add_file("\n".join(errors).encode(), "batch_output")["id"]
+        batch["status"] = "completed"
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    # Keep connections alive between requests, as the SDK's connection pool expects.
+    protocol_version = "HTTP/1.1"
+    state: FakeOpenAIState
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.state.lock:
+            self.state.requests.append(("POST", self.path, self.headers.get("Authorization")))
+            if self.path == "/v1/files":
+                content, purpose = self.parse_upload(body)
+                self.send_json(200, self.state.add_file(content, purpose))
+                return
+            if self.path == "/v1/batches":
+                self.send_json(200, self.state.create_batch(json.loads(body)))
+                return
+
+        if self.path not in (*HANDLERS, "/v1/audio/transcriptions", "/v1/audio/speech"):
+            self.send_json(404, error_body(f"Unknown path {self.path}", "invalid_request_error"))
+            return
+
+        # API calls are served outside the lock, so concurrent requests overlap as they would against the real API.
+        model = json.loads(body).get("model") if self.path in HANDLERS or self.path == "/v1/audio/speech" else None
+        failure, latency = self.state.injected_failure(self.path, model)
+        time.sleep(latency)
+        if failure == HTTPStatus.TOO_MANY_REQUESTS:
+            self.send_json(
+                failure,
+                error_body("Rate limit reached", "requests", "rate_limit_exceeded"),
+                {"retry-after": str(self.state.settings.retry_after)},
+            )
+        elif failure is not None:
+            self.send_json(failure, error_body("Injected server error", "server_error"))
+        elif self.path == "/v1/audio/transcriptions":
+            fields = self.parse_multipart(body)
+            response_format = fields["response_format"].get_content().strip() if "response_format" in fields else "json"
+            status, payload = transcription_response(fields["file"].get_payload(decode=True), response_format)
+            if isinstance(payload, str):
+                self.send_bytes(status, payload.encode(), "text/plain")
+            else:
+                self.send_json(status, payload)
+        elif self.path == "/v1/audio/speech":
+            self.send_bytes(200, speech_response(json.loads(body)), "audio/mpeg")
+        else:
+            request = json.loads(body)
+            if self.path == "/v1/chat/completions" and request.get("stream"):
+                self.send_stream(chat_stream_chunks(request))
+            else:
+                self.send_json(*HANDLERS[self.path](request))
+
+    def do_GET(self) -> None:
+        with self.state.lock:
+            self.state.requests.append(("GET", self.path, self.headers.get("Authorization")))
+            resource, _, identifier = self.path.rpartition("/")
+            if self.path == "/v1/models":
+                self.send_json(200, {"object": "list", "data": []})
+            elif resource == "/v1/batches":
+                self.send_json(200, self.state.retrieve_batch(identifier))
+            elif identifier == "content" and resource.startswith("/v1/files/"):
+                self.send_bytes(200, self.state.files[resource.rpartition("/")[2]]["content"])
+            else:
+                self.send_json(404, error_body(f"Unknown path {self.path}", "invalid_request_error"))
+
+    def parse_multipart(self, body: bytes) -> dict[str, Any]:
+        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode()
+        message: Any = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(header + body)
+        return {part.get_param("name", header="content-disposition"): part for part in message.iter_parts()}
+
+    def parse_upload(self, body: bytes) -> tuple[bytes, str]:
+        fields = self.parse_multipart(body)
+        return fields["file"].get_payload(decode=True), fields["purpose"].get_content().strip()
+
+    def send_json(self, status: int, payload: Any, headers: Optional[dict[str, str]] = None) -> None:
+        self.send_bytes(status, json.dumps(payload).encode(), "application/json", headers)
+
+    def send_bytes(
+        self,
+        status: int,
+        payload: bytes,
+        content_type: str = "application/octet-stream",
+        headers: Optional[dict[str, str]] = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_stream(self, chunks: list[dict[str, Any]]) -> None:
+        """Send server-sent events with chunked transfer encoding, pausing between chunks."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        events = [f"data: {json.dumps(chunk)}\n\n".encode() for chunk in chunks] + [b"data: [DONE]\n\n"]
+        for i, event in enumerate(events):
+            if i and self.state.settings.stream_interval:
+                time.sleep(self.state.settings.stream_interval)
+            self.wfile.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class _ThreadingServer(ThreadingHTTPServer):
+    # The default backlog of 5 drops connection attempts under load, which shows up as one second SYN retries.
+    request_queue_size = 1024
+
+
+class FakeOpenAIServer:
+    def __init__(self, settings: Optional[FakeServerSettings] = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        """
+        A fake OpenAI API served from a background thread.
+
+        Implements chat completions (including streaming), embeddings, image generation, audio transcription and
+        speech, plus the files and batches endpoints. Use it as a context manager, or call start() and stop().
+
+        Args:
+            settings (Optional[FakeServerSettings]): Latency, error injection and batch behaviour.
+            host (str): The interface to listen on.
+            port (int): The port to listen on. 0 picks a free port.
+        """
+        self.state = FakeOpenAIState(settings)
+        handler = type("Handler", (FakeOpenAIHandler,), {"state": self.state})
+        self.server = _ThreadingServer((host, port), handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host!s}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
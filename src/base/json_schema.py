@@ -0,0 +1,153 @@
+import re
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Optional
+
+from base.json_stream import WILDCARD, PathKey
+
+_TYPE_CHECKS: dict[str, Callable[[Any], bool]] = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+}
+
+
+class SchemaValidationError(ValueError):
+    def __init__(self, path: Sequence[PathKey], message: str) -> None:
+        """
+        A value that does not match its JSON schema.
+
+        Args:
+            path (Sequence[PathKey]): Where the value is in the document.
+            message (str): What is wrong with it.
+        """
+        self.path = tuple(path)
+        location = "/".join(str(key) for key in self.path) or "<root>"
+        super().__init__(f"{location}: {message}")
+
+
+def schema_at(schema: Mapping[str, Any], path: Sequence[PathKey]) -> Optional[Mapping[str, Any]]:
+    """
+    Return the schema of the value at a path, or None if the schema does not describe it.
+
+    A wildcard in the path stands for any element of an array or any field of an object.
+    """
+    current: Optional[Mapping[str, Any]] = _resolve(schema, schema)
+    for key in path:
+        if current is None:
+            return None
+        if isinstance(key, int) or (key == WILDCARD and "items" in current):
+            child = current.get("items")
+        else:
+            properties = current.get("properties", {})
+            additional = current.get("additionalProperties")
+            child = properties.get(key, additional if isinstance(additional, Mapping) else None)
+        current = _resolve(schema, child) if isinstance(child, Mapping) else None
+    return current
+
+
+def validate(
+    value: Any,
+    schema: Mapping[str, Any],
+    root: Optional[Mapping[str, Any]] = None,
+    path: Sequence[PathKey] = (),
+    skip: Optional[Callable[[tuple[PathKey, ...]], bool]] = None,
+) -> None:
+    """
+    Check a value against the subset of JSON Schema that structured outputs accept.
+
+    Supported keywords are type, enum, const, properties, required, additionalProperties, items, anyOf,
+    minItems, maxItems, minimum, maximum, pattern and local $ref into $defs or definitions.
+
+    Args:
+        value (Any): The decoded JSON value.
+        schema (Mapping[str, Any]): The schema of the value.
+        root (Optional[Mapping[str, Any]]): The document schema that $ref points into. Defaults to `schema`.
+        path (Sequence[PathKey]): Where the value is in the document, for error messages.
+        skip (Optional[Callable[[tuple[PathKey, ...]], bool]]): Returns True for paths already validated.
+
+    Raises:
+        SchemaValidationError: If the value does not match.
+    """
+    root = root if root is not None else schema
+    path = tuple(path)
+    if skip is not None and path and skip(path):
+        return
+    schema = _resolve(root, schema)
+
+    if "anyOf" in schema:
+        for option in schema["anyOf"]:
+            try:
+                validate(value, option, root, path, skip)
+            except SchemaValidationError:
+                continue
+            break
+        else:
+            raise SchemaValidationError(path, "matches none of the anyOf schemas")
+
+    expected = schema.get("type")
+    if expected is not None:
+        types = [expected] if isinstance(expected, str) else list(expected)
+        if not any(_TYPE_CHECKS.get(name, lambda _: True)(value) for name in types):
+            raise SchemaValidationError(path, f"expected {' or '.join(types)}, got {type(value).__name__}")
+    if "enum" in schema and value not in schema["enum"]:
+        raise SchemaValidationError(path, f"{value!r} is not one of {schema['enum']!r}")
+    if "const" in schema and value != schema["const"]:
+        raise SchemaValidationError(path, f"expected {schema['const']!r}")
+
+    if isinstance(value, dict):
+        _validate_object(value, schema, root, path, skip)
+    elif isinstance(value, list):
+        if len(value) < schema.get("minItems", 0):
+            raise SchemaValidationError(path, f"expected at least {schema['minItems']} items")
+        if "maxItems" in schema and len(value) > schema["maxItems"]:
+            raise SchemaValidationError(path, f"expected at most {schema['maxItems']} items")
+        if "items" in schema:
+            for index, item in enumerate(value):
+                validate(item, schema["items"], root, (*path, index), skip)
+    elif isinstance(value, str):
+        if "pattern" in schema and re.search(schema["pattern"], value) is None:
+            raise SchemaValidationError(path, f"does not match {schema['pattern']!r}")
+    elif _TYPE_CHECKS["number"](value):
+        if "minimum" in schema and value < schema["minimum"]:
+            raise SchemaValidationError(path, f"{value} is below the minimum {schema['minimum']}")
+        if "maximum" in schema and value > schema["maximum"]:
+            raise SchemaValidationError(path, f"{value} is above the maximum {schema['maximum']}")
+
+
+def _validate_object(
+    value: dict,
+    schema: Mapping[str, Any],
+    root: Mapping[str, Any],
+    path: tuple[PathKey, ...],
+    skip: Optional[Callable[[tuple[PathKey, ...]], bool]],
+) -> None:
+    for key in schema.get("required", ()):
+        if key not in value:
+            raise SchemaValidationError(path, f"missing required field {key!r}")
+    properties = schema.get("properties", {})
+    additional = schema.get("additionalProperties", True)
+    for key, item in value.items():
+        if key in properties:
+            validate(item, properties[key], root, (*path, key), skip)
+        elif additional is False:
+            raise SchemaValidationError(path, f"unexpected field {key!r}")
+        elif isinstance(additional, Mapping):
+            validate(item, additional, root, (*path, key), skip)
+
+
+def _resolve(root: Mapping[str, Any], schema: Mapping[str, Any]) -> Mapping[str, Any]:
+    # Only local references such as "#/$defs/Record" are followed; structured outputs allow no others.
+    while "$ref" in schema:
+        reference = schema["$ref"]
+        if not reference.startswith("#/"):
+            error_message = f"Only local schema references are supported, got {reference!r}."
+            raise ValueError(error_message)
+        target: Any = root
+        for part in reference[2:].split("/"):
+            target = target[part.replace("~1", "/").replace("~0", "~")]
+        schema = target
+    return schema
@@ -0,0 +1,202 @@
+import json
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, Optional, Union
+
+PathKey = Union[str, int]
+
+# Matches any object key or array index in an item path.
+WILDCARD = "*"
+
+_STRING_SPECIAL = re.compile(r'["\\]')
+_SCALAR_REST = re.compile(r'[^\s{}\[\],:"]*')
+
+
+def path_matches(pattern: Sequence[PathKey], path: Sequence[PathKey]) -> bool:
+    """Return True if a path matches an item path, where "*" matches any key or index."""
+    return len(pattern) == len(path) and all(expected in (WILDCARD, key) for expected, key in zip(pattern, path))
+
+
+@dataclass(frozen=True)
+class JsonEvent:
+    """
+    A value that finished arriving.
+
+    Attributes:
+        path (tuple[PathKey, ...]): Object keys and array indexes leading to the value from the document root.
+        value (Any): The decoded value.
+    """
+
+    path: tuple[PathKey, ...]
+    value: Any
+
+
+class _Frame:
+    __slots__ = ("expect_key", "index", "is_object", "key")
+
+    def __init__(self, *, is_object: bool) -> None:
+        self.is_object = is_object
+        self.expect_key = is_object
+        self.key: Optional[str] = None
+        self.index = 0
+
+    @property
+    def position(self) -> PathKey:
+        return (self.key or "") if self.is_object else self.index
+
+
+class JsonStreamParser:
+    def __init__(self, item_path: Sequence[PathKey] = (WILDCARD,)) -> None:
+        """
+        Parses a JSON document as it arrives and emits values as soon as they are complete.
+
+        Values are emitted when their path matches `item_path`, where "*" matches any key or index.
+        The default emits every element of a top-level array, or every field of a top-level object;
+        ("records", "*") emits the elements of the "records" array one by one.
+
+        Each character is scanned once and each emitted value decoded once. Only the text of the value
+        being collected is kept for scanning, so parsing costs time linear in the document length.
+
+        Args:
+            item_path (Sequence[PathKey]): The path of the values to emit.
+        """
+        self.item_path = tuple(item_path)
+        self.value: Any = None
+        self._chunks: list[str] = []
+        self._window = ""
+        self._base = 0
+        self._pos = 0
+        self._stack: list[_Frame] = []
+        self._item_start: Optional[int] = None
+        self._string_start: Optional[int] = None
+        self._string_is_key = False
+        self._scalar_start: Optional[int] = None
+        self._closed = False
+
+    def feed(self, text: str) -> list[JsonEvent]:
+        """Add the next piece of the document and return the values it completed."""
+        if self._closed:
+            error_message = "The parser has been closed."
+            raise ValueError(error_message)
+        self._chunks.append(text)
+        self._window += text
+        events: list[JsonEvent] = []
+        self._scan(events)
+
+        # Drop the text nothing will be decoded from again.
+        keep = min(
+            start
+            for start in (self._item_start, self._string_start if self._string_is_key else None, self._pos)
+            if start is not None
+        )
+        self._window = self._window[keep - self._base :]
+        self._base = keep
+        return events
+
+    def close(self) -> list[JsonEvent]:
+        """
+        Finish the document, returning any value that only its end completes, and decode it into `value`.
+
+        Raises:
+            ValueError: If the document is incomplete or not valid JSON.
+        """
+        events: list[JsonEvent] = []
+        if self._scalar_start is not None:
+            self._complete(self._base + len(self._window), events)
+            self._scalar_start = None
+        self._closed = True
+        self.value = json.loads("".join(self._chunks))
+        return events
+
+    def _scan(self, events: list[JsonEvent]) -> None:
+        window, base = self._window, self._base
+        end = base + len(window)
+        pos = self._pos
+        while pos < end:
+            if self._string_start is not None:
+                match = _STRING_SPECIAL.search(window, pos - base)
+                if match is None:
+                    pos = end
+                    break
+                special = match.start() + base
+                if match.group() == "\\":
+                    if special + 1 >= end:
+                        # The escaped character has not arrived; look at the backslash again next time.
+                        pos = special
+                        break
+                    pos = special + 2
+                    continue
+                pos = special + 1
+                self._end_string(pos, events)
+                continue
+
+            if self._scalar_start is not None:
+                scalar_end = _SCALAR_REST.match(window, pos - base)
+                pos = (scalar_end.end() if scalar_end is not None else pos - base) + base
+                if pos == end:
+                    # A number such as 12 may continue as 123 in the next piece.
+                    break
+                self._complete(pos, events)
+                self._scalar_start = None
+                continue
+
+            char = window[pos - base]
+            if char in " \t\r\n":
+                pos += 1
+            elif char in "{[":
+                self._start_value(pos)
+                self._stack.append(_Frame(is_object=char == "{"))
+                pos += 1
+            elif char in "}]":
+                if not self._stack:
+                    error_message = f"Unexpected {char!r} at offset {pos}."
+                    raise ValueError(error_message)
+                self._stack.pop()
+                pos += 1
+                self._complete(pos, events)
+            elif char == ",":
+                if self._stack:
+                    frame = self._stack[-1]
+                    if frame.is_object:
+                        frame.expect_key = True
+                    else:
+                        frame.index += 1
+                pos += 1
+            elif char == ":":
+                pos += 1
+            elif char == '"':
+                self._string_is_key = bool(self._stack) and self._stack[-1].expect_key
+                if not self._string_is_key:
+                    self._start_value(pos)
+                self._string_start = pos
+                pos += 1
+            else:
+                self._start_value(pos)
+                self._scalar_start = pos
+        self._pos = pos
+
+    def _end_string(self, end: int, events: list[JsonEvent]) -> None:
+        start = self._string_start
+        self._string_start = None
+        if self._string_is_key and start is not None:
+            frame = self._stack[-1]
+            frame.key = json.loads(self._window[start - self._base : end - self._base])
+            frame.expect_key = False
+            self._string_is_key = False
+        else:
+            self._complete(end, events)
+
+    def _start_value(self, pos: int) -> None:
+        if len(self._stack) == len(self.item_path) and path_matches(
+            self.item_path, [frame.position for frame in self._stack]
+        ):
+            self._item_start = pos
+
+    def _complete(self, end: int, events: list[JsonEvent]) -> None:
+        # Values inside an item are deeper than the item, so a value completing at the item's depth is the item.
+        if self._item_start is None or len(self._stack) != len(self.item_path):
+            return
+        text = self._window[self._item_start - self._base : end - self._base]
+        self._item_start = None
+        events.append(JsonEvent(tuple(frame.position for frame in self._stack), json.loads(text)))
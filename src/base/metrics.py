@@ -0,0 +1,360 @@
+import bisect
+import io
+import json
+import threading
+import time
+from collections.abc import Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Optional, Protocol
+
+DEFAULT_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+@dataclass
+class CallRecord:
+    """
+    One call to a provider, as reported to metrics hooks.
+
+    Attributes:
+        backend (str): The backend that made the call, such as "openai".
+        service (str): The service called, such as "chat" or "transcription".
+        model (str): The model the call was made with.
+        latency (float): Wall-clock seconds the call took.
+        prompt_tokens (Optional[int]): Input tokens reported by the provider.
+        completion_tokens (Optional[int]): Output tokens reported by the provider.
+        request_bytes (Optional[int]): Size of the request payload.
+        response_bytes (Optional[int]): Size of the response payload.
+        error (Optional[str]): The class name of the error the call failed with, or None on success. A call
+            that was cancelled or interrupted is recorded as failed too, such as with "CancelledError".
+    """
+
+    backend: str
+    service: str
+    model: str
+    latency: float
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    request_bytes: Optional[int] = None
+    response_bytes: Optional[int] = None
+    error: Optional[str] = None
+
+
+class MetricsHook(Protocol):
+    def record(self, record: CallRecord) -> None:
+        """Receive one finished call. Called on the thread that made the call, so it must be quick."""
+
+
+class MetricsHub:
+    def __init__(self) -> None:
+        """The process-wide set of hooks every backend call is reported to."""
+        self._lock = threading.Lock()
+        self._hooks: tuple[MetricsHook, ...] = ()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._hooks)
+
+    def add_hook(self, hook: MetricsHook) -> None:
+        with self._lock:
+            self._hooks = (*self._hooks, hook)
+
+    def remove_hook(self, hook: MetricsHook) -> None:
+        with self._lock:
+            self._hooks = tuple(existing for existing in self._hooks if existing is not hook)
+
+    def record(self, record: CallRecord) -> None:
+        for hook in self._hooks:
+            hook.record(record)
+
+
+metrics = MetricsHub()
+
+
+class CallTracker:
+    def __init__(self, record: Callable[["CallTracker", Optional[BaseException]], None]) -> None:
+        """Collects what a tracked call produced. Set `response` once the provider has answered."""
+        self.response: Any = None
+        self.response_payload: Any = None
+        self.deferred = False
+        self._record = record
+        self._finished = False
+
+    def defer(self) -> None:
+        """
+        Keep the call open past the end of the tracked block, for calls that go on after it, such as a stream.
+
+        The call is then recorded by finish(). An error raised within the block is still recorded straight away.
+        """
+        self.deferred = True
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """
+        Record the call, timed up to now. Only the first call has an effect.
+
+        Args:
+            error (Optional[BaseException]): What the call failed with, or None if it succeeded.
+        """
+        if self._finished:
+            return
+        self._finished = True
+        self._record(self, error)
+
+
+@contextmanager
+def track_call(backend: str, service: str, model: str, request_payload: Any = None) -> Iterator[CallTracker]:
+    """
+    Time a provider call and report it to the metrics hooks.
+
+    Token usage is read from `tracker.response.usage`. Payload sizes are only measured while a hook is
+    installed, so tracking costs next to nothing otherwise. A call that outlives the block, such as a
+    stream, calls `tracker.defer()` and is recorded once `tracker.finish()` is called.
+
+    Args:
+        backend (str): The backend making the call.
+        service (str): The service being called.
+        model (str): The model used.
+        request_payload (Any): What is sent, used to measure the request size.
+    """
+    started_at = time.perf_counter()
+
+    def record(tracker: CallTracker, error: Optional[BaseException]) -> None:
+        if not metrics.enabled:
+            return
+        usage = getattr(tracker.response, "usage", None)
+        response_payload = tracker.response_payload if tracker.response_payload is not None else tracker.response
+        metrics.record(
+            CallRecord(
+                backend=backend,
+                service=service,
+                model=model,
+                latency=time.perf_counter() - started_at,
+                prompt_tokens=_usage_value(usage, "prompt_tokens", "input_tokens"),
+                completion_tokens=_usage_value(usage, "completion_tokens", "output_tokens"),
+                request_bytes=payload_size(request_payload),
+                response_bytes=payload_size(response_payload) if error is None else None,
+                error=type(error).__name__ if error is not None else None,
+            )
+        )
+
+    tracker = CallTracker(record)
+    try:
+        yield tracker
+    except BaseException as e:
+        # A cancelled or interrupted call did not succeed either, and its latency only covers part of the call.
+        tracker.finish(e)
+        raise
+    if not tracker.deferred:
+        tracker.finish()
+
+
+def payload_size(payload: Any) -> Optional[int]:
+    """Return the size in bytes of a payload as it would be sent, or None if it cannot be measured."""
+    if payload is None:
+        return None
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        return len(payload)
+    if isinstance(payload, str):
+        return len(payload.encode("utf-8"))
+    if isinstance(payload, io.BytesIO):
+        return payload.getbuffer().nbytes
+    model_dump_json = getattr(payload, "model_dump_json", None)
+    if callable(model_dump_json):
+        dumped = model_dump_json()
+        return len(dumped.encode("utf-8")) if isinstance(dumped, str) else None
+    try:
+        return len(json.dumps(payload, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _usage_value(usage: Any, *names: str) -> Optional[int]:
+    for name in names:
+        value = usage.get(name) if isinstance(usage, Mapping) else getattr(usage, name, None)
+        # Only trust real counts; test doubles return arbitrary objects for any attribute.
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+    return None
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        """A cumulative histogram with fixed upper bounds, as exported to Prometheus."""
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """Return (upper bound, observations at or below it) pairs, ending with +Inf."""
+        total = 0
+        result = []
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, quantile: float) -> Optional[float]:
+        """Estimate a quantile (0-1) as the upper bound of the bucket it falls in."""
+        if self.count == 0:
+            return None
+        target = quantile * self.count
+        for bound, total in self.cumulative():
+            if total >= target:
+                return bound
+        return float("inf")
+
+
+Labels = tuple[str, str, str]
+
+
+class MetricsAggregator:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        """
+        An in-process metrics hook that aggregates calls by backend, service and model.
+
+        Args:
+            buckets (Sequence[float]): Upper bounds in seconds of the latency histogram buckets.
+        """
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.latency: dict[Labels, Histogram] = {}
+        self.calls: dict[Labels, int] = {}
+        self.errors: dict[tuple[str, str, str, str], int] = {}
+        self.tokens: dict[tuple[str, str, str, str], int] = {}
+        self.payload_bytes: dict[tuple[str, str, str, str], int] = {}
+
+    def record(self, record: CallRecord) -> None:
+        labels = (record.backend, record.service, record.model)
+        with self._lock:
+            histogram = self.latency.get(labels)
+            if histogram is None:
+                histogram = self.latency[labels] = Histogram(self.buckets)
+            histogram.observe(record.latency)
+            self.calls[labels] = self.calls.get(labels, 0) + 1
+            if record.error is not None:
+                self._add(self.errors, (*labels, record.error), 1)
+            self._add(self.tokens, (*labels, "prompt"), record.prompt_tokens)
+            self._add(self.tokens, (*labels, "completion"), record.completion_tokens)
+            self._add(self.payload_bytes, (*labels, "request"), record.request_bytes)
+            self._add(self.payload_bytes, (*labels, "response"), record.response_bytes)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.latency.clear()
+            self.calls.clear()
+            self.errors.clear()
+            self.tokens.clear()
+            self.payload_bytes.clear()
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """
+        Summarize every backend, service and model seen so far.
+
+        Returns:
+            dict[str, dict[str, Any]]: Per "backend/service/model": calls, errors, error rate, token totals
+                and latency p50/p95/p99 estimated from the histogram buckets.
+        """
+        with self._lock:
+            result = {}
+            for labels, histogram in self.latency.items():
+                calls = self.calls[labels]
+                errors = sum(count for key, count in self.errors.items() if key[:3] == labels)
+                result["/".join(labels)] = {
+                    "calls": calls,
+                    "errors": errors,
+                    "error_rate": errors / calls,
+                    "prompt_tokens": self.tokens.get((*labels, "prompt"), 0),
+                    "completion_tokens": self.tokens.get((*labels, "completion"), 0),
+                    "latency_p50": histogram.quantile(0.5),
+                    "latency_p95": histogram.quantile(0.95),
+                    "latency_p99": histogram.quantile(0.99),
+                }
+            return result
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines: list[str] = []
+        with self._lock:
+            lines += [
+                "# HELP ai_backend_request_duration_seconds Wall-clock latency of provider calls.",
+                "# TYPE ai_backend_request_duration_seconds histogram",
+            ]
+            for labels, histogram in sorted(self.latency.items()):
+                base = _label_pairs(labels)
+                for bound, total in histogram.cumulative():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'ai_backend_request_duration_seconds_bucket{{{base},le="{le}"}} {total}')
+                lines.append(f"ai_backend_request_duration_seconds_sum{{{base}}} {histogram.sum!r}")
+                lines.append(f"ai_backend_request_duration_seconds_count{{{base}}} {histogram.count}")
+
+            lines += _counter_lines("ai_backend_requests_total", "Provider calls made.", self.calls, ())
+            lines += _counter_lines(
+                "ai_backend_request_errors_total",
+                "Provider calls that failed, by error class.",
+                self.errors,
+                ("error",),
+            )
+            lines += _counter_lines(
+                "ai_backend_tokens_total", "Tokens reported by the provider.", self.tokens, ("kind",)
+            )
+            lines += _counter_lines(
+                "ai_backend_payload_bytes_total", "Bytes sent and received.", self.payload_bytes, ("direction",)
+            )
+        return "\n".join(lines) + "\n"
+
+    def _add(self, counters: dict[tuple[str, str, str, str], int], key: tuple[str, str, str, str], value: Any) -> None:
+        if value is not None:
+            counters[key] = counters.get(key, 0) + value
+
+
+def _label_pairs(values: Sequence[str], extra_names: Sequence[str] = ()) -> str:
+    names = ("backend", "service", "model", *extra_names)
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _counter_lines(name: str, help_text: str, counters: Mapping[Any, int], extra_names: Sequence[str]) -> list[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    lines += [f"{name}{{{_label_pairs(key, extra_names)}}} {value}" for key, value in sorted(counters.items())]
+    return lines
+
+
+def serve_prometheus(aggregator: MetricsAggregator, port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serve the aggregated metrics for scraping on a background thread.
+
+    Args:
+        aggregator (MetricsAggregator): The metrics to expose.
+        port (int): The port to listen on. 0 picks a free port.
+        host (str): The interface to listen on.
+
+    Returns:
+        ThreadingHTTPServer: The running server. Call shutdown() to stop it.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            body = aggregator.to_prometheus().encode("utf-8")
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
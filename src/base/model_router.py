@@ -0,0 +1,162 @@
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Optional
+
+import openai
+
+from base.request_policy import TIMEOUT_ERRORS, is_retryable
+
+
+@dataclass
+class ModelEstimate:
+    """
+    What a router currently believes about a model.
+
+    Attributes:
+        latency (Optional[float]): The smoothed latency of its calls in seconds, or None before the first one.
+        error_rate (float): The smoothed fraction of its calls that failed.
+        samples (int): The calls observed.
+    """
+
+    latency: Optional[float] = None
+    error_rate: float = 0.0
+    samples: int = 0
+
+
+class _ModelState:
+    def __init__(self) -> None:
+        self.estimate = ModelEstimate()
+        self.observed_at: Optional[float] = None
+        self.probed_at: Optional[float] = None
+
+
+class ModelRouter:
+    def __init__(
+        self,
+        models: Sequence[str],
+        smoothing: float = 0.3,
+        max_error_rate: float = 0.5,
+        probe_interval: float = 60.0,
+    ) -> None:
+        """
+        Sends each chat to the fastest healthy model of an ordered list.
+
+        Latency and error rate are tracked per model as exponentially weighted moving averages of the calls
+        made with it. A model is healthy while its error rate is at most `max_error_rate`. Models that have not
+        been observed for `probe_interval` seconds, including those never tried, receive the next call, so
+        estimates recover once a slow or failing model improves.
+
+        With a latency SLO, the first model in list order whose estimate fits the SLO is used instead, so the
+        list is best given in order of preference, with cheaper or faster models last.
+
+        Args:
+            models (Sequence[str]): The acceptable models, most preferred first.
+            smoothing (float): The weight of each new observation, between 0 and 1.
+            max_error_rate (float): The error rate above which a model is only used as a last resort.
+            probe_interval (float): Seconds after which a model that received no calls is tried again.
+
+        Raises:
+            ValueError: If no models are given or the smoothing is out of range.
+        """
+        if not models:
+            error_message = "A model router needs at least one model."
+            raise ValueError(error_message)
+        if not 0 < smoothing <= 1:
+            error_message = f"smoothing must be in (0, 1], got {smoothing}."
+            raise ValueError(error_message)
+        self.models = list(dict.fromkeys(models))
+        self.smoothing = smoothing
+        self.max_error_rate = max_error_rate
+        self.probe_interval = probe_interval
+        self._lock = threading.Lock()
+        self._states = {model: _ModelState() for model in self.models}
+
+    def route(self, latency_slo: Optional[float] = None) -> list[str]:
+        """
+        Order the models for one call: the model to use first, then the fallbacks.
+
+        Args:
+            latency_slo (Optional[float]): Seconds the call should take. None picks the fastest healthy model.
+
+        Returns:
+            list[str]: Every model, in the order they should be tried.
+        """
+        now = time.monotonic()
+        with self._lock:
+            probe = None
+            if latency_slo is None:
+                # Calls with an SLO are not spent on probing models that may be slow.
+                probe = next((model for model in self.models if self._due(self._states[model], now)), None)
+                if probe is not None:
+                    self._states[probe].probed_at = now
+
+            healthy: list[str] = []
+            unhealthy: list[str] = []
+            for model in self.models:
+                if model == probe:
+                    continue
+                estimate = self._states[model].estimate
+                (healthy if estimate.error_rate <= self.max_error_rate else unhealthy).append(model)
+
+            # sorted() is stable, so models with equal or unknown latency keep their preference order.
+            by_latency = sorted(healthy, key=self._latency_key)
+            if latency_slo is not None:
+                # Models known to fit come first, then models not yet observed, then the rest by latency.
+                fits = [model for model in healthy if self._fits(model, latency_slo)]
+                unknown = [model for model in healthy if self._states[model].estimate.latency is None]
+                by_latency = fits + unknown + [model for model in by_latency if model not in (*fits, *unknown)]
+            unhealthy.sort(key=lambda model: self._states[model].estimate.error_rate)
+            return ([probe] if probe is not None else []) + by_latency + unhealthy
+
+    def record(self, model: str, latency: float, error: Optional[BaseException] = None) -> None:
+        """
+        Observe one call to a model.
+
+        Errors that say nothing about the model's health, such as invalid requests, are ignored. A timed out
+        call counts as a failure that took at least `latency`.
+
+        Args:
+            model (str): The model called. Models the router does not route to are ignored.
+            latency (float): Seconds the call took.
+            error (Optional[BaseException]): The error the call failed with, or None if it succeeded.
+        """
+        state = self._states.get(model)
+        if state is None or (error is not None and not is_retryable(error)):
+            return
+        timed_out = isinstance(error, (*TIMEOUT_ERRORS, openai.APITimeoutError))
+        with self._lock:
+            estimate = state.estimate
+            if error is None or timed_out:
+                estimate.latency = (
+                    latency
+                    if estimate.latency is None
+                    else estimate.latency + self.smoothing * (latency - estimate.latency)
+                )
+            failed = 0.0 if error is None else 1.0
+            estimate.error_rate += self.smoothing * (failed - estimate.error_rate)
+            estimate.samples += 1
+            state.observed_at = time.monotonic()
+
+    def estimates(self) -> dict[str, ModelEstimate]:
+        """A snapshot of the estimate of every model."""
+        with self._lock:
+            return {
+                model: ModelEstimate(state.estimate.latency, state.estimate.error_rate, state.estimate.samples)
+                for model, state in self._states.items()
+            }
+
+    def _due(self, state: _ModelState, now: float) -> bool:
+        last = max(state.observed_at or -1.0, state.probed_at or -1.0)
+        if last < 0:
+            return True
+        return now - last >= self.probe_interval
+
+    def _latency_key(self, model: str) -> tuple[bool, float]:
+        latency = self._states[model].estimate.latency
+        return (latency is None, latency or 0.0)
+
+    def _fits(self, model: str, latency_slo: float) -> bool:
+        latency = self._states[model].estimate.latency
+        return latency is not None and latency <= latency_slo
@@ -0,0 +1,144 @@
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, refill_per_second: float) -> None:
+        """
+        A token bucket that hands out reservations.
+
+        Reservations are taken immediately and may drive the balance negative; the caller then waits until
+        the bucket has refilled past zero. Callers therefore queue in the order they reserved.
+
+        Args:
+            capacity (float): The maximum balance, which is also the largest burst.
+            refill_per_second (float): The rate at which the balance refills.
+        """
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._balance = capacity
+        self._updated_at = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        """
+        Take amount from the bucket.
+
+        Returns:
+            float: Seconds the caller has to wait before the reservation is covered.
+        """
+        self._refill(now)
+        # A single reservation larger than the bucket could never be covered; cap it at a full bucket.
+        self._balance -= min(amount, self.capacity)
+        if self._balance >= 0:
+            return 0.0
+        return -self._balance / self.refill_per_second
+
+    def adjust(self, amount: float, now: float) -> None:
+        """Return (positive amount) or charge (negative amount) tokens after the fact."""
+        self._refill(now)
+        self._balance = min(self.capacity, self._balance + amount)
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._balance = min(self.capacity, self._balance + elapsed * self.refill_per_second)
+
+
+class RateLimiter:
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None) -> None:
+        """
+        Requests-per-minute and tokens-per-minute accounting for one API key and model.
+
+        Args:
+            requests_per_minute (Optional[float]): The request limit. None leaves requests unlimited.
+            tokens_per_minute (Optional[float]): The token limit. None leaves tokens unlimited.
+        """
+        self._lock = threading.Lock()
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = TokenBucket(requests_per_minute, requests_per_minute / 60) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60) if tokens_per_minute else None
+
+    def acquire(self, tokens: int = 0) -> None:
+        """
+        Block until one request using an estimated number of tokens fits within the limits.
+
+        Args:
+            tokens (int): The estimated number of tokens the request will consume.
+        """
+        delay = self._reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aacquire(self, tokens: int = 0) -> None:
+        """Asynchronous counterpart of acquire that waits without blocking the event loop."""
+        delay = self._reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """
+        Correct the token balance once the real usage of a request is known.
+
+        Args:
+            estimated_tokens (int): The estimate the request was admitted with.
+            actual_tokens (Optional[int]): The usage reported by the provider. None keeps the estimate.
+        """
+        if self._tokens is None or actual_tokens is None:
+            return
+        with self._lock:
+            self._tokens.adjust(estimated_tokens - actual_tokens, time.monotonic())
+
+    def _reserve(self, tokens: int) -> float:
+        with self._lock:
+            now = time.monotonic()
+            delays = [0.0]
+            if self._requests is not None:
+                delays.append(self._requests.reserve(1, now))
+            if self._tokens is not None and tokens:
+                delays.append(self._tokens.reserve(tokens, now))
+            return max(delays)
+
+
+class RateLimiterRegistry:
+    def __init__(self) -> None:
+        """Process-wide rate limiters keyed by API key and model, shared by every backend instance."""
+        self._lock = threading.Lock()
+        self._limiters: dict[tuple[str, str], RateLimiter] = {}
+
+    def configure(
+        self,
+        api_key: str,
+        model: str,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ) -> RateLimiter:
+        """
+        Set the limits for an API key and model, replacing any earlier limits.
+
+        Returns:
+            RateLimiter: The limiter now used for the key and model.
+        """
+        limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        with self._lock:
+            self._limiters[(self._fingerprint(api_key), model)] = limiter
+        return limiter
+
+    def get(self, api_key: str, model: str) -> Optional[RateLimiter]:
+        """Return the limiter for an API key and model, or None if no limits were configured."""
+        with self._lock:
+            return self._limiters.get((self._fingerprint(api_key), model))
+
+    def remove(self, api_key: str, model: str) -> None:
+        with self._lock:
+            self._limiters.pop((self._fingerprint(api_key), model), None)
+
+    def _fingerprint(self, api_key: str) -> str:
+        # Keep the keys themselves out of long-lived process state.
+        return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+rate_limiters = RateLimiterRegistry()
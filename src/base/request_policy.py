@@ -0,0 +1,259 @@
+import asyncio
+import concurrent.futures
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Optional, TypeVar
+
+import openai
+from retrying import Retrying  # type: ignore[import-untyped]
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429})
+TIMEOUT_ERRORS = (TimeoutError, asyncio.TimeoutError, concurrent.futures.TimeoutError)
+# The message an attempt is cancelled with when it runs out of time, so the call can tell it from other
+# cancellations, such as a hedge that lost or a caller that gave up.
+ATTEMPT_TIMEOUT_MESSAGE = "The attempt timed out."
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Return True for errors that another attempt may not hit: timeouts, connection errors, 429s and 5xx."""
+    if isinstance(exc, (*TIMEOUT_ERRORS, openai.APIConnectionError)):
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code in RETRYABLE_STATUS_CODES or exc.status_code >= 500  # noqa: PLR2004
+    return False
+
+
+@dataclass
+class RequestStats:
+    """How a single call was served."""
+
+    attempts: int = 0
+    hedges: int = 0
+    elapsed: float = 0.0
+
+
+_last_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("last_request_stats", default=None)
+
+
+def last_request_stats() -> Optional[RequestStats]:
+    """Return the stats of the most recent call made from the current thread or task."""
+    return _last_request_stats.get()
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 256) -> None:
+        """
+        A sliding window of recent successful attempt latencies.
+
+        Args:
+            window (int): The number of latencies to keep.
+        """
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Return the given percentile (0-100) of the window, or None if it is empty."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        position = min(len(latencies) - 1, int(len(latencies) * percentile / 100))
+        return latencies[position]
+
+
+@dataclass
+class RequestPolicy:
+    """
+    Retries, per-attempt timeouts and hedging for a single logical request.
+
+    A request is a callable that takes the per-attempt timeout (or None) and performs one attempt.
+    Failed attempts are retried with exponential backoff and full jitter while `retryable` accepts the error.
+    With hedging enabled, a duplicate attempt is launched once an attempt has been outstanding longer than
+    the `hedge_percentile` of recent latencies, and whichever finishes first wins.
+
+    Attributes:
+        max_attempts (int): The maximum number of attempts, including the first.
+        initial_backoff (float): The backoff ceiling in seconds before the second attempt.
+        max_backoff (float): The largest backoff ceiling in seconds.
+        attempt_timeout (Optional[float]): Seconds each attempt may take. None leaves attempts unbounded.
+        hedge_percentile (Optional[float]): The latency percentile after which a hedge is launched. None
+            disables hedging.
+        hedge_min_samples (int): The number of observed latencies required before hedging starts.
+        max_hedges (int): The maximum number of duplicate requests per attempt.
+        retryable (Callable[[BaseException], bool]): Decides whether an error is worth another attempt.
+    """
+
+    max_attempts: int = 3
+    initial_backoff: float = 0.5
+    max_backoff: float = 8.0
+    attempt_timeout: Optional[float] = None
+    hedge_percentile: Optional[float] = None
+    hedge_min_samples: int = 20
+    max_hedges: int = 1
+    retryable: Callable[[BaseException], bool] = is_retryable
+    latencies: LatencyTracker = field(default_factory=LatencyTracker, repr=False)
+
+    def backoff(self, attempt: int) -> float:
+        """Return the delay in seconds after the given failed attempt."""
+        ceiling = min(self.max_backoff, self.initial_backoff * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)  # noqa: S311
+
+    def hedge_delay(self) -> Optional[float]:
+        """Return how long an attempt may run before it is hedged, or None when hedging is off."""
+        if self.hedge_percentile is None or self.max_hedges < 1 or len(self.latencies) < self.hedge_min_samples:
+            return None
+        return self.latencies.percentile(self.hedge_percentile)
+
+    def call(self, request: Callable[[Optional[float]], T]) -> T:
+        """
+        Run a request under this policy.
+
+        The per-attempt timeout is passed to the request, which is responsible for enforcing it.
+        Hedges run on worker threads; a losing attempt finishes in the background and its result is dropped.
+
+        Returns:
+            T: The result of the first successful attempt.
+
+        Raises:
+            Exception: The error of the last attempt once retries are exhausted or the error is not retryable.
+        """
+        stats = RequestStats()
+        _last_request_stats.set(stats)
+
+        def attempt() -> T:
+            stats.attempts += 1
+            return self._hedged(request, stats)
+
+        started_at = time.perf_counter()
+        if self.max_attempts <= 1:
+            try:
+                return attempt()
+            finally:
+                stats.elapsed = time.perf_counter() - started_at
+
+        retrying = Retrying(
+            stop_max_attempt_number=self.max_attempts,
+            wait_func=lambda attempt_number, _delay_ms: 1000 * self.backoff(attempt_number),
+            retry_on_exception=self.retryable,
+        )
+        try:
+            result: T = retrying.call(attempt)
+            return result
+        finally:
+            stats.elapsed = time.perf_counter() - started_at
+
+    async def acall(self, request: Callable[[Optional[float]], Awaitable[T]]) -> T:
+        """Asynchronous counterpart of call. Timeouts are also enforced here, and losing hedges are cancelled."""
+        stats = RequestStats()
+        _last_request_stats.set(stats)
+        started_at = time.perf_counter()
+        try:
+            for attempt in range(1, self.max_attempts):
+                stats.attempts += 1
+                try:
+                    return await self._ahedged(request, stats)
+                except Exception as e:
+                    if not self.retryable(e):
+                        raise
+                await asyncio.sleep(self.backoff(attempt))
+            stats.attempts += 1
+            return await self._ahedged(request, stats)
+        finally:
+            stats.elapsed = time.perf_counter() - started_at
+
+    def _timed(self, request: Callable[[Optional[float]], T]) -> T:
+        started_at = time.perf_counter()
+        result = request(self.attempt_timeout)
+        self.latencies.record(time.perf_counter() - started_at)
+        return result
+
+    async def _atimed(self, request: Callable[[Optional[float]], Awaitable[T]]) -> T:
+        started_at = time.perf_counter()
+        if self.attempt_timeout is None:
+            result = await request(None)
+        else:
+            result = await self._await_attempt(request(self.attempt_timeout), self.attempt_timeout)
+        self.latencies.record(time.perf_counter() - started_at)
+        return result
+
+    async def _await_attempt(self, attempt: Awaitable[T], timeout: float) -> T:
+        # Like asyncio.wait_for, but the attempt is cancelled with ATTEMPT_TIMEOUT_MESSAGE when it runs out of time.
+        task = asyncio.ensure_future(attempt)
+        try:
+            done, _ = await asyncio.wait({task}, timeout=timeout)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        if not done:
+            task.cancel(ATTEMPT_TIMEOUT_MESSAGE)
+            await asyncio.wait({task})
+            raise asyncio.TimeoutError
+        return task.result()
+
+    def _hedged(self, request: Callable[[Optional[float]], T], stats: RequestStats) -> T:
+        delay = self.hedge_delay()
+        if delay is None:
+            return self._timed(request)
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1 + self.max_hedges)
+        try:
+            pending = {executor.submit(self._timed, request)}
+            hedges = 0
+            errors: list[BaseException] = []
+            while pending:
+                timeout = delay if hedges < self.max_hedges else None
+                done, pending = concurrent.futures.wait(
+                    pending, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    error = future.exception()
+                    if error is None:
+                        return future.result()
+                    errors.append(error)
+                if not done:
+                    hedges += 1
+                    stats.hedges += 1
+                    pending.add(executor.submit(self._timed, request))
+            raise errors[-1]
+        finally:
+            executor.shutdown(wait=False)
+
+    async def _ahedged(self, request: Callable[[Optional[float]], Awaitable[T]], stats: RequestStats) -> T:
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._atimed(request)
+
+        pending = {asyncio.ensure_future(self._atimed(request))}
+        try:
+            hedges = 0
+            errors: list[BaseException] = []
+            while pending:
+                timeout = delay if hedges < self.max_hedges else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    errors.append(error)
+                if not done:
+                    hedges += 1
+                    stats.hedges += 1
+                    pending.add(asyncio.ensure_future(self._atimed(request)))
+            raise errors[-1]
+        finally:
+            for task in pending:
+                task.cancel()
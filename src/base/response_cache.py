@@ -0,0 +1,177 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def request_key(*parts: Any) -> str:
+    """
+    Build a canonical key for a request.
+
+    Dictionaries are serialized with sorted keys so that equal requests hash equally regardless of the
+    order in which their parameters were given.
+
+    Args:
+        *parts (Any): The JSON-serializable pieces of the request, such as the messages and the merged config.
+
+    Returns:
+        str: A SHA-256 hex digest identifying the request.
+    """
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None, path: Optional[str] = None) -> None:
+        """
+        An exact-match cache with an in-process LRU tier and an optional persistent SQLite tier.
+
+        Values must be JSON-serializable so they can be written to the persistent tier.
+
+        Args:
+            max_entries (int): The maximum number of entries kept in memory before the least recently used
+                entry is evicted.
+            ttl (Optional[float]): Seconds after which an entry expires. None keeps entries until evicted.
+            path (Optional[str]): Path of a SQLite database used as a persistent tier that survives restarts.
+                None keeps the cache in memory only.
+        """
+        if max_entries < 1:
+            error_message = f"max_entries must be at least 1, got {max_entries}."
+            raise ValueError(error_message)
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, created_at REAL, value TEXT NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Retrieve a cached value.
+
+        Args:
+            key (str): The request key.
+
+        Returns:
+            Optional[Any]: The cached value, or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if not self._expired(created_at, now):
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+                self._expirations += 1
+
+            persisted = self._get_persistent(key, now)
+            if persisted is None:
+                self._misses += 1
+                return None
+
+            created_at, value = persisted
+            self._hits += 1
+            self._store(key, value, created_at)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value.
+
+        Args:
+            key (str): The request key.
+            value (Any): A JSON-serializable value.
+        """
+        now = time.time()
+        with self._lock:
+            self._store(key, value, now)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, created_at, value) VALUES (?, ?, ?)",
+                    (key, now, json.dumps(value)),
+                )
+                self._db.commit()
+
+    def clear(self) -> None:
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Report the cache counters.
+
+        Returns:
+            dict[str, int]: Hits, misses, LRU evictions, TTL expirations and the number of entries in memory.
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "size": len(self._entries),
+            }
+
+    def close(self) -> None:
+        """Close the persistent tier."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def _store(self, key: str, value: Any, created_at: float) -> None:
+        self._entries[key] = (created_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def _get_persistent(self, key: str, now: float) -> Optional[tuple[float, Any]]:
+        if self._db is None:
+            return None
+
+        row = self._db.execute("SELECT created_at, value FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        created_at, value = row
+        if self._expired(created_at, now):
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+            self._expirations += 1
+            return None
+
+        try:
+            return created_at, json.loads(value)
+        except json.JSONDecodeError as e:
+            logger.error(f"Discarding unreadable cache entry {key}: {e!s}")
+            return None
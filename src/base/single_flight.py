@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import weakref
+from collections.abc import Awaitable, Hashable
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class SingleFlightStats:
+    """
+    How many calls went through a SingleFlight.
+
+    Attributes:
+        calls (int): Every call made.
+        coalesced (int): Calls that shared the result of an identical call already in flight.
+    """
+
+    calls: int = 0
+    coalesced: int = 0
+
+
+class _Flight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        """
+        Coalesces concurrent identical calls into one.
+
+        While a call for a key is in flight, further calls with the same key wait for it and receive its result,
+        or its error, instead of running again. Once it finishes the key is forgotten, so later calls run afresh.
+        Threads are coalesced with threads, and asyncio tasks with tasks on the same event loop.
+        """
+        self._lock = threading.Lock()
+        self._flights: dict[Hashable, _Flight] = {}
+        self._tasks: weakref.WeakKeyDictionary[Any, dict[Hashable, asyncio.Future[Any]]] = weakref.WeakKeyDictionary()
+        self._stats = SingleFlightStats()
+
+    @property
+    def stats(self) -> SingleFlightStats:
+        """A snapshot of the call counts so far."""
+        with self._lock:
+            return SingleFlightStats(self._stats.calls, self._stats.coalesced)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = SingleFlightStats()
+
+    def do(self, key: Hashable, call: Callable[[], T]) -> T:
+        """
+        Run a call, or wait for the identical call already in flight.
+
+        Args:
+            key (Hashable): Identifies identical calls.
+            call (Callable[[], T]): Makes the call. Only run if no call with the same key is in flight.
+
+        Returns:
+            T: The result of the call that ran, shared by every caller.
+        """
+        with self._lock:
+            self._stats.calls += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._stats.coalesced += 1
+
+        if leader:
+            try:
+                flight.result = call()
+            except BaseException as e:
+                flight.error = e
+            finally:
+                with self._lock:
+                    del self._flights[key]
+                flight.done.set()
+        else:
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        result: T = flight.result
+        return result
+
+    async def ado(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Asynchronous counterpart of do.
+
+        The call runs in its own task, so cancelling one caller does not cancel the call for the others.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._stats.calls += 1
+            tasks = self._tasks.setdefault(loop, {})
+            task = tasks.get(key)
+            if task is None:
+                task = tasks[key] = asyncio.ensure_future(call())
+                task.add_done_callback(lambda done: self._forget(tasks, key, done))
+            else:
+                self._stats.coalesced += 1
+        result: T = await asyncio.shield(task)
+        return result
+
+    def _forget(self, tasks: dict[Hashable, "asyncio.Future[Any]"], key: Hashable, task: "asyncio.Future[Any]") -> None:
+        with self._lock:
+            if tasks.get(key) is task:
+                del tasks[key]
+        # Mark the error as retrieved, in case every caller was cancelled before it arrived.
+        if not task.cancelled():
+            task.exception()
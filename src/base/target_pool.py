@@ -0,0 +1,323 @@
+import asyncio
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Union
+
+import openai
+
+from base.client_registry import fingerprint, resolve_base_url
+from base.request_policy import ATTEMPT_TIMEOUT_MESSAGE, TIMEOUT_ERRORS
+
+
+def is_target_failure(exc: BaseException) -> bool:
+    """Return True for errors that point at the target rather than the request, such as 429s, 5xx and timeouts."""
+    if isinstance(exc, (*TIMEOUT_ERRORS, openai.APIConnectionError)):
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code == 429 or exc.status_code >= 500  # noqa: PLR2004
+    return False
+
+
+@dataclass(frozen=True)
+class Target:
+    """
+    One API key and endpoint requests can be sent to.
+
+    Attributes:
+        api_key (str): The API key to authenticate with.
+        base_url (Optional[str]): The endpoint. None uses the default endpoint.
+        name (Optional[str]): The label the target's stats are reported under. None derives one from the
+            endpoint and a fingerprint of the key.
+    """
+
+    api_key: str = field(repr=False)
+    base_url: Optional[str] = None
+    name: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        return self.name or f"{resolve_base_url(self.base_url)}#{fingerprint(self.api_key)[:8]}"
+
+
+@dataclass
+class TargetStats:
+    """
+    What a target has served so far.
+
+    Attributes:
+        outstanding (int): Requests in flight.
+        requests (int): Requests sent.
+        failures (int): Requests that failed with a target failure.
+        ejections (int): Times the target was taken out of rotation.
+        ejected_for (float): Seconds until the target is probed again, or 0 if it is in rotation.
+    """
+
+    outstanding: int = 0
+    requests: int = 0
+    failures: int = 0
+    ejections: int = 0
+    ejected_for: float = 0.0
+
+
+class _TargetState:
+    def __init__(self, target: Target) -> None:
+        self.target = target
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.ejections = 0
+        self.ejection_streak = 0
+        self.ejected_until = 0.0
+        self.probing = False
+
+
+class TargetPool:
+    def __init__(
+        self,
+        targets: Sequence[Union[Target, tuple[str, Optional[str]]]],
+        ejection_time: float = 30.0,
+        max_ejection_time: float = 300.0,
+        *,
+        failover: bool = True,
+    ) -> None:
+        """
+        Spreads requests across API keys and endpoints.
+
+        Each request goes to the target with the fewest requests in flight. A target that fails with a 429,
+        a 5xx, a timeout or a lost connection is ejected for `ejection_time`, doubling on every consecutive
+        ejection up to `max_ejection_time`. Once its ejection expires it is probed with a single request, and
+        returns to rotation if that succeeds. When every target is ejected, the one due back first is used
+        rather than failing outright.
+
+        Args:
+            targets (Sequence[Union[Target, tuple[str, Optional[str]]]]): The targets, as Target or
+                (api_key, base_url) pairs.
+            ejection_time (float): Seconds a target is ejected for after its first failure.
+            max_ejection_time (float): The longest ejection in seconds.
+            failover (bool): Retry a request that hit a target failure on the next best target, once per
+                target. The targets' clients then skip their own retries, so a failing target is left quickly.
+
+        Raises:
+            ValueError: If no targets are given.
+        """
+        if not targets:
+            error_message = "A target pool needs at least one target."
+            raise ValueError(error_message)
+        self.targets = [target if isinstance(target, Target) else Target(*target) for target in targets]
+        self.ejection_time = ejection_time
+        self.max_ejection_time = max_ejection_time
+        self.failover = failover
+        self._lock = threading.Lock()
+        self._states = [_TargetState(target) for target in self.targets]
+        self._next = 0
+
+    def acquire(self, exclude: Sequence[Target] = ()) -> Target:
+        """
+        Pick the target for a request and count it as outstanding until release() is called.
+
+        Args:
+            exclude (Sequence[Target]): Targets already tried for this request.
+
+        Raises:
+            LookupError: If every target is excluded.
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [state for state in self._states if state.target not in exclude]
+            if not candidates:
+                error_message = "Every target has been tried."
+                raise LookupError(error_message)
+
+            available = [state for state in candidates if self._available(state, now)]
+            if available:
+                # Rotate the starting point so ties are spread evenly rather than always hitting the first target.
+                start = self._next % len(self._states)
+                self._next += 1
+                state = min(
+                    available, key=lambda s: (s.outstanding, (self._states.index(s) - start) % len(self._states))
+                )
+            else:
+                state = min(candidates, key=lambda s: s.ejected_until)
+
+            if state.ejected_until:
+                state.probing = True
+            state.outstanding += 1
+            state.requests += 1
+            return state.target
+
+    def release(self, target: Target, error: Optional[BaseException] = None, *, abandoned: bool = False) -> None:
+        """
+        Finish a request, ejecting the target if it failed with a target failure.
+
+        A success returns the target to rotation. Other errors say nothing about the target and leave its
+        ejection as it is.
+
+        Args:
+            target (Target): The target the request was sent to.
+            error (Optional[BaseException]): What the request failed with, or None if it succeeded.
+            abandoned (bool): The request was given up on before it was answered, such as a cancelled call,
+                so its outcome is unknown and the target's ejection is left as it is.
+        """
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(target)
+            state.outstanding -= 1
+            state.probing = False
+            if error is not None and is_target_failure(error):
+                state.failures += 1
+                state.ejections += 1
+                duration = min(self.max_ejection_time, self.ejection_time * 2**state.ejection_streak)
+                state.ejection_streak += 1
+                state.ejected_until = now + duration
+            elif error is None and not abandoned:
+                state.ejection_streak = 0
+                state.ejected_until = 0.0
+
+    def stats(self) -> dict[str, TargetStats]:
+        """Per-target request counts and ejection state, keyed by target label."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                state.target.label: TargetStats(
+                    outstanding=state.outstanding,
+                    requests=state.requests,
+                    failures=state.failures,
+                    ejections=state.ejections,
+                    ejected_for=max(0.0, state.ejected_until - now),
+                )
+                for state in self._states
+            }
+
+    def _available(self, state: _TargetState, now: float) -> bool:
+        if not state.ejected_until:
+            return True
+        # An ejected target is probed by one request at a time once its ejection has expired.
+        return now >= state.ejected_until and not state.probing
+
+    def _state(self, target: Target) -> _TargetState:
+        return next(state for state in self._states if state.target == target)
+
+
+class PooledClient:
+    def __init__(
+        self,
+        pool: TargetPool,
+        client_for: Callable[[Target], Any],
+        *,
+        is_async: bool = False,
+        options: Optional[dict[str, Any]] = None,
+    ) -> None:
+        """
+        Stands in for an OpenAI client and sends every call through a target pool.
+
+        `client.chat.completions.create(...)` picks a target, makes the call with that target's client and
+        reports the outcome to the pool. Streaming calls count as outstanding until the stream is returned.
+
+        Args:
+            pool (TargetPool): The targets to route between.
+            client_for (Callable[[Target], Any]): Returns the client of a target.
+            is_async (bool): Whether the clients are asynchronous.
+            options (Optional[dict[str, Any]]): Options applied to every target client with with_options.
+        """
+        self.pool = pool
+        self.client_for = client_for
+        self.is_async = is_async
+        self.options = dict(options or {})
+        if pool.failover and len(pool.targets) > 1:
+            self.options.setdefault("max_retries", 0)
+
+    def with_options(self, **options: Any) -> "PooledClient":
+        return PooledClient(self.pool, self.client_for, is_async=self.is_async, options={**self.options, **options})
+
+    def __getattr__(self, name: str) -> "_PooledCall":
+        return _PooledCall(self, (name,))
+
+    @contextmanager
+    def pinned(self) -> Iterator[Any]:
+        """
+        Send a sequence of calls to one target, for calls that refer to what earlier ones created.
+
+        A batch is the case in point: its input file, the batch and its output only exist under the API key
+        and endpoint they were created with. The target is picked as for a single call and counted as
+        outstanding until the block exits. API errors are reported to the pool; other errors, such as giving
+        up on a batch that is still running, leave the target's health as it is.
+
+        Yields:
+            Any: The chosen target's client.
+        """
+        target = self.pool.acquire()
+        try:
+            yield self.client_for(target)
+        except openai.APIError as e:
+            self.pool.release(target, e)
+            raise
+        except BaseException:
+            self.pool.release(target, abandoned=True)
+            raise
+        self.pool.release(target)
+
+    def target_client(self, target: Target) -> Any:
+        client = self.client_for(target)
+        return client.with_options(**self.options) if self.options else client
+
+
+class _PooledCall:
+    def __init__(self, client: PooledClient, path: tuple[str, ...]) -> None:
+        self._client = client
+        self._path = path
+
+    def __getattr__(self, name: str) -> "_PooledCall":
+        return _PooledCall(self._client, (*self._path, name))
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        if self._client.is_async:
+            return self._acall(*args, **kwargs)
+        tried: list[Target] = []
+        while True:
+            target = self._client.pool.acquire(tried)
+            tried.append(target)
+            try:
+                result = self._resolve(target)(*args, **kwargs)
+            except Exception as e:
+                self._client.pool.release(target, e)
+                if not self._failover(e, tried):
+                    raise
+                continue
+            self._client.pool.release(target)
+            return result
+
+    async def _acall(self, *args: Any, **kwargs: Any) -> Any:
+        tried: list[Target] = []
+        while True:
+            target = self._client.pool.acquire(tried)
+            tried.append(target)
+            try:
+                result = await self._resolve(target)(*args, **kwargs)
+            except asyncio.CancelledError as e:
+                if e.args[:1] == (ATTEMPT_TIMEOUT_MESSAGE,):
+                    # The target took longer than the attempt may, which counts against it like any timeout.
+                    self._client.pool.release(target, asyncio.TimeoutError())
+                else:
+                    # A lost hedge or a caller that gave up; the target has not answered, so it is not healthy.
+                    self._client.pool.release(target, abandoned=True)
+                raise
+            except Exception as e:
+                self._client.pool.release(target, e)
+                if not self._failover(e, tried):
+                    raise
+                continue
+            self._client.pool.release(target)
+            return result
+
+    def _resolve(self, target: Target) -> Any:
+        attribute = self._client.target_client(target)
+        for name in self._path:
+            attribute = getattr(attribute, name)
+        return attribute
+
+    def _failover(self, error: Exception, tried: Sequence[Target]) -> bool:
+        pool = self._client.pool
+        return pool.failover and is_target_failure(error) and len(tried) < len(pool.targets)
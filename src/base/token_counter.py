@@ -0,0 +1,286 @@
+import importlib
+import importlib.util
+import json
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, Optional
+
+# Every message is wrapped in a few tokens of framing, and the reply is primed with a few more.
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_NAME = 1
+REPLY_PRIMING_TOKENS = 3
+# The cost of a low detail image part. High detail images cost more, so counts of image messages are a floor.
+IMAGE_PART_TOKENS = 85
+
+# Message counts cached per counter before the cache is reset.
+MAX_CACHED_MESSAGES = 8192
+
+TRUNCATION_MARKER = "\n[... truncated ...]"
+
+
+@dataclass(frozen=True)
+class ModelLimits:
+    """
+    The token limits of a model.
+
+    Attributes:
+        context_window (int): The tokens the prompt and the completion may use together.
+        max_output_tokens (int): The most tokens a single completion may use.
+    """
+
+    context_window: int
+    max_output_tokens: int
+
+
+MODEL_LIMITS: dict[str, ModelLimits] = {
+    "gpt-4.1": ModelLimits(1047576, 32768),
+    "gpt-4.1-mini": ModelLimits(1047576, 32768),
+    "gpt-4.1-nano": ModelLimits(1047576, 32768),
+    "gpt-4o": ModelLimits(128000, 16384),
+    "gpt-4o-mini": ModelLimits(128000, 16384),
+    "gpt-4-turbo": ModelLimits(128000, 4096),
+    "gpt-4": ModelLimits(8192, 8192),
+    "gpt-3.5-turbo": ModelLimits(16385, 4096),
+    "o1": ModelLimits(200000, 100000),
+    "o1-mini": ModelLimits(128000, 65536),
+    "o3": ModelLimits(200000, 100000),
+    "o3-mini": ModelLimits(200000, 100000),
+    "o4-mini": ModelLimits(200000, 100000),
+}
+
+
+def model_limits(model: str) -> Optional[ModelLimits]:
+    """Return the limits of a model, or None if they are not known."""
+    if model in MODEL_LIMITS:
+        return MODEL_LIMITS[model]
+    # Dated snapshots such as gpt-4o-2024-08-06 share the limits of their family; the longest family wins.
+    families = [name for name in MODEL_LIMITS if model.startswith(f"{name}-")]
+    return MODEL_LIMITS[max(families, key=len)] if families else None
+
+
+def _load_encoding(model: str) -> Any:
+    # tiktoken is optional. Without it counts fall back to four characters per token.
+    if importlib.util.find_spec("tiktoken") is None:
+        return None
+    tiktoken = importlib.import_module("tiktoken")
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+class TokenCounter:
+    def __init__(self, model: str, limits: Optional[ModelLimits] = None) -> None:
+        """
+        Counts the prompt tokens of chat messages for one model.
+
+        Counts are exact with tiktoken installed and estimated otherwise. Each message's count is cached,
+        so counting a conversation again after a turn is appended only counts the new message.
+
+        Args:
+            model (str): The model messages are counted for.
+            limits (Optional[ModelLimits]): The model's limits. None looks them up in MODEL_LIMITS.
+        """
+        self.model = model
+        self.limits = limits or model_limits(model)
+        self._encoding = _load_encoding(model)
+        self._lock = threading.Lock()
+        self._cache: dict[Any, int] = {}
+
+    @property
+    def exact(self) -> bool:
+        """Whether counts come from the model's tokenizer rather than an estimate."""
+        return self._encoding is not None
+
+    def count_text(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        # Roughly four characters per token for English text.
+        return len(text) // 4 + 1
+
+    def count_message(self, message: Any) -> int:
+        """Count one message, including its framing."""
+        key = _message_key(message)
+        count = self._cache.get(key)
+        if count is None:
+            count = self._count_message(message)
+            with self._lock:
+                if len(self._cache) >= MAX_CACHED_MESSAGES:
+                    self._cache.clear()
+                self._cache[key] = count
+        return count
+
+    def count_messages(self, messages: Sequence[Any]) -> int:
+        """Count the prompt tokens of a conversation, including the priming of the reply."""
+        return sum(self.count_message(message) for message in messages) + REPLY_PRIMING_TOKENS
+
+    def truncate_text(self, text: str, max_tokens: int) -> str:
+        """Cut text down to at most `max_tokens` tokens, marking where it was cut."""
+        if self.count_text(text) <= max_tokens:
+            return text
+        budget = max(0, max_tokens - self.count_text(TRUNCATION_MARKER))
+        if self._encoding is not None:
+            kept = str(self._encoding.decode(self._encoding.encode(text, disallowed_special=())[:budget]))
+        else:
+            kept = text[: max(0, budget - 1) * 4]
+        return kept + TRUNCATION_MARKER
+
+    def _count_message(self, message: Any) -> int:
+        if not isinstance(message, dict):
+            return TOKENS_PER_MESSAGE + self.count_text(str(message))
+
+        count = TOKENS_PER_MESSAGE + self.count_text(str(message.get("role", "")))
+        if message.get("name"):
+            count += TOKENS_PER_NAME + self.count_text(str(message["name"]))
+        content = message.get("content")
+        if isinstance(content, str):
+            count += self.count_text(content)
+        elif isinstance(content, list):
+            for part in content:
+                if isinstance(part, dict) and part.get("type") == "text":
+                    count += self.count_text(str(part.get("text", "")))
+                elif isinstance(part, dict) and part.get("type") == "image_url":
+                    count += IMAGE_PART_TOKENS
+                else:
+                    count += self.count_text(json.dumps(part, default=str))
+        for tool_call in message.get("tool_calls") or []:
+            function = tool_call.get("function", {}) if isinstance(tool_call, dict) else {}
+            count += self.count_text(str(function.get("name", ""))) + self.count_text(
+                str(function.get("arguments", ""))
+            )
+        return count
+
+
+def _message_key(message: Any) -> Any:
+    # Plain text messages are keyed by their fields directly; Python caches string hashes, so repeat lookups are cheap.
+    if isinstance(message, dict):
+        content = message.get("content")
+        if (content is None or isinstance(content, str)) and "tool_calls" not in message:
+            return (message.get("role"), content, message.get("name"))
+        return json.dumps(message, sort_keys=True, default=str)
+    return ("", str(message), None)
+
+
+@dataclass
+class TrimPolicy:
+    """
+    How to fit a conversation into a model's context window before it is sent.
+
+    Trimming first truncates long tool outputs, then drops the oldest messages until the conversation fits.
+    System messages, pinned messages and the last message are never dropped. A message is pinned by adding
+    `"pinned": True` to it; the marker is removed before the messages are sent. An assistant message that
+    calls tools is dropped together with the tool results that answer it.
+
+    Attributes:
+        drop_oldest (bool): Drop the oldest messages while the conversation does not fit.
+        keep_system (bool): Never drop system messages.
+        max_tool_output_tokens (Optional[int]): Truncate tool results longer than this. None keeps them whole.
+        reserve_output_tokens (int): Tokens kept free for the reply when the request does not set
+            max_completion_tokens or max_tokens.
+    """
+
+    drop_oldest: bool = True
+    keep_system: bool = True
+    max_tool_output_tokens: Optional[int] = None
+    reserve_output_tokens: int = 0
+
+    def apply(self, messages: Sequence[Any], counter: TokenCounter, max_output_tokens: Optional[int] = None) -> list:
+        """
+        Trim messages to fit the counter's model.
+
+        Args:
+            messages (Sequence[Any]): The conversation to send.
+            counter (TokenCounter): Counts tokens for the model the conversation is sent to.
+            max_output_tokens (Optional[int]): The completion budget the request asks for.
+
+        Returns:
+            list: The messages to send. The input is not modified.
+
+        Raises:
+            ValueError: If the completion budget exceeds the model's output limit, or the conversation
+                does not fit even after trimming.
+        """
+        pinned = [isinstance(message, dict) and bool(message.get("pinned")) for message in messages]
+        trimmed = [self._prepare(message, counter) for message in messages]
+
+        limits = counter.limits
+        if limits is None:
+            return trimmed
+
+        reserved = max_output_tokens if max_output_tokens is not None else self.reserve_output_tokens
+        if reserved > limits.max_output_tokens:
+            error_message = (
+                f"{counter.model} returns at most {limits.max_output_tokens} tokens, but {reserved} were requested."
+            )
+            raise ValueError(error_message)
+        budget = limits.context_window - reserved
+
+        total = counter.count_messages(trimmed)
+        if total > budget and self.drop_oldest:
+            groups = _turn_groups(trimmed)
+            keep = [True] * len(groups)
+            for index, group in enumerate(groups[:-1]):
+                if total <= budget:
+                    break
+                first = trimmed[group[0]]
+                is_system = isinstance(first, dict) and first.get("role") in ("system", "developer")
+                if (self.keep_system and is_system) or any(pinned[i] for i in group):
+                    continue
+                keep[index] = False
+                total -= sum(counter.count_message(trimmed[i]) for i in group)
+            trimmed = [trimmed[i] for index, group in enumerate(groups) if keep[index] for i in group]
+
+        if total > budget:
+            error_message = (
+                f"The messages need {total} tokens, but {counter.model} leaves {budget} for the prompt "
+                f"after reserving {reserved} for the reply."
+            )
+            raise ValueError(error_message)
+        return trimmed
+
+    def _prepare(self, message: Any, counter: TokenCounter) -> Any:
+        if not isinstance(message, dict):
+            return message
+        message = _unpin(message)
+        content = message.get("content")
+        if (
+            self.max_tool_output_tokens is not None
+            and message.get("role") == "tool"
+            and isinstance(content, str)
+            and counter.count_text(content) > self.max_tool_output_tokens
+        ):
+            message = {**message, "content": counter.truncate_text(content, self.max_tool_output_tokens)}
+        return message
+
+
+def unpin_messages(messages: Sequence[Any]) -> list:
+    """
+    Remove the `"pinned"` marker, which the API rejects, from messages that are sent without trimming.
+
+    Args:
+        messages (Sequence[Any]): The conversation to send.
+
+    Returns:
+        list: The messages without the marker. The input is not modified.
+    """
+    return [_unpin(message) if isinstance(message, dict) else message for message in messages]
+
+
+def _unpin(message: dict) -> dict:
+    if "pinned" not in message:
+        return message
+    return {key: value for key, value in message.items() if key != "pinned"}
+
+
+def _turn_groups(messages: Sequence[Any]) -> list[list[int]]:
+    # Tool results must follow the assistant message that requested them, so they are kept or dropped together.
+    groups: list[list[int]] = []
+    for index, message in enumerate(messages):
+        if groups and isinstance(message, dict) and message.get("role") == "tool":
+            groups[-1].append(index)
+        else:
+            groups.append([index])
+    return groups
@@ -0,0 +1,171 @@
+import math
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Consecutive words that must agree for two transcripts to be aligned on them.
+ANCHOR_WORDS = 3
+
+_WORD = re.compile(r"\S+")
+_NOT_ALPHANUMERIC = re.compile(r"[\W_]+")
+
+
+@dataclass(frozen=True)
+class TimedText:
+    """
+    A segment or word of a transcript and when it was spoken.
+
+    Attributes:
+        start (float): Seconds from the start of the transcribed audio.
+        end (float): Seconds from the start of the transcribed audio.
+        text (str): What was said.
+    """
+
+    start: float
+    end: float
+    text: str
+
+
+@dataclass
+class ChunkTranscript:
+    """
+    The transcript of one chunk of a longer recording.
+
+    Attributes:
+        text (str): The transcript.
+        offset (float): Seconds from the start of the recording to the start of the chunk.
+        duration (Optional[float]): Seconds of audio in the chunk, if known.
+        segments (list[TimedText]): Timed segments, relative to the start of the chunk.
+        words (list[TimedText]): Timed words, relative to the start of the chunk.
+    """
+
+    text: str
+    offset: float = 0.0
+    duration: Optional[float] = None
+    segments: list[TimedText] = field(default_factory=list)
+    words: list[TimedText] = field(default_factory=list)
+
+    @property
+    def timed(self) -> list[TimedText]:
+        """The finest timestamps available: words if the chunk has them, otherwise segments."""
+        return self.words or self.segments
+
+    @property
+    def end(self) -> Optional[float]:
+        return None if self.duration is None else self.offset + self.duration
+
+
+def stitch_chunks(chunks: Sequence[ChunkTranscript], window: Optional[int] = None) -> str:
+    """
+    Join the transcripts of overlapping chunks into one, keeping each part of the overlaps once.
+
+    When every chunk has timestamps, each overlap is cut at its middle: a word or segment is kept from
+    the chunk in which its midpoint falls before the cut, so audio cut off at a chunk boundary is taken
+    from the chunk that heard it whole. Otherwise consecutive transcripts are aligned on their text
+    with `align_overlap`. Either way the cost is linear in the length of the transcripts.
+
+    Args:
+        chunks (Sequence[ChunkTranscript]): The chunk transcripts, in recording order.
+        window (Optional[int]): Characters searched for each text overlap. Defaults to twice what the
+            chunk durations and overlaps suggest.
+
+    Returns:
+        str: The transcript of the whole recording.
+    """
+    chunks = [chunk for chunk in chunks if chunk.text.strip()]
+    if not chunks:
+        return ""
+    if all(chunk.timed and chunk.duration is not None for chunk in chunks):
+        return _stitch_by_time(chunks)
+
+    # Only the latest transcript can overlap the next one, so earlier ones are set aside and joined once.
+    parts: list[str] = []
+    tail = chunks[0].text
+    for previous, current in zip(chunks, chunks[1:]):
+        overlap = window if window is not None else _overlap_characters(previous, current)
+        cut = align_overlap(tail, current.text, overlap)
+        if cut:
+            parts.append(tail[: cut[0]])
+            tail = current.text[cut[1] :]
+        else:
+            parts.append(tail.rstrip() + " ")
+            tail = current.text.lstrip()
+    return "".join([*parts, tail]).strip()
+
+
+def align_overlap(left: str, right: str, window: int) -> Optional[tuple[int, int]]:
+    """
+    Find where the end of one transcript repeats at the start of the next.
+
+    Both transcripts are compared as words, ignoring case and punctuation. The first run of
+    `ANCHOR_WORDS` words at the start of `right` that also occurs in the last `window` characters of
+    `left` anchors the alignment, so misheard words elsewhere in the overlap do not prevent it.
+    Runs are looked up by hash, making the cost linear in the window.
+
+    Args:
+        left (str): The earlier transcript.
+        right (str): The later transcript.
+        window (int): Characters at the end of `left` and the start of `right` that may overlap.
+
+    Returns:
+        Optional[tuple[int, int]]: Character positions in `left` and `right` such that
+            left[:i] + right[j:] reads through the overlap once, or None if they share no run of words.
+    """
+    left_words = _words(left, len(left) - window, len(left))
+    right_words = _words(right, 0, window)
+    if len(left_words) < ANCHOR_WORDS or len(right_words) < ANCHOR_WORDS:
+        return None
+
+    # The last occurrence in `left`, since the overlap is at its end.
+    runs = {_run(left_words, i): i for i in range(len(left_words) - ANCHOR_WORDS + 1)}
+    for j in range(len(right_words) - ANCHOR_WORDS + 1):
+        i = runs.get(_run(right_words, j))
+        if i is not None:
+            return left_words[i][0], right_words[j][0]
+    return None
+
+
+def _words(text: str, start: int, end: int) -> list[tuple[int, str]]:
+    # Words cut by the edges of the window are left out rather than compared by halves.
+    start, end = max(start, 0), min(max(end, 0), len(text))
+    words = []
+    for match in _WORD.finditer(text, start, end):
+        if (match.start() == start > 0 and not text[start - 1].isspace()) or (
+            match.end() == end < len(text) and not text[end].isspace()
+        ):
+            continue
+        normalized = _NOT_ALPHANUMERIC.sub("", match.group().lower())
+        if normalized:
+            words.append((match.start(), normalized))
+    return words
+
+
+def _run(words: list[tuple[int, str]], index: int) -> tuple[str, ...]:
+    return tuple(word for _, word in words[index : index + ANCHOR_WORDS])
+
+
+def _overlap_characters(previous: ChunkTranscript, current: ChunkTranscript) -> int:
+    previous_end = previous.end
+    if previous_end is None or not current.duration:
+        # Without durations, the shorter transcript bounds how much of it can be repeated.
+        return min(len(previous.text), len(current.text))
+    overlap = max(previous_end - current.offset, 0.0)
+    # Speech rate varies within a chunk, so twice the average rate of the later chunk is searched.
+    return math.ceil(2 * overlap * len(current.text) / current.duration) + 1
+
+
+def _stitch_by_time(chunks: list[ChunkTranscript]) -> str:
+    pieces: list[str] = []
+    cut_before = -math.inf
+    for index, chunk in enumerate(chunks):
+        cut_after = math.inf
+        if index + 1 < len(chunks):
+            following_start = chunks[index + 1].offset
+            cut_after = (following_start + max(chunk.end or following_start, following_start)) / 2
+        for timed in chunk.timed:
+            midpoint = chunk.offset + (timed.start + timed.end) / 2
+            if cut_before <= midpoint < cut_after and timed.text.strip():
+                pieces.append(timed.text.strip())
+        cut_before = cut_after
+    return " ".join(pieces)
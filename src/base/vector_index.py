@@ -0,0 +1,298 @@
+import json
+import os
+from typing import Any, Optional
+
+import numpy as np
+
+# Rows scored per block during exact search, bounding the size of the score matrix.
+SEARCH_BLOCK_ROWS = 65536
+
+
+class VectorIndex:
+    def __init__(self, dimensions: Optional[int] = None, ivf_threshold: Optional[int] = 200000) -> None:
+        """
+        An in-process cosine-similarity index for embeddings.
+
+        Vectors are L2-normalized on the way in and stored as one contiguous float32 matrix, so cosine
+        similarity is a plain dot product. Small collections are searched exactly with blocked matrix
+        products. Large collections can be partitioned IVF-style: rows are clustered around k-means
+        centroids and a query only scores the rows of its `nprobe` nearest partitions.
+
+        Args:
+            dimensions (Optional[int]): The vector size. Inferred from the first vectors added when None.
+            ivf_threshold (Optional[int]): Build the partitioned index automatically on the first search once
+                the collection has at least this many rows. None disables automatic partitioning.
+        """
+        self.dimensions = dimensions
+        self.ivf_threshold = ivf_threshold
+
+        self._vectors = np.empty((0, dimensions or 0), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._size = 0
+
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments: Optional[np.ndarray] = None
+        self._list_offsets: Optional[np.ndarray] = None
+        self._list_rows: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """The normalized stored vectors, one row per added vector."""
+        return self._vectors[: self._size]
+
+    @property
+    def ids(self) -> np.ndarray:
+        """The id of every stored row."""
+        return self._ids[: self._size]
+
+    @property
+    def is_partitioned(self) -> bool:
+        return self._centroids is not None
+
+    def add(self, vectors: Any, ids: Optional[Any] = None) -> None:
+        """
+        Add embeddings to the index.
+
+        Args:
+            vectors (Any): A single embedding or a matrix of embeddings, as returned by generate_embedding
+                or generate_embeddings.
+            ids (Optional[Any]): Integer ids for the rows. Defaults to consecutive row numbers.
+        """
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[np.newaxis, :]
+        if self.dimensions is None:
+            self.dimensions = matrix.shape[1]
+            self._vectors = np.empty((0, self.dimensions), dtype=np.float32)
+        if matrix.shape[1] != self.dimensions:
+            error_message = f"Expected vectors of size {self.dimensions}, got {matrix.shape[1]}."
+            raise ValueError(error_message)
+
+        if ids is None:
+            new_ids = np.arange(self._size, self._size + len(matrix), dtype=np.int64)
+        else:
+            new_ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+            if len(new_ids) != len(matrix):
+                error_message = "ids must have one entry per vector."
+                raise ValueError(error_message)
+
+        self._reserve(self._size + len(matrix))
+        start, end = self._size, self._size + len(matrix)
+        self._vectors[start:end] = self._normalize(matrix)
+        self._ids[start:end] = new_ids
+        self._size = end
+
+        if self._centroids is not None:
+            self._assign_to_partitions(start, end)
+
+    def search(
+        self, queries: Any, k: int = 10, nprobe: int = 8, *, exact: bool = False
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k most similar stored vectors for every query.
+
+        Args:
+            queries (Any): A single query vector or a matrix of query vectors.
+            k (int): The number of neighbours to return per query.
+            nprobe (int): The number of partitions scored per query when the index is partitioned.
+            exact (bool): Score every row even if the index is partitioned.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The (queries, k) cosine similarities in descending order and the
+                matching ids. Slots without a neighbour hold a similarity of -inf and an id of -1.
+        """
+        matrix = np.asarray(queries, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[np.newaxis, :]
+        if self.dimensions is not None and matrix.shape[1] != self.dimensions:
+            error_message = f"Expected queries of size {self.dimensions}, got {matrix.shape[1]}."
+            raise ValueError(error_message)
+        if self._size == 0:
+            return np.full((len(matrix), k), -np.inf, dtype=np.float32), np.full((len(matrix), k), -1, dtype=np.int64)
+        matrix = self._normalize(matrix)
+
+        if self._centroids is None and self.ivf_threshold is not None and self._size >= self.ivf_threshold:
+            self.build_partitions()
+
+        if self._centroids is not None and not exact:
+            rows, scores = self._search_partitions(matrix, k, nprobe)
+        else:
+            rows, scores = self._search_exact(matrix, k)
+
+        ids = np.where(rows >= 0, self._ids[np.maximum(rows, 0)], -1)
+        return scores, ids
+
+    def build_partitions(
+        self, n_lists: Optional[int] = None, iterations: int = 10, sample_size: int = 100000, seed: int = 0
+    ) -> None:
+        """
+        Cluster the stored vectors into partitions for approximate search.
+
+        Args:
+            n_lists (Optional[int]): The number of partitions. Defaults to about the square root of the row count.
+            iterations (int): The number of k-means iterations.
+            sample_size (int): The number of rows the centroids are trained on.
+            seed (int): Seed for sampling and centroid initialization.
+        """
+        if self._size == 0:
+            error_message = "Cannot partition an empty index."
+            raise ValueError(error_message)
+
+        n_lists = n_lists or max(1, int(np.sqrt(self._size)))
+        n_lists = min(n_lists, self._size)
+        rng = np.random.default_rng(seed)
+        vectors = self.vectors
+        sample = vectors[rng.choice(self._size, size=min(sample_size, self._size), replace=False)]
+
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = self._nearest_centroids(sample, centroids)
+            order = np.argsort(assignments, kind="stable")
+            counts = np.bincount(assignments, minlength=n_lists)
+            occupied = np.flatnonzero(counts)
+            # Sum each partition's members in one pass; empty partitions keep their previous centroid.
+            offsets = np.concatenate([[0], np.cumsum(counts)])[occupied]
+            centroids[occupied] = np.add.reduceat(sample[order], offsets, axis=0)
+            centroids = self._normalize(centroids)
+
+        self._centroids = centroids
+        self._assignments = np.empty(0, dtype=np.int64)
+        self._assign_to_partitions(0, self._size)
+
+    def save(self, path: str) -> None:
+        """
+        Write the index to a directory of .npy files that load() can memory-map.
+
+        Args:
+            path (str): The directory to write to. It is created if missing.
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "vectors.npy"), self.vectors)
+        np.save(os.path.join(path, "ids.npy"), self.ids)
+        if self._centroids is not None and self._assignments is not None:
+            np.save(os.path.join(path, "centroids.npy"), self._centroids)
+            np.save(os.path.join(path, "assignments.npy"), self._assignments)
+        with open(os.path.join(path, "index.json"), "w") as meta_file:
+            json.dump({"dimensions": self.dimensions, "ivf_threshold": self.ivf_threshold}, meta_file)
+
+    @classmethod
+    def load(cls, path: str, *, mmap: bool = True) -> "VectorIndex":
+        """
+        Load an index written by save().
+
+        Args:
+            path (str): The directory the index was saved to.
+            mmap (bool): Map the arrays from disk instead of reading them into memory.
+
+        Returns:
+            VectorIndex: The loaded index. Adding to a memory-mapped index copies it into memory first.
+        """
+        with open(os.path.join(path, "index.json")) as meta_file:
+            meta = json.load(meta_file)
+        mmap_mode: Any = "r" if mmap else None
+
+        index = cls(dimensions=meta["dimensions"], ivf_threshold=meta["ivf_threshold"])
+        index._vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode=mmap_mode)
+        index._ids = np.load(os.path.join(path, "ids.npy"), mmap_mode=mmap_mode)
+        index._size = len(index._vectors)
+
+        centroids_path = os.path.join(path, "centroids.npy")
+        if os.path.exists(centroids_path):
+            index._centroids = np.load(centroids_path)
+            index._assignments = np.load(os.path.join(path, "assignments.npy"), mmap_mode=mmap_mode)
+            index._rebuild_lists()
+        return index
+
+    def _normalize(self, matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        normalized: np.ndarray = matrix / np.where(norms == 0, 1, norms)
+        return normalized.astype(np.float32, copy=False)
+
+    def _reserve(self, rows: int) -> None:
+        if rows <= len(self._vectors) and self._vectors.flags.writeable:
+            return
+        capacity = max(rows, 2 * len(self._vectors), 1024)
+        vectors = np.empty((capacity, self.dimensions or 0), dtype=np.float32)
+        vectors[: self._size] = self._vectors[: self._size]
+        ids = np.empty(capacity, dtype=np.int64)
+        ids[: self._size] = self._ids[: self._size]
+        self._vectors, self._ids = vectors, ids
+
+    def _assign_to_partitions(self, start: int, end: int) -> None:
+        if self._centroids is None or self._assignments is None:
+            return
+        new_assignments = self._nearest_centroids(self._vectors[start:end], self._centroids)
+        self._assignments = np.concatenate([self._assignments[:start], new_assignments])
+        self._rebuild_lists()
+
+    def _nearest_centroids(self, vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), SEARCH_BLOCK_ROWS):
+            block = vectors[start : start + SEARCH_BLOCK_ROWS]
+            assignments[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        return assignments
+
+    def _rebuild_lists(self) -> None:
+        if self._centroids is None or self._assignments is None:
+            return
+        # Rows grouped by partition: partition p owns _list_rows[_list_offsets[p]:_list_offsets[p + 1]].
+        self._list_rows = np.argsort(self._assignments, kind="stable")
+        counts = np.bincount(self._assignments, minlength=len(self._centroids))
+        self._list_offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def _search_exact(self, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        best_rows = np.full((len(queries), 0), -1, dtype=np.int64)
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        vectors = self.vectors
+        for start in range(0, self._size, SEARCH_BLOCK_ROWS):
+            block_scores = queries @ vectors[start : start + SEARCH_BLOCK_ROWS].T
+            block_rows = np.broadcast_to(
+                np.arange(start, start + block_scores.shape[1], dtype=np.int64), block_scores.shape
+            )
+            best_rows, best_scores = self._top_k(
+                np.concatenate([best_rows, block_rows], axis=1),
+                np.concatenate([best_scores, block_scores], axis=1),
+                k,
+            )
+        return self._pad(best_rows, best_scores, k)
+
+    def _search_partitions(self, queries: np.ndarray, k: int, nprobe: int) -> tuple[np.ndarray, np.ndarray]:
+        if self._centroids is None or self._list_rows is None or self._list_offsets is None:
+            return self._search_exact(queries, k)
+
+        nprobe = min(nprobe, len(self._centroids))
+        probes = np.argpartition(-(queries @ self._centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+        all_rows = np.full((len(queries), k), -1, dtype=np.int64)
+        all_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        vectors = self.vectors
+        for query_index, partitions in enumerate(probes):
+            candidates = np.concatenate(
+                [self._list_rows[self._list_offsets[p] : self._list_offsets[p + 1]] for p in partitions]
+            )
+            if not len(candidates):
+                continue
+            scores = vectors[candidates] @ queries[query_index]
+            rows, top_scores = self._top_k(candidates[np.newaxis, :], scores[np.newaxis, :], k)
+            all_rows[query_index, : rows.shape[1]] = rows[0]
+            all_scores[query_index, : rows.shape[1]] = top_scores[0]
+        return all_rows, all_scores
+
+    def _top_k(self, rows: np.ndarray, scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        if scores.shape[1] > k:
+            keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            rows = np.take_along_axis(rows, keep, axis=1)
+            scores = np.take_along_axis(scores, keep, axis=1)
+        order = np.argsort(-scores, axis=1, kind="stable")
+        return np.take_along_axis(rows, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+    def _pad(self, rows: np.ndarray, scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        if rows.shape[1] >= k:
+            return rows, scores
+        missing = k - rows.shape[1]
+        return (
+            np.pad(rows, ((0, 0), (0, missing)), constant_values=-1),
+            np.pad(scores, ((0, 0), (0, missing)), constant_values=-np.inf),
+        )
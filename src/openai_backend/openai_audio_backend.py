@@ -1,11 +1,15 @@
+import asyncio
 import io
 import logging
+from collections.abc import Iterator
 from typing import Any, Optional, Union
 
 from base.ai_base import ConfigManager, OpenAIBackend
 from base.ai_interface_base import AudioInterface
-from fuzzywuzzy import fuzz  # type: ignore
-from pydub import AudioSegment  # type: ignore
+from base.audio_stream import AudioChunk, AudioSource, SilencePolicy, iter_audio_chunks, iter_silence_chunks
+from base.concurrency import BatchResult, arun_bounded, iterate_in_thread, run_bounded
+from base.request_policy import RequestPolicy
+from base.transcript_stitching import ChunkTranscript, TimedText, align_overlap, stitch_chunks
 
 logger = logging.getLogger(__name__)
 
@@ -22,89 +26,271 @@ class OpenAIAudioConfigManager(ConfigManager):
 
 
 class OpenAIAudioBackend(AudioInterface, OpenAIBackend):
-    def __init__(self, api_key: Optional[str] = None, **kwargs: dict[str, Any]) -> None:
-        super().__init__(OpenAIAudioConfigManager(**kwargs), api_key)
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None, **kwargs: dict[str, Any]) -> None:
+        super().__init__(OpenAIAudioConfigManager(**kwargs), api_key, base_url)
+        self.silence_policy: Optional[SilencePolicy] = None
 
     def voice_to_text(
         self,
-        audio_input: Union[bytes, io.BufferedReader],
+        audio_input: AudioSource,
         chunk_length: int = 600000,
         overlap: int = 5000,
         **kwargs: Any,
     ) -> Any:
+        """
+        Transcribe audio of any length by transcribing overlapping chunks concurrently and stitching the results.
+
+        Args:
+            audio_input (AudioSource): The audio to transcribe: bytes, a file path, a binary file object or a
+                memory map. It is decoded incrementally, so memory does not grow with the recording's length.
+            chunk_length (int): Milliseconds of audio per chunk, or the longest chunk with a silence policy.
+            overlap (int): Milliseconds each chunk overlaps the next, so words cut at a boundary are not lost.
+                Unused with a silence policy, which cuts in silence instead.
+            **kwargs (Any): Additional configuration for the transcription requests, and:
+                max_concurrency (int): The maximum number of chunks uploaded at once. Defaults to 4.
+                max_chunk_attempts (int): Attempts per chunk when uploads fail with timeouts, rate limits or server
+                    errors. Defaults to 3. A request policy with more than one attempt takes precedence.
+
+        Returns:
+            Any: The transcript, or None if a chunk could not be transcribed.
+        """
+        max_concurrency: Any = kwargs.pop("max_concurrency", 4)
+        policy = self._chunk_policy(kwargs.pop("max_chunk_attempts", 3))
         config = self.config_manager.combine_config("transcription", **kwargs)
+        chunks = self._timed_chunks(audio_input, chunk_length, overlap)
 
-        buffer = io.BytesIO()
-        if isinstance(audio_input, bytes):
-            buffer.write(audio_input)
-        elif isinstance(audio_input, io.BytesIO):
-            buffer = audio_input
-        else:
-            error = "Unsupported audio input type."
-            raise ValueError(error)
+        try:
+            results = run_bounded(lambda chunk: self._transcribe_timed(chunk, config, policy), chunks, max_concurrency)
+            transcripts = self._chunk_transcripts(results)
+        except Exception as e:
+            logger.error(f"Audio transcription API error: {e!s}")
+            return None
 
-        buffer.seek(0)
-        audio = AudioSegment.from_file(buffer)
-        chunks = [audio[i : i + chunk_length + overlap] for i in range(0, len(audio), chunk_length - overlap)]
+        return self.stitch_chunks(transcripts)
 
-        transcriptions: list[str] = []
-        for chunk in chunks:
-            transcription = self.process_chunk(chunk, config)
-            if transcription:
-                transcriptions.append(transcription)
+    async def avoice_to_text(
+        self,
+        audio_input: AudioSource,
+        chunk_length: int = 600000,
+        overlap: int = 5000,
+        **kwargs: Any,
+    ) -> Any:
+        """Asynchronous counterpart of voice_to_text."""
+        max_concurrency: Any = kwargs.pop("max_concurrency", 4)
+        policy = self._chunk_policy(kwargs.pop("max_chunk_attempts", 3))
+        config = self.config_manager.combine_config("transcription", **kwargs)
+        # Chunks are decoded as they are needed; each step reads and decodes audio, so it runs off the event loop.
+        chunks = iterate_in_thread(self._timed_chunks(audio_input, chunk_length, overlap))
 
-        character_overlap = overlap / 1000 * 16 * 5
-        full_transcription = self.stitch_transcriptions(transcriptions, character_overlap)
-        return full_transcription
+        try:
+            results = await arun_bounded(
+                lambda chunk: self._atranscribe_timed(chunk, config, policy), chunks, max_concurrency
+            )
+            transcripts = self._chunk_transcripts(results)
+        except Exception as e:
+            logger.error(f"Audio transcription API error: {e!s}")
+            return None
+
+        return self.stitch_chunks(transcripts)
+
+    def _chunk_policy(self, max_chunk_attempts: int) -> RequestPolicy:
+        if self.request_policy.max_attempts > 1:
+            return self.request_policy
+        return RequestPolicy(max_attempts=max_chunk_attempts)
+
+    def _chunk_transcripts(self, results: list[BatchResult]) -> list[ChunkTranscript]:
+        # A failed chunk would leave a hole in the middle of the transcript, so it fails the whole call.
+        for result in results:
+            if result.error is not None:
+                raise result.error
+        return [result.value for result in results]
+
+    def set_silence_policy(self, policy: Optional[SilencePolicy]) -> None:
+        """
+        Cut audio into chunks at silences instead of at fixed lengths.
+
+        Chunks cut in silence do not need to overlap, so less audio is uploaded and billed twice and
+        words are not split between chunks. `chunk_length` becomes the longest allowed chunk and `overlap`
+        is ignored; the policy's fallback overlap applies only where no silence is found.
+
+        Args:
+            policy (Optional[SilencePolicy]): The policy to use, or None for fixed-length overlapping chunks.
+        """
+        self.silence_policy = policy
+
+    def _timed_chunks(self, audio_input: AudioSource, chunk_length: int, overlap: int) -> Iterator[AudioChunk]:
+        if self.silence_policy is not None:
+            return iter_silence_chunks(audio_input, chunk_length, self.silence_policy)
+        chunks = self.split_audio(audio_input, chunk_length, overlap)
+        step = chunk_length - overlap
+        return (AudioChunk(chunk, index * step, index * step + len(chunk)) for index, chunk in enumerate(chunks))
+
+    def split_audio(self, audio_input: AudioSource, chunk_length: int, overlap: int) -> Iterator[Any]:
+        """
+        Decode audio lazily into overlapping chunks of `chunk_length` plus `overlap` milliseconds.
+
+        Args:
+            audio_input (AudioSource): Encoded audio as bytes, a file path, a binary file object or a memory map.
+            chunk_length (int): Milliseconds of audio per chunk.
+            overlap (int): Milliseconds each chunk overlaps the next.
+
+        Returns:
+            Iterator[Any]: The chunks, decoded one at a time as they are requested.
+
+        Raises:
+            ValueError: If the audio input type is not supported.
+        """
+        return iter_audio_chunks(audio_input, chunk_length, overlap)
 
     def process_chunk(self, chunk: Any, config: dict[str, Any]) -> Any:
-        buffer = io.BytesIO()
-        chunk.export(buffer, format="mp3")
-        buffer.seek(0)
+        try:
+            return self._transcribe_chunk(chunk, config, RequestPolicy(max_attempts=1)).text
+        except Exception as e:
+            logger.error(f"Audio transcription API error: {e!s}")
+            return None
 
+    async def aprocess_chunk(self, chunk: Any, config: dict[str, Any]) -> Any:
         try:
-            response = self.client.audio.transcriptions.create(
-                file=("filename.mp3", buffer, "audio/mpeg"),
-                model=config["model"],
-                response_format=config["response_format"],
-                timestamp_granularities=config["timestamps"],
-            )
-            return response.text
+            return (await self._atranscribe_chunk(chunk, config, RequestPolicy(max_attempts=1))).text
         except Exception as e:
             logger.error(f"Audio transcription API error: {e!s}")
             return None
+
+    def _transcribe_timed(self, chunk: AudioChunk, config: dict[str, Any], policy: RequestPolicy) -> ChunkTranscript:
+        return self._place(self._transcribe_chunk(chunk.audio, config, policy), chunk)
+
+    async def _atranscribe_timed(
+        self, chunk: AudioChunk, config: dict[str, Any], policy: RequestPolicy
+    ) -> ChunkTranscript:
+        return self._place(await self._atranscribe_chunk(chunk.audio, config, policy), chunk)
+
+    def _place(self, transcript: ChunkTranscript, chunk: AudioChunk) -> ChunkTranscript:
+        # Chunk timestamps are relative to the chunk; its span places them in the recording. Silences
+        # shortened before upload are put back, so timestamps after them are not early.
+        transcript.offset = chunk.start / 1000
+        transcript.duration = (chunk.end - chunk.start) / 1000
+        if chunk.gaps:
+            transcript.segments = [_untrimmed(timed, chunk) for timed in transcript.segments]
+            transcript.words = [_untrimmed(timed, chunk) for timed in transcript.words]
+        return transcript
+
+    def _transcribe_chunk(self, chunk: Any, config: dict[str, Any], policy: RequestPolicy) -> ChunkTranscript:
+        # The chunk is encoded once; only the upload is retried.
+        buffer = self._export_chunk(chunk)
+        client = self.client.with_options(max_retries=0) if policy.max_attempts > 1 else self.client
+
+        def request(timeout: Optional[float]) -> ChunkTranscript:
+            buffer.seek(0)
+            self.acquire_rate_limit(config["model"])
+            with self.track_call("transcription", config["model"], buffer) as call:
+                response = client.audio.transcriptions.create(**self._transcription_params(buffer, config, timeout))
+                call.response = response
+            return self._chunk_transcript(response, len(chunk) / 1000)
+
+        try:
+            transcript: ChunkTranscript = policy.call(request)
+            return transcript
+        finally:
+            buffer.close()
+
+    async def _atranscribe_chunk(self, chunk: Any, config: dict[str, Any], policy: RequestPolicy) -> ChunkTranscript:
+        buffer = await asyncio.to_thread(self._export_chunk, chunk)
+        client = self.async_client.with_options(max_retries=0) if policy.max_attempts > 1 else self.async_client
+
+        async def request(timeout: Optional[float]) -> ChunkTranscript:
+            buffer.seek(0)
+            await self.aacquire_rate_limit(config["model"])
+            with self.track_call("transcription", config["model"], buffer) as call:
+                response = await client.audio.transcriptions.create(
+                    **self._transcription_params(buffer, config, timeout)
+                )
+                call.response = response
+            return self._chunk_transcript(response, len(chunk) / 1000)
+
+        try:
+            return await policy.acall(request)
         finally:
             buffer.close()
 
+    def _transcription_params(self, buffer: io.BytesIO, config: dict[str, Any], timeout: Optional[float]) -> dict:
+        params = {
+            "file": ("filename.mp3", buffer, "audio/mpeg"),
+            "model": config["model"],
+            "response_format": config["response_format"],
+            "timestamp_granularities": config["timestamps"],
+        }
+        return params if timeout is None else {**params, "timeout": timeout}
+
+    def _export_chunk(self, chunk: Any) -> io.BytesIO:
+        buffer = io.BytesIO()
+        chunk.export(buffer, format="mp3")
+        buffer.seek(0)
+        return buffer
+
+    def _chunk_transcript(self, response: Any, duration: float) -> ChunkTranscript:
+        if isinstance(response, str):
+            # The "text" response format has no timestamps.
+            return ChunkTranscript(response, duration=duration)
+        segments = [_timed_text(segment, "text") for segment in getattr(response, "segments", None) or ()]
+        words = [_timed_text(word, "word") for word in getattr(response, "words", None) or ()]
+        return ChunkTranscript(response.text, duration=duration, segments=segments, words=words)
+
+    def stitch_chunks(self, transcripts: list[ChunkTranscript]) -> str:
+        """
+        Join the transcripts of overlapping chunks, de-duplicating the overlaps by their timestamps.
+
+        Chunks transcribed without timestamps are aligned on their text instead.
+
+        Args:
+            transcripts (list[ChunkTranscript]): The chunk transcripts, in recording order.
+
+        Returns:
+            str: The transcript of the whole recording.
+        """
+        return stitch_chunks(transcripts)
+
     def find_best_overlap(self, stitched_text: str, current_text: str, overlap: int = 200) -> int:
-        best_ratio = 0
-        best_index = -1
-        max_length = min(int(round(overlap)), len(stitched_text), len(current_text))
+        """
+        Find where in `stitched_text` the repetition of the start of `current_text` begins.
 
-        for i in range(50, max_length):
-            ratio = fuzz.partial_ratio(stitched_text[-i:], current_text[:i])
-            if ratio > best_ratio:
-                best_ratio = ratio
-                best_index = len(stitched_text) - i
+        Args:
+            stitched_text (str): The transcript so far.
+            current_text (str): The transcript of the next chunk.
+            overlap (int): Characters at the end of `stitched_text` that may be repeated.
 
-        return best_index
+        Returns:
+            int: The index to cut `stitched_text` at before appending `current_text`, or -1 if none was found.
+        """
+        cut = align_overlap(stitched_text, current_text, int(overlap))
+        if cut is None:
+            return -1
+        # The words of current_text before the anchor repeat about as many characters before it in stitched_text.
+        return max(cut[0] - cut[1], 0)
 
     def stitch_transcriptions(self, transcriptions: list[str], overlap: float = 5000) -> str:
-        stitched_text = transcriptions[0]
-        for current_text in transcriptions[1:]:
-            overlap_index = self.find_best_overlap(stitched_text, current_text, int(overlap))
-            stitched_text = (
-                stitched_text[:overlap_index] + current_text if overlap_index != -1 else stitched_text + current_text
-            )
+        """
+        Join chunk transcripts without timestamps by aligning the text where they overlap.
 
-        return stitched_text.strip()
+        Args:
+            transcriptions (list[str]): The chunk transcripts, in recording order.
+            overlap (float): Characters at the end of each transcript that may be repeated by the next.
+
+        Returns:
+            str: The joined transcript.
+        """
+        return stitch_chunks([ChunkTranscript(text) for text in transcriptions], int(overlap))
 
     def text_to_speech(self, text: str, **kwargs: Any) -> Optional[Union[bytes, io.BytesIO]]:
+        model = kwargs.get("model", "tts-model")
         try:
-            response = self.client.audio.speech.create(
-                model=kwargs.get("model", "tts-model"), voice=kwargs.get("voice", "default-voice"), input=text
-            )
-            return io.BytesIO(response.audio)
+            self.acquire_rate_limit(model)
+            with self.track_call("text_to_speech", model, text) as call:
+                response = self.client.audio.speech.create(
+                    model=model, voice=kwargs.get("voice", "default-voice"), input=text
+                )
+                call.response = response
+                call.response_payload = response.content
+            return io.BytesIO(response.content)
         except Exception as e:
             logger.error(f"Text-to-speech API error: {e!s}")
             return None
@@ -114,3 +300,15 @@ class OpenAIAudioBackend(AudioInterface, OpenAIBackend):
         if transcribed_text:
             return transcribed_text
         return None
+
+
+def _timed_text(item: Any, text_field: str) -> TimedText:
+    # SDK versions without typed verbose_json responses keep segments and words as plain dicts.
+    if isinstance(item, dict):
+        return TimedText(item["start"], item["end"], item[text_field])
+    return TimedText(item.start, item.end, getattr(item, text_field))
+
+
+def _untrimmed(timed: TimedText, chunk: AudioChunk) -> TimedText:
+    start, end = (chunk.untrimmed(seconds * 1000) / 1000 for seconds in (timed.start, timed.end))
+    return TimedText(start, end, timed.text)
@@ -0,0 +1,162 @@
+import json
+import logging
+import time
+from collections.abc import Sequence
+from typing import Any, Callable, Optional
+
+from base.concurrency import BatchResult
+
+logger = logging.getLogger(__name__)
+
+CHAT_COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+EMBEDDINGS_ENDPOINT = "/v1/embeddings"
+TERMINAL_BATCH_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def build_batch_jsonl(endpoint: str, bodies: Sequence[dict[str, Any]]) -> bytes:
+    """
+    Compile request bodies into the JSONL input format of the Batch API.
+
+    Every line is tagged with a custom_id derived from the position of its body, which is how
+    results are mapped back to the caller's inputs.
+
+    Args:
+        endpoint (str): The endpoint every request targets, such as "/v1/chat/completions".
+        bodies (Sequence[dict[str, Any]]): The request bodies.
+
+    Returns:
+        bytes: The JSONL file content.
+    """
+    lines = [
+        json.dumps({"custom_id": custom_id(index), "method": "POST", "url": endpoint, "body": body})
+        for index, body in enumerate(bodies)
+    ]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def custom_id(index: int) -> str:
+    return f"request-{index}"
+
+
+def parse_custom_id(value: str) -> Optional[int]:
+    prefix, _, index = value.rpartition("-")
+    if prefix != "request" or not index.isdigit():
+        return None
+    return int(index)
+
+
+class OpenAIBatchRunner:
+    def __init__(self, client: Any, poll_interval: float = 30.0, timeout: Optional[float] = None) -> None:
+        """
+        Submit requests through the asynchronous Batch API and collect their results.
+
+        Args:
+            client (Any): An OpenAI client.
+            poll_interval (float): Seconds between status checks while waiting for a batch.
+            timeout (Optional[float]): Seconds to wait for a batch before giving up. None waits indefinitely.
+        """
+        self.client = client
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+    def submit(
+        self,
+        endpoint: str,
+        bodies: Sequence[dict[str, Any]],
+        completion_window: str = "24h",
+        metadata: Optional[dict[str, str]] = None,
+    ) -> Any:
+        """
+        Upload the requests as a batch input file and create the batch.
+
+        Returns:
+            Any: The created batch.
+        """
+        input_file = self.client.files.create(
+            file=("batch_input.jsonl", build_batch_jsonl(endpoint, bodies), "application/jsonl"),
+            purpose="batch",
+        )
+        options: dict[str, Any] = {"metadata": metadata} if metadata else {}
+        batch = self.client.batches.create(
+            input_file_id=input_file.id, endpoint=endpoint, completion_window=completion_window, **options
+        )
+        logger.debug(f"Submitted batch {batch.id} with {len(bodies)} requests to {endpoint}")
+        return batch
+
+    def wait(self, batch_id: str) -> Any:
+        """
+        Poll a batch until it reaches a terminal status.
+
+        Raises:
+            TimeoutError: If the batch is still running after `timeout` seconds. The batch keeps running and
+                can be collected later with its id.
+        """
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status in TERMINAL_BATCH_STATUSES:
+                return batch
+            if deadline is not None and time.monotonic() >= deadline:
+                error_message = (
+                    f"Batch {batch_id} did not finish within {self.timeout} seconds (status {batch.status})."
+                )
+                raise TimeoutError(error_message)
+            time.sleep(self.poll_interval)
+
+    def collect(self, batch: Any, count: int, parse: Callable[[dict[str, Any]], Any]) -> list[BatchResult]:
+        """
+        Map the output and error files of a finished batch back onto the inputs.
+
+        Args:
+            batch (Any): A batch in a terminal status.
+            count (int): The number of requests that were submitted.
+            parse (Callable[[dict[str, Any]], Any]): Turns a successful response body into a result value.
+
+        Returns:
+            list[BatchResult]: One result per submitted request, in submission order.
+        """
+        results = [BatchResult(index) for index in range(count)]
+        answered = [False] * count
+
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).content.decode("utf-8").splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                index = parse_custom_id(record.get("custom_id", ""))
+                if index is None or index >= count:
+                    logger.error(f"Ignoring batch result with unknown custom_id {record.get('custom_id')!r}")
+                    continue
+                answered[index] = True
+                self._fill_result(results[index], record, parse)
+
+        for index, done in enumerate(answered):
+            if not done:
+                error_message = f"Batch {batch.id} ended with status {batch.status} without a result for this request."
+                results[index].error = RuntimeError(error_message)
+        return results
+
+    def run(
+        self, endpoint: str, bodies: Sequence[dict[str, Any]], parse: Callable[[dict[str, Any]], Any]
+    ) -> list[BatchResult]:
+        """Submit the requests, wait for the batch to finish and collect the results."""
+        batch = self.submit(endpoint, bodies)
+        finished = self.wait(batch.id)
+        return self.collect(finished, len(bodies), parse)
+
+    def _fill_result(self, result: BatchResult, record: dict[str, Any], parse: Callable[[dict[str, Any]], Any]) -> None:
+        response = record.get("response") or {}
+        error = record.get("error")
+        status_code = response.get("status_code")
+        if error or status_code != 200:  # noqa: PLR2004
+            detail = error or response.get("body", {}).get("error") or f"status code {status_code}"
+            error_message = f"Batch request failed: {detail}"
+            result.error = RuntimeError(error_message)
+            return
+
+        try:
+            result.value = parse(response["body"])
+        except Exception as e:
+            result.error = e
@@ -0,0 +1,295 @@
+import logging
+import time
+from collections.abc import AsyncIterator, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any, Generic, Optional, TypeVar
+
+from base.json_schema import schema_at, validate
+from base.json_stream import JsonEvent, JsonStreamParser, PathKey, path_matches
+from base.metrics import CallTracker
+from openai.types.chat import ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StreamMetrics:
+    """Timing of a streamed chat completion.
+
+    Attributes:
+        time_to_first_token (Optional[float]): Seconds from sending the request to the first content delta.
+        duration (Optional[float]): Seconds from sending the request to the end of the stream.
+        completion_tokens (int): Generated tokens, from usage when the provider reports it,
+            otherwise the number of content deltas received.
+        tokens_per_second (Optional[float]): Generation rate after the first token.
+    """
+
+    time_to_first_token: Optional[float] = None
+    duration: Optional[float] = None
+    completion_tokens: int = 0
+    tokens_per_second: Optional[float] = None
+
+
+class _ChatStreamAccumulator:
+    """Assembles streamed chunks into a final message and records timing."""
+
+    def __init__(self, started_at: float) -> None:
+        self.started_at = started_at
+        self.first_token_at: Optional[float] = None
+        self.parts: list[str] = []
+        self.role = "assistant"
+        self.finish_reason: Optional[str] = None
+        self.usage: Any = None
+        self.model: Optional[str] = None
+        self.delta_count = 0
+        self.metrics = StreamMetrics()
+        self.finished = False
+
+    def add(self, chunk: Any) -> Optional[str]:
+        self.model = getattr(chunk, "model", None) or self.model
+        if getattr(chunk, "usage", None) is not None:
+            self.usage = chunk.usage
+        if not chunk.choices:
+            return None
+
+        choice = chunk.choices[0]
+        if choice.finish_reason is not None:
+            self.finish_reason = choice.finish_reason
+        delta = choice.delta
+        if getattr(delta, "role", None):
+            self.role = delta.role
+        if not delta.content:
+            return None
+
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.delta_count += 1
+        self.parts.append(delta.content)
+        return str(delta.content)
+
+    def finish(self) -> None:
+        if self.finished:
+            return
+        self.finished = True
+        finished_at = time.perf_counter()
+
+        completion_tokens = getattr(self.usage, "completion_tokens", None) or self.delta_count
+        self.metrics.duration = finished_at - self.started_at
+        self.metrics.completion_tokens = completion_tokens
+        if self.first_token_at is not None:
+            self.metrics.time_to_first_token = self.first_token_at - self.started_at
+            generation_time = finished_at - self.first_token_at
+            if generation_time > 0:
+                self.metrics.tokens_per_second = completion_tokens / generation_time
+
+        logger.debug(
+            f"Chat stream finished: model={self.model} ttft={self.metrics.time_to_first_token} "
+            f"tokens={completion_tokens} tokens_per_second={self.metrics.tokens_per_second}"
+        )
+
+    @property
+    def content(self) -> str:
+        return "".join(self.parts)
+
+    @property
+    def choice(self) -> Choice:
+        message = ChatCompletionMessage.model_construct(role=self.role, content=self.content)
+        return Choice.model_construct(index=0, message=message, finish_reason=self.finish_reason, logprobs=None)
+
+
+class _ChatStreamBase:
+    def __init__(self, stream: Any, started_at: float, tracker: Optional[CallTracker] = None) -> None:
+        self._stream = stream
+        self._accumulator = _ChatStreamAccumulator(started_at)
+        # Records the call with its full duration and usage once the stream ends.
+        self._tracker = tracker
+
+    @property
+    def content(self) -> str:
+        """The content received so far, or the full message once the stream is exhausted."""
+        return self._accumulator.content
+
+    @property
+    def choice(self) -> Choice:
+        """The assembled choice, equivalent to text_chat(..., response_type="full")."""
+        return self._accumulator.choice
+
+    @property
+    def finish_reason(self) -> Optional[str]:
+        return self._accumulator.finish_reason
+
+    @property
+    def usage(self) -> Any:
+        """Token usage reported by the provider at the end of the stream, if any."""
+        return self._accumulator.usage
+
+    @property
+    def metrics(self) -> StreamMetrics:
+        return self._accumulator.metrics
+
+    def _result(self, response_type: Optional[str]) -> Any:
+        if response_type == "full":
+            return self.choice
+        return self.content
+
+    def _finish(self) -> None:
+        self._accumulator.finish()
+        if self._tracker is not None:
+            self._tracker.response = self
+            self._tracker.response_payload = self.content
+            self._tracker.finish()
+
+    def _fail(self, error: BaseException) -> None:
+        # Leaving a loop early closes the iterator but not the stream, which can still be read on.
+        if self._tracker is not None and not isinstance(error, GeneratorExit):
+            self._tracker.finish(error)
+
+
+class ChatStream(_ChatStreamBase):
+    """
+    A streamed chat completion.
+
+    Iterating yields content deltas as they arrive. Once the stream is exhausted the assembled
+    message, usage and timing metrics are available on the object.
+    """
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            for chunk in self._stream:
+                delta = self._accumulator.add(chunk)
+                if delta is not None:
+                    yield delta
+        except BaseException as e:
+            self._fail(e)
+            raise
+        self._finish()
+
+    def result(self, response_type: Optional[str] = None) -> Any:
+        """Consume the rest of the stream and return what text_chat would have returned."""
+        for _ in self:
+            pass
+        return self._result(response_type)
+
+    def close(self) -> None:
+        close = getattr(self._stream, "close", None)
+        if close is not None:
+            close()
+        self._finish()
+
+
+class AsyncChatStream(_ChatStreamBase):
+    """Asynchronous counterpart of ChatStream."""
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        try:
+            async for chunk in self._stream:
+                delta = self._accumulator.add(chunk)
+                if delta is not None:
+                    yield delta
+        except BaseException as e:
+            self._fail(e)
+            raise
+        self._finish()
+
+    async def result(self, response_type: Optional[str] = None) -> Any:
+        """Consume the rest of the stream and return what atext_chat would have returned."""
+        async for _ in self:
+            pass
+        return self._result(response_type)
+
+    async def close(self) -> None:
+        close = getattr(self._stream, "close", None)
+        if close is not None:
+            await close()
+        self._finish()
+
+
+StreamT = TypeVar("StreamT", bound=_ChatStreamBase)
+
+
+class _StructuredChatStreamBase(Generic[StreamT]):
+    def __init__(self, stream: StreamT, schema: Optional[Mapping[str, Any]], item_path: Sequence[PathKey]) -> None:
+        self.stream = stream
+        self.schema = schema
+        self.item_path = tuple(item_path)
+        self._parser = JsonStreamParser(item_path)
+
+    @property
+    def value(self) -> Any:
+        """The whole decoded document once the stream is exhausted, otherwise None."""
+        return self._parser.value
+
+    @property
+    def usage(self) -> Any:
+        return self.stream.usage
+
+    @property
+    def metrics(self) -> StreamMetrics:
+        return self.stream.metrics
+
+    @property
+    def finish_reason(self) -> Optional[str]:
+        return self.stream.finish_reason
+
+    def _checked(self, events: list[JsonEvent]) -> list[JsonEvent]:
+        if self.schema is not None:
+            for event in events:
+                item_schema = schema_at(self.schema, event.path)
+                if item_schema is not None:
+                    validate(event.value, item_schema, self.schema, event.path)
+        return events
+
+    def _finish(self) -> list[JsonEvent]:
+        events = self._checked(self._parser.close())
+        if self.schema is not None:
+            # Items were validated as they arrived; only the rest of the document is left.
+            validate(self.value, self.schema, skip=lambda path: path_matches(self.item_path, path))
+        return events
+
+
+class StructuredChatStream(_StructuredChatStreamBase[ChatStream]):
+    """
+    A streamed structured-output chat completion.
+
+    Iterating yields a JsonEvent for every value at the item path as soon as it is complete, validated
+    against its part of the schema. Once the stream is exhausted, the whole document is available as `value`.
+
+    Raises:
+        SchemaValidationError: While iterating, if a value does not match the schema.
+        ValueError: While iterating, if the reply is not valid JSON.
+    """
+
+    def __iter__(self) -> Iterator[JsonEvent]:
+        for delta in self.stream:
+            yield from self._checked(self._parser.feed(delta))
+        yield from self._finish()
+
+    def result(self) -> Any:
+        """Consume the rest of the stream and return the whole document."""
+        for _ in self:
+            pass
+        return self.value
+
+    def close(self) -> None:
+        self.stream.close()
+
+
+class AsyncStructuredChatStream(_StructuredChatStreamBase[AsyncChatStream]):
+    """Asynchronous counterpart of StructuredChatStream."""
+
+    async def __aiter__(self) -> AsyncIterator[JsonEvent]:
+        async for delta in self.stream:
+            for event in self._checked(self._parser.feed(delta)):
+                yield event
+        for event in self._finish():
+            yield event
+
+    async def result(self) -> Any:
+        """Consume the rest of the stream and return the whole document."""
+        async for _ in self:
+            pass
+        return self.value
+
+    async def close(self) -> None:
+        await self.stream.close()
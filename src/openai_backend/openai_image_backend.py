@@ -20,14 +20,30 @@ class OpenAIImageConfigManager(ConfigManager):
 
 
 class OpenAIImageBackend(ImageInterface, OpenAIBackend):
-    def __init__(self, api_key: Optional[str] = None, **kwargs: dict[str, Any]) -> None:
-        super().__init__(OpenAIImageConfigManager(**kwargs), api_key)
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None, **kwargs: dict[str, Any]) -> None:
+        super().__init__(OpenAIImageConfigManager(**kwargs), api_key, base_url)
 
     def generate_image(self, prompt: str, **kwargs: dict[str, Any]) -> Any:
         config = self.config_manager.combine_config("image_generation", **kwargs)
 
         try:
-            response = self.client.images.generate(prompt=prompt, **config)
+            self.acquire_rate_limit(config["model"])
+            with self.track_call("image_generation", config["model"], prompt) as call:
+                response = self.client.images.generate(prompt=prompt, **config)
+                call.response = response
+            return response.data[0].url
+        except Exception as e:
+            self.log_error("Image generation API error", e)
+            return None
+
+    async def agenerate_image(self, prompt: str, **kwargs: Any) -> Any:
+        config = self.config_manager.combine_config("image_generation", **kwargs)
+
+        try:
+            await self.aacquire_rate_limit(config["model"])
+            with self.track_call("image_generation", config["model"], prompt) as call:
+                response = await self.async_client.images.generate(prompt=prompt, **config)
+                call.response = response
             return response.data[0].url
         except Exception as e:
             self.log_error("Image generation API error", e)
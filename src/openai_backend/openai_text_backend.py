@@ -1,7 +1,42 @@
-from typing import Any, Optional
+import base64
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Iterable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from itertools import repeat
+from typing import Any, Callable, Optional, TypeVar
+
+import numpy as np
 
 from base.ai_base import ConfigManager, OpenAIBackend
 from base.ai_interface_base import TextInterface
+from base.concurrency import (
+    BatchResult,
+    arun_bounded,
+    arun_bounded_as_completed,
+    run_bounded,
+    run_bounded_as_completed,
+)
+from base.embedding_store import EmbeddingStore
+from base.json_stream import WILDCARD, PathKey
+from base.model_router import ModelRouter
+from base.request_policy import is_retryable
+from base.response_cache import ResponseCache, request_key
+from base.single_flight import SingleFlight
+from base.token_counter import TokenCounter, TrimPolicy, unpin_messages
+from openai.types.chat import ChatCompletion
+
+from openai_backend.openai_batch import CHAT_COMPLETIONS_ENDPOINT, EMBEDDINGS_ENDPOINT, OpenAIBatchRunner
+from openai_backend.openai_chat_stream import (
+    AsyncChatStream,
+    AsyncStructuredChatStream,
+    ChatStream,
+    StructuredChatStream,
+)
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
 
 
 class OpenAITextConfigManager(ConfigManager):
@@ -15,29 +50,743 @@ class OpenAITextConfigManager(ConfigManager):
         self.update_config(**kwargs)
 
 
+# Per-request limits of the embeddings endpoint.
+MAX_EMBEDDING_BATCH_SIZE = 2048
+MAX_EMBEDDING_BATCH_TOKENS = 300000
+
+
 class OpenAITextBackend(OpenAIBackend, TextInterface):
-    def __init__(self, api_key: Optional[str] = None, **kwargs: dict[str, Any]) -> None:
-        super().__init__(OpenAITextConfigManager(**kwargs), api_key)
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None, **kwargs: dict[str, Any]) -> None:
+        super().__init__(OpenAITextConfigManager(**kwargs), api_key, base_url)
+        self.response_cache: Optional[ResponseCache] = None
+        self.force_cache = False
+        self.embedding_store: Optional[EmbeddingStore] = None
+        self.trim_policy: Optional[TrimPolicy] = None
+        self.single_flight: Optional[SingleFlight] = None
+        self.model_router: Optional[ModelRouter] = None
+        self._token_counters: dict[str, TokenCounter] = {}
 
     def text_chat(self, messages: list, response_type: Optional[str] = None, **kwargs: dict[str, Any]) -> Any:
+        # A latency SLO only steers the model router and is never sent.
+        latency_slo: Any = kwargs.pop("latency_slo", None)
+        if self._routes(kwargs):
+            return self._routed_text_chat(messages, response_type, latency_slo, kwargs)
+        config = self.config_manager.combine_config("chat", **kwargs)
+
+        try:
+            return self._text_chat(messages, response_type, config)
+        except Exception as e:
+            self.log_error("OpenAI Chat API error", e)
+            return None
+
+    async def atext_chat(self, messages: list, response_type: Optional[str] = None, **kwargs: Any) -> Any:
+        latency_slo = kwargs.pop("latency_slo", None)
+        if self._routes(kwargs):
+            return await self._arouted_text_chat(messages, response_type, latency_slo, kwargs)
         config = self.config_manager.combine_config("chat", **kwargs)
 
         try:
-            response = self.client.chat.completions.create(messages=messages, **config)
-            if response_type == "full":
-                return response.choices[0]
-            else:
-                return response.choices[0].message.content
+            return await self._atext_chat(messages, response_type, config)
         except Exception as e:
             self.log_error("OpenAI Chat API error", e)
             return None
 
+    def text_chat_stream(self, messages: list, **kwargs: Any) -> Optional[ChatStream]:
+        """
+        Send messages for chatting and stream the reply.
+
+        Args:
+            messages (list): A list of messages for the chat.
+            **kwargs (Any): Additional configuration for the chat request.
+
+        Returns:
+            Optional[ChatStream]: An iterator of content deltas that exposes the assembled message, usage and
+                time-to-first-token metrics once exhausted, or None if the request could not be started.
+        """
+        config = self._stream_config(**kwargs)
+
+        try:
+            messages = self._fit_messages(messages, config)
+            self.acquire_rate_limit(config["model"], self._estimate_chat_tokens(messages, config))
+            started_at = time.perf_counter()
+            with self.track_call("chat_stream", config["model"], messages) as call:
+                stream = self.client.chat.completions.create(messages=messages, **config)
+                call.defer()
+            return ChatStream(stream, started_at, call)
+        except Exception as e:
+            self.log_error("OpenAI Chat API error", e)
+            return None
+
+    async def atext_chat_stream(self, messages: list, **kwargs: Any) -> Optional[AsyncChatStream]:
+        """Asynchronous counterpart of text_chat_stream."""
+        config = self._stream_config(**kwargs)
+
+        try:
+            messages = self._fit_messages(messages, config)
+            await self.aacquire_rate_limit(config["model"], self._estimate_chat_tokens(messages, config))
+            started_at = time.perf_counter()
+            with self.track_call("chat_stream", config["model"], messages) as call:
+                stream = await self.async_client.chat.completions.create(messages=messages, **config)
+                call.defer()
+            return AsyncChatStream(stream, started_at, call)
+        except Exception as e:
+            self.log_error("OpenAI Chat API error", e)
+            return None
+
+    def text_chat_structured(
+        self,
+        messages: list,
+        schema: Optional[Mapping[str, Any]] = None,
+        item_path: Sequence[PathKey] = (WILDCARD,),
+        schema_name: str = "response",
+        **kwargs: Any,
+    ) -> Optional[StructuredChatStream]:
+        """
+        Ask for a JSON reply and stream its values as they are generated.
+
+        With a schema the reply is constrained to it using structured outputs; without one JSON mode is
+        used, which requires the messages to mention JSON. The reply is parsed incrementally, and every value
+        at `item_path` is yielded as soon as it is complete, validated against its part of the schema, so it
+        can be processed while the rest is still being generated.
+
+        Args:
+            messages (list): A list of messages for the chat.
+            schema (Optional[Mapping[str, Any]]): The JSON schema of the reply. The root must be an object.
+            item_path (Sequence[PathKey]): The values to yield, where "*" matches any key or index.
+                ("records", "*") yields each element of the "records" array.
+            schema_name (str): The name the schema is sent under.
+            **kwargs (Any): Additional configuration for the chat request.
+
+        Returns:
+            Optional[StructuredChatStream]: An iterator of JsonEvent that exposes the whole document as
+                `value` once exhausted, or None if the request could not be started.
+        """
+        stream = self.text_chat_stream(messages, response_format=self._response_format(schema, schema_name), **kwargs)
+        return StructuredChatStream(stream, schema, item_path) if stream is not None else None
+
+    async def atext_chat_structured(
+        self,
+        messages: list,
+        schema: Optional[Mapping[str, Any]] = None,
+        item_path: Sequence[PathKey] = (WILDCARD,),
+        schema_name: str = "response",
+        **kwargs: Any,
+    ) -> Optional[AsyncStructuredChatStream]:
+        """Asynchronous counterpart of text_chat_structured."""
+        stream = await self.atext_chat_stream(
+            messages, response_format=self._response_format(schema, schema_name), **kwargs
+        )
+        return AsyncStructuredChatStream(stream, schema, item_path) if stream is not None else None
+
+    def _response_format(self, schema: Optional[Mapping[str, Any]], schema_name: str) -> dict[str, Any]:
+        if schema is None:
+            return {"type": "json_object"}
+        return {"type": "json_schema", "json_schema": {"name": schema_name, "schema": dict(schema), "strict": True}}
+
+    def _stream_config(self, **kwargs: Any) -> dict[str, Any]:
+        config = self.config_manager.combine_config("chat", **kwargs)
+        config["stream"] = True
+        # Ask for a final usage chunk so token counts are exact.
+        config["stream_options"] = {"include_usage": True, **config.get("stream_options", {})}
+        return config
+
+    def text_chat_many(
+        self,
+        messages_list: Iterable[list],
+        item_kwargs: Optional[Iterable[dict[str, Any]]] = None,
+        response_type: Optional[str] = None,
+        max_concurrency: int = 8,
+        **kwargs: Any,
+    ) -> list[BatchResult]:
+        """
+        Run text_chat over many message lists concurrently.
+
+        Args:
+            messages_list (Iterable[list]): The message lists to send.
+            item_kwargs (Optional[Iterable[dict[str, Any]]]): Per-item configuration, aligned with messages_list.
+                Per-item values take precedence over kwargs.
+            response_type (Optional[str]): "full" to return the full choice for every item.
+            max_concurrency (int): The maximum number of requests in flight.
+            **kwargs (Any): Configuration shared by every item.
+
+        Returns:
+            list[BatchResult]: One result per message list, in input order. Failed items carry the exception
+                in `error` instead of being logged and replaced by None.
+        """
+        chat = self._chat_item_runner(response_type, kwargs)
+        return run_bounded(chat, self._pair_items(messages_list, item_kwargs), max_concurrency)
+
+    def text_chat_many_as_completed(
+        self,
+        messages_list: Iterable[list],
+        item_kwargs: Optional[Iterable[dict[str, Any]]] = None,
+        response_type: Optional[str] = None,
+        max_concurrency: int = 8,
+        **kwargs: Any,
+    ) -> Iterator[BatchResult]:
+        """
+        Like text_chat_many, but yield each result as soon as it completes.
+
+        The `index` of every result identifies the message list it belongs to.
+        """
+        chat = self._chat_item_runner(response_type, kwargs)
+        return run_bounded_as_completed(chat, self._pair_items(messages_list, item_kwargs), max_concurrency)
+
+    async def atext_chat_many(
+        self,
+        messages_list: Iterable[list],
+        item_kwargs: Optional[Iterable[dict[str, Any]]] = None,
+        response_type: Optional[str] = None,
+        max_concurrency: int = 8,
+        **kwargs: Any,
+    ) -> list[BatchResult]:
+        """Asynchronous counterpart of text_chat_many."""
+        chat = self._achat_item_runner(response_type, kwargs)
+        return await arun_bounded(chat, self._pair_items(messages_list, item_kwargs), max_concurrency)
+
+    def atext_chat_many_as_completed(
+        self,
+        messages_list: Iterable[list],
+        item_kwargs: Optional[Iterable[dict[str, Any]]] = None,
+        response_type: Optional[str] = None,
+        max_concurrency: int = 8,
+        **kwargs: Any,
+    ) -> AsyncIterator[BatchResult]:
+        """Asynchronous counterpart of text_chat_many_as_completed."""
+        chat = self._achat_item_runner(response_type, kwargs)
+        return arun_bounded_as_completed(chat, self._pair_items(messages_list, item_kwargs), max_concurrency)
+
+    def text_chat_batch(
+        self,
+        messages_list: Iterable[list],
+        item_kwargs: Optional[Iterable[dict[str, Any]]] = None,
+        response_type: Optional[str] = None,
+        poll_interval: float = 30.0,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> list[BatchResult]:
+        """
+        Run many chats through the asynchronous Batch API, which is cheaper and has higher limits than live calls.
+
+        Every request is compiled with the merged chat configuration, so defaults behave as in text_chat.
+        This call blocks until the batch finishes.
+
+        Args:
+            messages_list (Iterable[list]): The message lists to send.
+            item_kwargs (Optional[Iterable[dict[str, Any]]]): Per-item configuration, aligned with messages_list.
+            response_type (Optional[str]): "full" to return the full choice for every item.
+            poll_interval (float): Seconds between batch status checks.
+            timeout (Optional[float]): Seconds to wait for the batch. None waits indefinitely.
+            **kwargs (Any): Configuration shared by every item.
+
+        Returns:
+            list[BatchResult]: One result per message list, in input order.
+
+        Raises:
+            TimeoutError: If the batch does not finish within timeout.
+        """
+        bodies = [
+            {
+                "messages": unpin_messages(messages),
+                **self.config_manager.combine_config("chat", **{**kwargs, **overrides}),
+            }
+            for messages, overrides in self._pair_items(messages_list, item_kwargs)
+        ]
+
+        def parse(body: dict[str, Any]) -> Any:
+            return self._format_chat_response(ChatCompletion.model_validate(body), response_type)
+
+        # The batch, its files and its results are only visible to the account that created them.
+        with self.pinned_client() as client:
+            return OpenAIBatchRunner(client, poll_interval, timeout).run(CHAT_COMPLETIONS_ENDPOINT, bodies, parse)
+
+    def generate_embedding_batch(
+        self, texts: Sequence[str], poll_interval: float = 30.0, timeout: Optional[float] = None, **kwargs: Any
+    ) -> list[BatchResult]:
+        """
+        Embed many texts through the asynchronous Batch API.
+
+        Args:
+            texts (Sequence[str]): The texts to embed, one request per text.
+            poll_interval (float): Seconds between batch status checks.
+            timeout (Optional[float]): Seconds to wait for the batch. None waits indefinitely.
+            **kwargs (Any): Additional configuration for the embedding requests.
+
+        Returns:
+            list[BatchResult]: One embedding per text, in input order.
+
+        Raises:
+            TimeoutError: If the batch does not finish within timeout.
+        """
+        config = self.config_manager.combine_config("embedding", **kwargs)
+        bodies = [{"input": text, **config} for text in texts]
+
+        def parse(body: dict[str, Any]) -> Any:
+            return body["data"][0]["embedding"]
+
+        # The batch, its files and its results are only visible to the account that created them.
+        with self.pinned_client() as client:
+            return OpenAIBatchRunner(client, poll_interval, timeout).run(EMBEDDINGS_ENDPOINT, bodies, parse)
+
+    def set_cache(self, cache: Optional[ResponseCache], *, force: bool = False) -> None:
+        """
+        Cache text_chat responses by exact match on the messages and the merged chat configuration.
+
+        Args:
+            cache (Optional[ResponseCache]): The cache to use, or None to disable caching.
+            force (bool): Cache responses even when the sampling temperature is above zero.
+        """
+        self.response_cache = cache
+        self.force_cache = force
+
+    def set_trim_policy(self, policy: Optional[TrimPolicy]) -> None:
+        """
+        Trim chat messages to fit the model's context window before they are sent.
+
+        Args:
+            policy (Optional[TrimPolicy]): The policy to use, or None to send messages unchanged.
+        """
+        self.trim_policy = policy
+
+    def token_counter(self, model: str) -> TokenCounter:
+        """Return the token counter of a model, which caches the counts of the messages it has seen."""
+        counter = self._token_counters.get(model)
+        if counter is None:
+            counter = self._token_counters.setdefault(model, TokenCounter(model))
+        return counter
+
+    def count_tokens(self, messages: list, **kwargs: Any) -> int:
+        """Count the prompt tokens of messages for the chat model the configuration selects."""
+        config = self.config_manager.combine_config("chat", **kwargs)
+        return self.token_counter(config["model"]).count_messages(messages)
+
+    def set_single_flight(self, single_flight: Optional[SingleFlight]) -> None:
+        """
+        Share one request between concurrent identical text_chat and generate_embedding calls.
+
+        Calls are identical when their messages and merged configuration are. Every caller receives the
+        same response, so concurrent sampled completions are no longer independent.
+
+        Args:
+            single_flight (Optional[SingleFlight]): Coalesces the calls and counts how many were shared,
+                or None to send every call.
+        """
+        self.single_flight = single_flight
+
+    def _coalesce(self, service: str, messages: Any, config: dict[str, Any], send: Callable[[], T]) -> T:
+        if self.single_flight is None:
+            return send()
+        return self.single_flight.do(request_key(service, messages, config), send)
+
+    async def _acoalesce(
+        self, service: str, messages: Any, config: dict[str, Any], send: Callable[[], Awaitable[T]]
+    ) -> T:
+        if self.single_flight is None:
+            return await send()
+        return await self.single_flight.ado(request_key(service, messages, config), send)
+
+    def set_model_router(self, router: Optional[ModelRouter]) -> None:
+        """
+        Pick the model of every text_chat call that does not name one with a router.
+
+        The router learns the latency and error rate of each model from the calls made with it. A call that
+        fails with a timeout, a rate limit or a server error falls back to the next model the router suggests.
+        With a `latency_slo` in seconds, a call prefers the first model expected to answer within it, and is
+        cut off after that long unless it runs on the last fallback.
+
+        Args:
+            router (Optional[ModelRouter]): The router to use, or None to use the configured model.
+        """
+        self.model_router = router
+
+    def _routes(self, kwargs: dict[str, Any]) -> bool:
+        return self.model_router is not None and "model" not in kwargs
+
+    def _routed_text_chat(
+        self, messages: list, response_type: Optional[str], latency_slo: Optional[float], kwargs: dict[str, Any]
+    ) -> Any:
+        models = self.model_router.route(latency_slo) if self.model_router is not None else []
+        for index, model in enumerate(models):
+            last = index == len(models) - 1
+            try:
+                config = self.config_manager.combine_config("chat", **{**kwargs, "model": model})
+                return self._text_chat(messages, response_type, config, None if last else latency_slo)
+            except Exception as e:
+                if last or not is_retryable(e):
+                    self.log_error("OpenAI Chat API error", e)
+                    return None
+                logger.warning(f"{model} failed ({e!s}), falling back to {models[index + 1]}")
+        return None
+
+    async def _arouted_text_chat(
+        self, messages: list, response_type: Optional[str], latency_slo: Optional[float], kwargs: dict[str, Any]
+    ) -> Any:
+        models = self.model_router.route(latency_slo) if self.model_router is not None else []
+        for index, model in enumerate(models):
+            last = index == len(models) - 1
+            try:
+                config = self.config_manager.combine_config("chat", **{**kwargs, "model": model})
+                return await self._atext_chat(messages, response_type, config, None if last else latency_slo)
+            except Exception as e:
+                if last or not is_retryable(e):
+                    self.log_error("OpenAI Chat API error", e)
+                    return None
+                logger.warning(f"{model} failed ({e!s}), falling back to {models[index + 1]}")
+        return None
+
+    @contextmanager
+    def _observe_model(self, model: str) -> Iterator[None]:
+        # Only provider calls are observed, so cache hits and shared responses do not skew the estimates.
+        if self.model_router is None:
+            yield
+            return
+        started_at = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.model_router.record(model, time.perf_counter() - started_at, e)
+            raise
+        self.model_router.record(model, time.perf_counter() - started_at)
+
+    def _fit_messages(self, messages: list, config: dict[str, Any]) -> list:
+        if self.trim_policy is None:
+            return unpin_messages(messages)
+        max_output_tokens = config.get("max_completion_tokens") or config.get("max_tokens")
+        return self.trim_policy.apply(messages, self.token_counter(config["model"]), max_output_tokens)
+
+    def _text_chat(
+        self, messages: list, response_type: Optional[str], config: dict[str, Any], deadline: Optional[float] = None
+    ) -> Any:
+        messages = self._fit_messages(messages, config)
+        cache_key = self._chat_cache_key(messages, config)
+        if cache_key is not None:
+            cached = self._get_cached_completion(cache_key)
+            if cached is not None:
+                return self._format_chat_response(cached, response_type)
+
+        estimated_tokens = self._estimate_chat_tokens(messages, config)
+
+        def request(client: Any, timeout: Optional[float]) -> Any:
+            limiter = self.acquire_rate_limit(config["model"], estimated_tokens)
+            with self.track_call("chat", config["model"], messages) as call, self._observe_model(config["model"]):
+                response = client.chat.completions.create(messages=messages, **self._with_timeout(config, timeout))
+                call.response = response
+            self.reconcile_rate_limit(limiter, estimated_tokens, response)
+            return response
+
+        def send() -> Any:
+            response = self.call_with_policy(request, deadline)
+            if cache_key is not None:
+                self._cache_completion(cache_key, response)
+            return response
+
+        response = self._coalesce("chat", messages, config, send)
+        return self._format_chat_response(response, response_type)
+
+    async def _atext_chat(
+        self, messages: list, response_type: Optional[str], config: dict[str, Any], deadline: Optional[float] = None
+    ) -> Any:
+        messages = self._fit_messages(messages, config)
+        cache_key = self._chat_cache_key(messages, config)
+        if cache_key is not None:
+            cached = self._get_cached_completion(cache_key)
+            if cached is not None:
+                return self._format_chat_response(cached, response_type)
+
+        estimated_tokens = self._estimate_chat_tokens(messages, config)
+
+        async def request(client: Any, timeout: Optional[float]) -> Any:
+            limiter = await self.aacquire_rate_limit(config["model"], estimated_tokens)
+            with self.track_call("chat", config["model"], messages) as call, self._observe_model(config["model"]):
+                response = await client.chat.completions.create(
+                    messages=messages, **self._with_timeout(config, timeout)
+                )
+                call.response = response
+            self.reconcile_rate_limit(limiter, estimated_tokens, response)
+            return response
+
+        async def send() -> Any:
+            response = await self.acall_with_policy(request, deadline)
+            if cache_key is not None:
+                self._cache_completion(cache_key, response)
+            return response
+
+        response = await self._acoalesce("chat", messages, config, send)
+        return self._format_chat_response(response, response_type)
+
+    def _with_timeout(self, config: dict[str, Any], timeout: Optional[float]) -> dict[str, Any]:
+        return config if timeout is None else {**config, "timeout": timeout}
+
+    def _chat_cache_key(self, messages: list, config: dict[str, Any]) -> Optional[str]:
+        if self.response_cache is None:
+            return None
+        # Sampled completions differ between calls; the provider samples at temperature 1 when none is given.
+        temperature = config.get("temperature")
+        if not self.force_cache and (temperature is None or temperature > 0):
+            return None
+        return request_key(messages, config)
+
+    def _get_cached_completion(self, cache_key: str) -> Optional[ChatCompletion]:
+        if self.response_cache is None:
+            return None
+        cached = self.response_cache.get(cache_key)
+        if cached is None:
+            return None
+        return ChatCompletion.model_validate(cached)
+
+    def _cache_completion(self, cache_key: str, response: Any) -> None:
+        if self.response_cache is not None:
+            self.response_cache.set(cache_key, response.model_dump(mode="json"))
+
+    def _chat_item_runner(
+        self, response_type: Optional[str], shared_kwargs: dict[str, Any]
+    ) -> Callable[[tuple[list, dict[str, Any]]], Any]:
+        def chat(item: tuple[list, dict[str, Any]]) -> Any:
+            messages, overrides = item
+            config = self.config_manager.combine_config("chat", **{**shared_kwargs, **overrides})
+            return self._text_chat(messages, response_type, config)
+
+        return chat
+
+    def _achat_item_runner(
+        self, response_type: Optional[str], shared_kwargs: dict[str, Any]
+    ) -> Callable[[tuple[list, dict[str, Any]]], Awaitable[Any]]:
+        async def chat(item: tuple[list, dict[str, Any]]) -> Any:
+            messages, overrides = item
+            config = self.config_manager.combine_config("chat", **{**shared_kwargs, **overrides})
+            return await self._atext_chat(messages, response_type, config)
+
+        return chat
+
+    def _pair_items(
+        self, messages_list: Iterable[list], item_kwargs: Optional[Iterable[dict[str, Any]]]
+    ) -> Iterator[tuple[list, dict[str, Any]]]:
+        if item_kwargs is None:
+            return zip(messages_list, repeat({}))
+
+        # Both are materialized so a length mismatch is reported before any request is sent.
+        messages_list, item_kwargs = list(messages_list), list(item_kwargs)
+        if len(messages_list) != len(item_kwargs):
+            error_message = "messages_list and item_kwargs must have the same length."
+            raise ValueError(error_message)
+        return zip(messages_list, item_kwargs)
+
+    def _estimate_chat_tokens(self, messages: list, config: dict[str, Any]) -> int:
+        # Limits count the prompt plus the completion budget the request reserves.
+        prompt_tokens = self.token_counter(config["model"]).count_messages(messages)
+        return prompt_tokens + int(config.get("max_completion_tokens") or config.get("max_tokens") or 0)
+
+    def _format_chat_response(self, response: Any, response_type: Optional[str]) -> Any:
+        if response_type == "full":
+            return response.choices[0]
+        else:
+            return response.choices[0].message.content
+
     def generate_embedding(self, messages: list, **kwargs: dict[str, Any]) -> Any:
         config = self.config_manager.combine_config("embedding", **kwargs)
-        model = config.get("model")
+        estimated_tokens = self._estimate_embedding_tokens(messages)
+
+        def send() -> Any:
+            limiter = self.acquire_rate_limit(config["model"], estimated_tokens)
+            with self.track_call("embedding", config["model"], messages) as call:
+                response = self.client.embeddings.create(input=messages, **config)
+                call.response = response
+            self.reconcile_rate_limit(limiter, estimated_tokens, response)
+            return response
+
+        try:
+            return self._coalesce("embedding", messages, config, send).data[0].embedding
+        except Exception as e:
+            self.log_error("OpenAI Embedding API error", e)
+            return None
+
+    async def agenerate_embedding(self, messages: list, **kwargs: Any) -> Any:
+        config = self.config_manager.combine_config("embedding", **kwargs)
+        estimated_tokens = self._estimate_embedding_tokens(messages)
+
+        async def send() -> Any:
+            limiter = await self.aacquire_rate_limit(config["model"], estimated_tokens)
+            with self.track_call("embedding", config["model"], messages) as call:
+                response = await self.async_client.embeddings.create(input=messages, **config)
+                call.response = response
+            self.reconcile_rate_limit(limiter, estimated_tokens, response)
+            return response
+
         try:
-            response = self.client.embeddings.create(model=model, input=messages, **config)
-            return response.data[0]["embedding"]
+            return (await self._acoalesce("embedding", messages, config, send)).data[0].embedding
         except Exception as e:
             self.log_error("OpenAI Embedding API error", e)
             return None
+
+    def generate_embeddings(
+        self,
+        texts: Sequence[str],
+        batch_size: int = MAX_EMBEDDING_BATCH_SIZE,
+        max_batch_tokens: int = MAX_EMBEDDING_BATCH_TOKENS,
+        max_concurrency: int = 4,
+        **kwargs: Any,
+    ) -> Optional[np.ndarray]:
+        """
+        Embed any number of texts.
+
+        The texts are split into sub-batches that respect the endpoint's input and token limits,
+        and the sub-batches are sent concurrently.
+
+        Args:
+            texts (Sequence[str]): The texts to embed.
+            batch_size (int): The maximum number of texts per request.
+            max_batch_tokens (int): The maximum estimated number of tokens per request.
+            max_concurrency (int): The maximum number of requests in flight.
+            **kwargs (Any): Additional configuration for the embedding requests.
+
+        Returns:
+            Optional[np.ndarray]: A contiguous float32 matrix with one row per text, in input order,
+                or None if any request failed.
+        """
+        config = self._bulk_embedding_config(**kwargs)
+        stored_rows, missing = self._lookup_stored_embeddings(texts, config)
+        pending = [texts[position] for position in missing]
+        batches = self._embedding_batches(pending, batch_size, max_batch_tokens)
+
+        def embed(batch: tuple[int, int]) -> np.ndarray:
+            start, end = batch
+            estimated_tokens = self._estimate_embedding_tokens(pending[start:end])
+            limiter = self.acquire_rate_limit(config["model"], estimated_tokens)
+            with self.track_call("embedding", config["model"], pending[start:end]) as call:
+                response = self.client.embeddings.create(input=pending[start:end], **config)
+                call.response = response
+            self.reconcile_rate_limit(limiter, estimated_tokens, response)
+            return self._embedding_matrix(response)
+
+        results = run_bounded(embed, batches, max_concurrency)
+        computed = self._assemble_embeddings(results, batches, len(pending))
+        return self._merge_stored_embeddings(config, stored_rows, missing, pending, computed)
+
+    async def agenerate_embeddings(
+        self,
+        texts: Sequence[str],
+        batch_size: int = MAX_EMBEDDING_BATCH_SIZE,
+        max_batch_tokens: int = MAX_EMBEDDING_BATCH_TOKENS,
+        max_concurrency: int = 4,
+        **kwargs: Any,
+    ) -> Optional[np.ndarray]:
+        """Asynchronous counterpart of generate_embeddings."""
+        config = self._bulk_embedding_config(**kwargs)
+        stored_rows, missing = self._lookup_stored_embeddings(texts, config)
+        pending = [texts[position] for position in missing]
+        batches = self._embedding_batches(pending, batch_size, max_batch_tokens)
+
+        async def embed(batch: tuple[int, int]) -> np.ndarray:
+            start, end = batch
+            estimated_tokens = self._estimate_embedding_tokens(pending[start:end])
+            limiter = await self.aacquire_rate_limit(config["model"], estimated_tokens)
+            with self.track_call("embedding", config["model"], pending[start:end]) as call:
+                response = await self.async_client.embeddings.create(input=pending[start:end], **config)
+                call.response = response
+            self.reconcile_rate_limit(limiter, estimated_tokens, response)
+            return self._embedding_matrix(response)
+
+        results = await arun_bounded(embed, batches, max_concurrency)
+        computed = self._assemble_embeddings(results, batches, len(pending))
+        return self._merge_stored_embeddings(config, stored_rows, missing, pending, computed)
+
+    def set_embedding_store(self, store: Optional[EmbeddingStore]) -> None:
+        """
+        Reuse previously computed embeddings in generate_embeddings.
+
+        Vectors are keyed by a hash of the text plus the embedding model (and dimensions, when configured),
+        so only texts that have not been embedded with the same settings are sent to the API.
+
+        Args:
+            store (Optional[EmbeddingStore]): The store to read from and append to, or None to disable it.
+        """
+        self.embedding_store = store
+
+    def _embedding_namespace(self, config: dict[str, Any]) -> str:
+        dimensions = config.get("dimensions")
+        return f"{config['model']}:{dimensions}" if dimensions else str(config["model"])
+
+    def _lookup_stored_embeddings(
+        self, texts: Sequence[str], config: dict[str, Any]
+    ) -> tuple[Optional[np.ndarray], list[int]]:
+        if self.embedding_store is None:
+            return None, list(range(len(texts)))
+        return self.embedding_store.lookup(texts, self._embedding_namespace(config))
+
+    def _merge_stored_embeddings(
+        self,
+        config: dict[str, Any],
+        stored_rows: Optional[np.ndarray],
+        missing: list[int],
+        pending: list[str],
+        computed: Optional[np.ndarray],
+    ) -> Optional[np.ndarray]:
+        if computed is None or self.embedding_store is None or stored_rows is None:
+            return computed
+
+        if pending:
+            self.embedding_store.add(pending, self._embedding_namespace(config), computed)
+        if len(missing) == len(stored_rows):
+            return computed
+
+        embeddings = np.empty((len(stored_rows), self.embedding_store.dimensions or 0), dtype=np.float32)
+        hits = stored_rows >= 0
+        embeddings[hits] = self.embedding_store.vectors[stored_rows[hits]]
+        if pending:
+            embeddings[missing] = computed
+        return embeddings
+
+    def _bulk_embedding_config(self, **kwargs: Any) -> dict[str, Any]:
+        config = self.config_manager.combine_config("embedding", **kwargs)
+        # Base64 payloads are smaller than JSON floats and decode straight into an array.
+        config.setdefault("encoding_format", "base64")
+        return config
+
+    def _embedding_batches(self, texts: Sequence[str], batch_size: int, max_batch_tokens: int) -> list[tuple[int, int]]:
+        batches: list[tuple[int, int]] = []
+        start = 0
+        batch_tokens = 0
+        for index, text in enumerate(texts):
+            tokens = self._estimate_tokens(text)
+            if index > start and (index - start >= batch_size or batch_tokens + tokens > max_batch_tokens):
+                batches.append((start, index))
+                start = index
+                batch_tokens = 0
+            batch_tokens += tokens
+        if start < len(texts):
+            batches.append((start, len(texts)))
+        return batches
+
+    def _estimate_embedding_tokens(self, texts: Any) -> int:
+        if isinstance(texts, str):
+            return self._estimate_tokens(texts)
+        return sum(self._estimate_tokens(str(text)) for text in texts)
+
+    def _estimate_tokens(self, text: str) -> int:
+        # Roughly four characters per token for English text.
+        return len(text) // 4 + 1
+
+    def _embedding_matrix(self, response: Any) -> np.ndarray:
+        rows = sorted(response.data, key=lambda item: item.index)
+        return np.stack([self._embedding_vector(row.embedding) for row in rows])
+
+    def _embedding_vector(self, embedding: Any) -> np.ndarray:
+        if isinstance(embedding, str):
+            return np.frombuffer(base64.b64decode(embedding), dtype=np.float32)
+        return np.asarray(embedding, dtype=np.float32)
+
+    def _assemble_embeddings(
+        self, results: list[BatchResult], batches: list[tuple[int, int]], count: int
+    ) -> Optional[np.ndarray]:
+        for result in results:
+            if result.error is not None:
+                self.log_error("OpenAI Embedding API error", result.error)
+                return None
+        if not results:
+            return np.empty((0, 0), dtype=np.float32)
+
+        dimensions = results[0].value.shape[1]
+        embeddings = np.empty((count, dimensions), dtype=np.float32)
+        for result, (start, end) in zip(results, batches):
+            embeddings[start:end] = result.value
+        return embeddings
@@ -0,0 +1,92 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from ai_backend import AsyncImageAI, AsyncTextAI
+from openai_backend.openai_text_backend import OpenAITextBackend
+
+
+@pytest.fixture
+def mock_async_openai_client():
+    mock_chat_response = Mock()
+    mock_chat_response.choices = [
+        Mock(
+            index=0,
+            message=Mock(role="assistant", content="Hello from the event loop."),
+            finish_reason="stop",
+        )
+    ]
+
+    mock_embeddings_response = Mock()
+    mock_embeddings_response.data = [Mock(embedding=[0.1, 0.2, 0.3])]
+
+    mock_image_response = Mock()
+    mock_image_response.data = [Mock(url="https://example.com/image.png")]
+
+    mock_client = Mock()
+    mock_client.chat.completions.create = AsyncMock(return_value=mock_chat_response)
+    mock_client.embeddings.create = AsyncMock(return_value=mock_embeddings_response)
+    mock_client.images.generate = AsyncMock(return_value=mock_image_response)
+    return mock_client
+
+
+@pytest.fixture
+def patched_async_client(mock_async_openai_client):
+    with patch("base.ai_base.OpenAIBackend.create_async_client", return_value=mock_async_openai_client) as factory:
+        yield factory
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("patched_async_client")
+async def test_async_text_chat(mock_async_openai_client):
+    text_ai = AsyncTextAI()
+    messages = [{"role": "user", "content": "Hello"}]
+
+    response = await text_ai.text_chat(messages, max_tokens=5)
+
+    assert response == "Hello from the event loop."
+    mock_async_openai_client.chat.completions.create.assert_awaited_once_with(
+        messages=messages, model="gpt-4o", temperature=0.2, max_tokens=5
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("patched_async_client")
+async def test_async_client_is_shared(mock_async_openai_client):
+    text_ai = AsyncTextAI()
+    messages = [{"role": "user", "content": "Hello"}]
+
+    responses = await asyncio.gather(*(text_ai.text_chat(messages) for _ in range(10)))
+
+    assert responses == ["Hello from the event loop."] * 10
+    assert mock_async_openai_client.chat.completions.create.await_count == 10
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("patched_async_client")
+async def test_async_generate_embedding(mock_async_openai_client):
+    text_ai = AsyncTextAI()
+
+    embedding = await text_ai.generate_embedding(["Hello"])
+
+    assert embedding == [0.1, 0.2, 0.3]
+    mock_async_openai_client.embeddings.create.assert_awaited_once_with(input=["Hello"], model="text-embedding-ada-002")
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("patched_async_client")
+async def test_async_generate_image():
+    image_ai = AsyncImageAI()
+
+    url = await image_ai.generate_image("a lighthouse")
+
+    assert url == "https://example.com/image.png"
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("patched_async_client")
+async def test_async_text_chat_exception(mock_async_openai_client):
+    mock_async_openai_client.chat.completions.create.side_effect = Exception("API Error")
+    backend = OpenAITextBackend()
+
+    assert await backend.atext_chat(["Hello"]) is None
@@ -1,6 +1,12 @@
+import os
+import subprocess
+import sys
 import unittest
+from importlib.metadata import EntryPoint
+from unittest.mock import patch
 
-from ai_backend.backend_manager import BackendManager
+import ai_backend.backend_manager as backend_manager_module
+from ai_backend.backend_manager import BackendManager, register_backend
 from openai_backend.openai_audio_backend import OpenAIAudioBackend
 from openai_backend.openai_image_backend import OpenAIImageBackend
 
@@ -38,3 +44,84 @@ class TestBackendManager(unittest.TestCase):
         backend_name = "invalid"
         with self.assertRaises(ValueError):
             self.backend_manager.set_backend(backend_type, backend_name)
+
+
+class FakeTextBackend:
+    def __init__(self, api_key=None, **kwargs):
+        self.api_key = api_key
+        self.kwargs = kwargs
+
+
+class TestBackendRegistry(unittest.TestCase):
+    def setUp(self):
+        self.backend_manager = BackendManager()
+
+    def tearDown(self):
+        for name in ("fake", "plugin"):
+            backend_manager_module._backends["text"].pop(name, None)
+        backend_manager_module._backends.pop("video", None)
+        backend_manager_module._default_backend.pop("video", None)
+
+    def test_register_backend_class(self):
+        register_backend("text", "fake", FakeTextBackend)
+
+        backend, name = BackendManager().set_backend("text", "fake", api_key="key", model="m")
+
+        self.assertIsInstance(backend, FakeTextBackend)
+        self.assertEqual(name, "fake")
+        self.assertEqual(backend.kwargs, {"model": "m"})
+        self.assertEqual(self.backend_manager.default_backend["text"], "openai")
+
+    def test_register_backend_reference_resolves_on_first_use(self):
+        register_backend("text", "fake", f"{__name__}:FakeTextBackend")
+        self.assertIsInstance(self.backend_manager.backends["text"]["fake"], str)
+
+        backend_class, _ = self.backend_manager.get_backend_class("text", "fake")
+
+        self.assertIs(backend_class, FakeTextBackend)
+        self.assertIs(self.backend_manager.backends["text"]["fake"], FakeTextBackend)
+
+    def test_new_backend_type_becomes_default(self):
+        register_backend("video", "fake", FakeTextBackend)
+
+        _, name = self.backend_manager.set_backend("video")
+
+        self.assertEqual(name, "fake")
+
+    def test_entry_points_are_loaded_on_miss(self):
+        entry_point = EntryPoint(
+            name="text.plugin",
+            value=f"{__name__}:FakeTextBackend",
+            group=backend_manager_module.BACKEND_ENTRY_POINT_GROUP,
+        )
+        with (
+            patch.object(backend_manager_module, "_entry_points_loaded", new=False),
+            patch("importlib.metadata.entry_points", return_value=[entry_point]),
+        ):
+            backend, name = self.backend_manager.set_backend("text", "plugin")
+            self.assertIn("plugin", self.backend_manager.available_backends("text"))
+
+        self.assertIsInstance(backend, FakeTextBackend)
+        self.assertEqual(name, "plugin")
+
+
+class TestLazyImports(unittest.TestCase):
+    def loaded_modules(self, code):
+        src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+        env = {**os.environ, "PYTHONPATH": src, "OPENAI_API_KEY": "sk-test"}
+        modules = "('openai', 'numpy', 'pydub', 'openai_backend.openai_audio_backend')"
+        probe = f"; print(sorted(m for m in {modules} if m in sys.modules))"
+        output = subprocess.run(  # noqa: S603
+            [sys.executable, "-c", "import sys; " + code + probe], env=env, capture_output=True, text=True, check=True
+        ).stdout
+        return output.strip().splitlines()[-1]
+
+    def test_import_loads_no_backends(self):
+        self.assertEqual(self.loaded_modules("import ai_backend"), "[]")
+
+    def test_text_only_start_skips_audio_dependencies(self):
+        loaded = self.loaded_modules("from ai_backend import TextAI; TextAI()")
+
+        self.assertIn("openai", loaded)
+        self.assertNotIn("pydub", loaded)
+        self.assertNotIn("openai_audio_backend", loaded)
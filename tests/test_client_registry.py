@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+from base.client_registry import DEFAULT_OPENAI_BASE_URL, ClientRegistry, PoolSettings, resolve_base_url
+from openai_backend.openai_image_backend import OpenAIImageBackend
+from openai_backend.openai_text_backend import OpenAITextBackend
+
+from base.fake_openai_server import FakeOpenAIServer
+
+
+@pytest.fixture
+def registry():
+    registry = ClientRegistry()
+    yield registry
+    registry.close()
+
+
+def test_clients_are_shared_per_key_and_base_url(registry):
+    client = registry.openai_client("sk-a", "http://localhost:1/v1")
+
+    assert registry.openai_client("sk-a", "http://localhost:1/v1/") is client
+    assert registry.openai_client("sk-b", "http://localhost:1/v1") is not client
+    assert registry.openai_client("sk-a", "http://localhost:2/v1") is not client
+
+
+def test_resolve_base_url_uses_environment(monkeypatch):
+    monkeypatch.delenv("OPENAI_BASE_URL", raising=False)
+    assert resolve_base_url(None) == DEFAULT_OPENAI_BASE_URL
+
+    monkeypatch.setenv("OPENAI_BASE_URL", "http://localhost:8080/v1/")
+    assert resolve_base_url(None) == "http://localhost:8080/v1"
+    assert resolve_base_url("http://other/v1") == "http://other/v1"
+
+
+def test_http2_follows_settings():
+    assert PoolSettings(http2=True).use_http2()
+    assert not PoolSettings(http2=False).use_http2()
+
+
+def test_backends_share_one_client():
+    text_backend = OpenAITextBackend(api_key="sk-shared-client", base_url="http://localhost:1/v1")
+    image_backend = OpenAIImageBackend(api_key="sk-shared-client", base_url="http://localhost:1/v1")
+
+    assert text_backend.client is image_backend.client
+    assert OpenAITextBackend(api_key="sk-other-client", base_url="http://localhost:1/v1").client is not (
+        text_backend.client
+    )
+
+
+def test_warm_up_opens_connections(registry):
+    with FakeOpenAIServer() as server:
+        opened = registry.warm_up("sk-warm", server.base_url, connections=3)
+
+        assert opened == 3
+        assert server.state.requests == [("GET", "/v1/models", "Bearer sk-warm")] * 3
+
+
+def test_warm_up_reports_failures(registry):
+    assert registry.warm_up("sk-warm", "http://127.0.0.1:9/v1", connections=2) == 0
+
+
+@pytest.mark.asyncio
+async def test_async_clients_are_shared_within_a_loop(registry):
+    client = registry.openai_async_client("sk-a", "http://localhost:1/v1")
+
+    assert registry.openai_async_client("sk-a", "http://localhost:1/v1") is client
+
+    async def client_in_loop():
+        return registry.openai_async_client("sk-a", "http://localhost:1/v1")
+
+    other_loop_client = await asyncio.to_thread(asyncio.run, client_in_loop())
+    assert other_loop_client is not client
+
+
+def test_clients_of_closed_loops_are_dropped(registry):
+    async def connect(base_url):
+        # An open connection ties the client, and through it the registry, to the loop.
+        assert await registry.awarm_up("sk-a", base_url) == 1
+        return len(registry._async_clients)
+
+    with FakeOpenAIServer() as server:
+        assert asyncio.run(connect(server.base_url)) == 1
+        # The first loop has closed, so only the second loop's clients are kept.
+        assert asyncio.run(connect(server.base_url)) == 1
+
+
+def test_aclose_closes_the_async_clients_of_the_loop(registry):
+    detached = registry.openai_async_client("sk-a", "http://localhost:1/v1")
+
+    async def close_clients():
+        client = registry.openai_async_client("sk-a", "http://localhost:1/v1")
+        await registry.aclose()
+        return client, registry.openai_async_client("sk-a", "http://localhost:1/v1")
+
+    closed, replacement = asyncio.run(close_clients())
+
+    assert closed.is_closed()
+    assert detached.is_closed()
+    assert replacement is not closed
+
+
+@pytest.mark.asyncio
+async def test_close_schedules_closing_async_clients_on_their_loop(registry):
+    client = registry.openai_async_client("sk-a", "http://localhost:1/v1")
+
+    registry.close()
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+    assert client.is_closed()
+    assert registry.openai_async_client("sk-a", "http://localhost:1/v1") is not client
+
+
+def test_backend_async_client_follows_the_event_loop():
+    with FakeOpenAIServer() as server:
+        backend = OpenAITextBackend(api_key="sk-loops", base_url=server.base_url)
+
+        async def chat():
+            assert backend.async_client is backend.async_client
+            return backend.async_client, await backend.atext_chat([{"role": "user", "content": "Hi"}])
+
+        first_client, first_reply = asyncio.run(chat())
+        # The first loop is closed now; a client bound to it would fail here.
+        second_client, second_reply = asyncio.run(chat())
+
+        assert second_client is not first_client
+        assert first_reply
+        assert second_reply
+
+
+@pytest.mark.asyncio
+async def test_awarm_up_opens_connections(registry):
+    with FakeOpenAIServer() as server:
+        assert await registry.awarm_up("sk-warm", server.base_url, connections=2) == 2
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from base.concurrency import arun_bounded, iterate_in_thread, run_bounded, run_bounded_as_completed
+
+
+def test_run_bounded_preserves_order_and_limits_concurrency():
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def work(item):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.01 * (5 - item % 5))
+        with lock:
+            active -= 1
+        return item * 2
+
+    results = run_bounded(work, range(20), max_concurrency=4)
+
+    assert [result.value for result in results] == [item * 2 for item in range(20)]
+    assert [result.index for result in results] == list(range(20))
+    assert peak <= 4
+
+
+def test_run_bounded_captures_errors():
+    def work(item):
+        if item == 1:
+            error_message = "boom"
+            raise RuntimeError(error_message)
+        return item
+
+    results = run_bounded(work, [0, 1, 2], max_concurrency=2)
+
+    assert [result.ok for result in results] == [True, False, True]
+    assert isinstance(results[1].error, RuntimeError)
+    assert results[1].value is None
+
+
+def test_run_bounded_as_completed_yields_fastest_first():
+    def work(delay):
+        time.sleep(delay)
+        return delay
+
+    results = list(run_bounded_as_completed(work, [0.2, 0.0], max_concurrency=2))
+
+    assert [result.index for result in results] == [1, 0]
+
+
+def test_run_bounded_rejects_invalid_concurrency():
+    with pytest.raises(ValueError):
+        run_bounded(str, [1], max_concurrency=0)
+
+
+@pytest.mark.asyncio
+async def test_arun_bounded_preserves_order():
+    active = 0
+    peak = 0
+
+    async def work(item):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01 * (3 - item % 3))
+        active -= 1
+        if item == 4:
+            error_message = "boom"
+            raise RuntimeError(error_message)
+        return item
+
+    results = await arun_bounded(work, range(9), max_concurrency=3)
+
+    assert [result.value for result in results] == [0, 1, 2, 3, None, 5, 6, 7, 8]
+    assert isinstance(results[4].error, RuntimeError)
+    assert peak <= 3
+
+
+@pytest.mark.asyncio
+async def test_arun_bounded_pulls_blocking_iterables_in_a_thread():
+    loop_thread = threading.get_ident()
+    producer_threads = set()
+
+    def produce():
+        for item in range(5):
+            producer_threads.add(threading.get_ident())
+            yield item
+
+    async def work(item):
+        await asyncio.sleep(0.01 * (5 - item))
+        return item * 2
+
+    results = await arun_bounded(work, iterate_in_thread(produce()), max_concurrency=2)
+
+    assert [result.value for result in results] == [0, 2, 4, 6, 8]
+    assert loop_thread not in producer_threads
@@ -1,4 +1,7 @@
+import logging
+import threading
 import unittest
+from unittest.mock import patch
 
 from src.openai_backend.openai_audio_backend import OpenAIAudioConfigManager
 
@@ -48,6 +51,87 @@ class TestConfigManager(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.config_manager.combine_config("non_existing_service", model="model-x")
 
+    def test_config_is_read_only(self):
+        """Test that configurations can only change through the manager."""
+        with self.assertRaises(TypeError):
+            self.config_manager.config["transcription"]["model"] = "whisper-9"
+        with self.assertRaises(TypeError):
+            self.config_manager.get_config("transcription")["model"] = "whisper-9"
+
+        combined_config = self.config_manager.combine_config("transcription")
+        combined_config["model"] = "whisper-9"
+        self.assertEqual(self.config_manager.get_config("transcription")["model"], "whisper-2")
+
+    def test_snapshots_are_versioned(self):
+        """Test that updates publish a new snapshot and leave older ones untouched."""
+        snapshot = self.config_manager.snapshot
+
+        self.config_manager.set_default("transcription", model="whisper-3")
+
+        self.assertEqual(self.config_manager.snapshot.version, snapshot.version + 1)
+        self.assertEqual(snapshot.services["transcription"]["model"], "whisper-2")
+        self.assertEqual(self.config_manager.config["transcription"]["model"], "whisper-3")
+
+    def test_invalid_update_changes_nothing(self):
+        """Test that a batch of updates is applied atomically."""
+        version = self.config_manager.snapshot.version
+
+        with self.assertRaises(TypeError):
+            self.config_manager.update_config(transcription={"model": "whisper-3"}, text_to_speech=123)
+
+        self.assertEqual(self.config_manager.snapshot.version, version)
+        self.assertEqual(self.config_manager.get_config("transcription")["model"], "whisper-2")
+
+    def test_combine_config_is_memoized(self):
+        """Test that merged configurations are cached until the configuration changes."""
+        with patch.object(self.config_manager, "_merge_kwargs", wraps=self.config_manager._merge_kwargs) as merge:
+            first = self.config_manager.combine_config("transcription", model="whisper-3", stop=["a"])
+            second = self.config_manager.combine_config("transcription", model="whisper-3", stop=["a"])
+            self.assertEqual(merge.call_count, 1)
+            self.assertEqual(first, second)
+            self.assertIsNot(first, second)
+
+            self.config_manager.update_config(transcription={"speed": "3x"})
+            third = self.config_manager.combine_config("transcription", model="whisper-3", stop=["a"])
+            self.assertEqual(merge.call_count, 2)
+            self.assertEqual(third["speed"], "3x")
+
+    def test_combine_config_with_unhashable_values(self):
+        """Test that values that cannot be cached are still merged."""
+        combined_config = self.config_manager.combine_config("transcription", tags={"a"})
+
+        self.assertEqual(combined_config["tags"], {"a"})
+
+    def test_nested_updates_merge(self):
+        """Test that nested dictionaries are merged rather than replaced."""
+        self.config_manager.update_config(transcription={"options": {"a": 1, "b": 2}})
+        self.config_manager.update_config(transcription={"options": {"b": 3}})
+
+        self.assertEqual(dict(self.config_manager.get_config("transcription")["options"]), {"a": 1, "b": 3})
+
+    def test_concurrent_updates_are_not_lost(self):
+        """Test that updates from several threads all land."""
+        threads = [
+            threading.Thread(target=self.config_manager.update_config, kwargs={"transcription": {f"key{i}": i}})
+            for i in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        transcription_config = self.config_manager.get_config("transcription")
+        self.assertTrue(all(transcription_config[f"key{i}"] == i for i in range(20)))
+
+    def test_logger_handlers_do_not_accumulate(self):
+        """Test that creating managers does not attach a handler each time."""
+        handlers = len(logging.getLogger("ConfigManager").handlers)
+
+        for _ in range(5):
+            OpenAIAudioConfigManager()
+
+        self.assertEqual(len(logging.getLogger("ConfigManager").handlers), handlers)
+
 
 if __name__ == "__main__":
     unittest.main()
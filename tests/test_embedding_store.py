@@ -0,0 +1,77 @@
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+from base.embedding_store import EmbeddingStore
+from openai_backend.openai_text_backend import OpenAITextBackend
+
+
+def test_add_and_lookup(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    vectors = np.arange(6, dtype=np.float32).reshape(3, 2)
+
+    store.add(["a", "b", "c"], "model-1", vectors)
+    rows, missing = store.lookup(["c", "x", "a"], "model-1")
+
+    assert len(store) == 3
+    assert missing == [1]
+    np.testing.assert_array_equal(store.vectors[rows[[0, 2]]], vectors[[2, 0]])
+    np.testing.assert_array_equal(store.get("b", "model-1"), vectors[1])
+    assert store.get("b", "model-2") is None
+
+
+def test_add_skips_known_texts(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    store.add(["a"], "m", np.ones((1, 2)))
+    store.add(["a", "b", "b"], "m", np.full((3, 2), 2.0))
+
+    assert len(store) == 2
+    np.testing.assert_array_equal(store.get("a", "m"), [1.0, 1.0])
+
+
+def test_store_persists_and_recovers_partial_append(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    store.add(["a", "b"], "m", np.eye(2, dtype=np.float32))
+
+    # Simulate a crash after writing a vector but before writing its key.
+    with open(tmp_path / "vectors.f32", "ab") as vectors_file:
+        vectors_file.write(np.zeros(2, dtype=np.float32).tobytes())
+
+    reopened = EmbeddingStore(str(tmp_path))
+    assert len(reopened) == 2
+    np.testing.assert_array_equal(reopened.get("b", "m"), [0.0, 1.0])
+    assert isinstance(reopened.vectors, np.memmap)
+
+
+def test_dimension_mismatch(tmp_path):
+    store = EmbeddingStore(str(tmp_path), dimensions=3)
+    with pytest.raises(ValueError):
+        store.add(["a"], "m", np.ones((1, 2)))
+    with pytest.raises(ValueError):
+        EmbeddingStore(str(tmp_path), dimensions=4)
+
+
+@pytest.mark.parametrize("vectors", [np.ones(2), np.ones((2, 2)), np.ones((1, 1, 2))])
+def test_vectors_must_be_one_row_per_text(tmp_path, vectors):
+    with pytest.raises(ValueError, match="one row per text"):
+        EmbeddingStore(str(tmp_path)).add(["a"], "m", vectors)
+
+
+def test_generate_embeddings_only_requests_misses(tmp_path):
+    def create(input, **_):  # noqa: A002
+        return Mock(data=[Mock(index=i, embedding=[float(len(text)), 0.0]) for i, text in enumerate(input)])
+
+    mock_client = Mock()
+    mock_client.embeddings.create.side_effect = create
+    with patch("openai_backend.openai_text_backend.OpenAITextBackend.create_client", return_value=mock_client):
+        backend = OpenAITextBackend()
+    backend.set_embedding_store(EmbeddingStore(str(tmp_path)))
+
+    first = backend.generate_embeddings(["a", "bb"], encoding_format="float")
+    second = backend.generate_embeddings(["ccc", "a", "bb"], encoding_format="float")
+    third = backend.generate_embeddings(["bb", "a"], encoding_format="float")
+
+    np.testing.assert_array_equal(first, [[1.0, 0.0], [2.0, 0.0]])
+    np.testing.assert_array_equal(second, [[3.0, 0.0], [1.0, 0.0], [2.0, 0.0]])
+    np.testing.assert_array_equal(third, [[2.0, 0.0], [1.0, 0.0]])
+    assert [call.kwargs["input"] for call in mock_client.embeddings.create.call_args_list] == [["a", "bb"], ["ccc"]]
@@ -0,0 +1,111 @@
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import openai
+import pytest
+from ai_backend import AudioAI, ImageAI, TextAI
+from base.fake_openai_server import FakeOpenAIServer, FakeServerSettings, Latency
+
+MESSAGES = [{"role": "user", "content": "Hello there"}]
+
+
+@pytest.fixture
+def fake_server():
+    with FakeOpenAIServer(FakeServerSettings(retry_after=0.01, seed=0)) as server:
+        yield server
+
+
+def test_latency_sampling():
+    rng = random.Random(0)  # noqa: S311
+
+    assert Latency().sample(rng) == 0.0
+    assert Latency(median=0.2).sample(rng) == 0.2
+    samples = sorted(Latency(median=0.2, sigma=0.5).sample(rng) for _ in range(2001))
+    assert samples[1000] == pytest.approx(0.2, rel=0.1)
+    assert samples[-1] > 0.5
+
+
+def test_text_chat_and_embeddings(fake_server):
+    text_ai = TextAI(api_key="sk-fake", base_url=fake_server.base_url)
+
+    assert text_ai.text_chat(MESSAGES) == "echo: Hello there"
+    assert text_ai.generate_embedding("bbb") == [3.0, 1.0]
+
+
+def test_text_chat_stream(fake_server):
+    text_ai = TextAI(api_key="sk-fake", base_url=fake_server.base_url)
+
+    stream = text_ai.text_chat_stream(MESSAGES)
+
+    assert "".join(stream) == "echo: Hello there"
+    assert stream.usage.completion_tokens > 0
+
+
+def test_image_and_speech(fake_server):
+    image_ai = ImageAI(api_key="sk-fake", base_url=fake_server.base_url)
+    audio_ai = AudioAI(api_key="sk-fake", base_url=fake_server.base_url)
+
+    assert image_ai.generate_image("a cat").startswith("https://images.invalid/")
+    assert audio_ai.backend.text_to_speech("Hello").getvalue().startswith(b"ID3")
+
+
+def test_transcription(fake_server):
+    audio_ai = AudioAI(api_key="sk-fake", base_url=fake_server.base_url)
+
+    response = audio_ai.backend.client.audio.transcriptions.create(
+        file=("audio.mp3", bytes(32000), "audio/mpeg"), model="whisper-1", response_format="verbose_json"
+    )
+
+    assert response.text == "Transcribed 32000 bytes of audio."
+    assert response.duration == 2.0
+
+
+def test_rate_limit_injection_is_retried(fake_server):
+    text_ai = TextAI(api_key="sk-fake", base_url=fake_server.base_url)
+    fake_server.state.fail_next(429)
+
+    assert text_ai.text_chat(MESSAGES) == "echo: Hello there"
+    assert [path for _, path, _ in fake_server.state.requests] == ["/v1/chat/completions"] * 2
+
+
+def test_error_rate():
+    with FakeOpenAIServer(FakeServerSettings(error_rate=1.0)) as server:
+        client = openai.OpenAI(api_key="sk-fake", base_url=server.base_url, max_retries=0)
+
+        with pytest.raises(openai.InternalServerError):
+            client.chat.completions.create(model="gpt-4o", messages=MESSAGES)
+        client.close()
+
+
+def test_endpoint_latency():
+    settings = FakeServerSettings(endpoint_latency={"/v1/chat/completions": Latency(median=0.2)})
+    with FakeOpenAIServer(settings) as server:
+        client = openai.OpenAI(api_key="sk-fake", base_url=server.base_url)
+        started_at = time.perf_counter()
+        client.embeddings.create(model="text-embedding-3-small", input="fast")
+        embedding_time = time.perf_counter() - started_at
+        started_at = time.perf_counter()
+        client.chat.completions.create(model="gpt-4o", messages=MESSAGES)
+        chat_time = time.perf_counter() - started_at
+        client.close()
+
+    assert chat_time >= 0.2 > embedding_time
+
+
+def test_load_test_script():
+    script = os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts", "load_test.py")
+
+    output = subprocess.run(  # noqa: S603
+        [sys.executable, script, "chat", "image", "--requests", "5", "--latency", "0", "--json"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    results = json.loads(output)["results"]
+    assert set(results) == {"chat", "image"}
+    assert all(result["requests"] == 5 and result["failed"] == 0 for result in results.values())
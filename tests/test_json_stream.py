@@ -0,0 +1,163 @@
+import asyncio
+import json
+import random
+
+import pytest
+from ai_backend import AsyncTextAI, TextAI
+from base.fake_openai_server import FakeOpenAIServer
+from base.json_schema import SchemaValidationError, schema_at, validate
+from base.json_stream import JsonEvent, JsonStreamParser
+
+DOCUMENT = {
+    "records": [
+        {"name": 'quote " and \\ backslash', "count": 12345, "ok": True, "note": None},
+        {"name": "café ☃", "count": -1.5e3, "ok": False, "note": "x"},
+    ],
+    "total": 2,
+}
+
+RECORD_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "count": {"type": "number"},
+        "ok": {"type": "boolean"},
+        "note": {"anyOf": [{"type": "string"}, {"type": "null"}]},
+    },
+    "required": ["name", "count", "ok", "note"],
+    "additionalProperties": False,
+}
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"records": {"type": "array", "items": {"$ref": "#/$defs/record"}}, "total": {"type": "integer"}},
+    "required": ["records", "total"],
+    "additionalProperties": False,
+    "$defs": {"record": RECORD_SCHEMA},
+}
+
+
+def parse_in_pieces(text, item_path, seed=0):
+    rng = random.Random(seed)  # noqa: S311
+    parser = JsonStreamParser(item_path)
+    events = []
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 5)
+        events += parser.feed(text[position : position + size])
+        position += size
+    events += parser.close()
+    return parser, events
+
+
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+@pytest.mark.parametrize("seed", range(5))
+def test_records_are_emitted_in_pieces(ensure_ascii, seed):
+    text = json.dumps(DOCUMENT, ensure_ascii=ensure_ascii, indent=seed % 2 or None)
+    parser, events = parse_in_pieces(text, ("records", "*"), seed)
+
+    assert events == [JsonEvent(("records", index), record) for index, record in enumerate(DOCUMENT["records"])]
+    assert parser.value == DOCUMENT
+
+
+def test_item_paths():
+    text = json.dumps(DOCUMENT)
+
+    assert [event.path for event in parse_in_pieces(text, ("*",))[1]] == [("records",), ("total",)]
+    assert [event.value for event in parse_in_pieces(text, ("records", "*", "count"))[1]] == [12345, -1500.0]
+    assert parse_in_pieces(text, ())[1] == [JsonEvent((), DOCUMENT)]
+    assert [event.value for event in parse_in_pieces("[1, [2], {}]", ("*",))[1]] == [1, [2], {}]
+
+
+def test_values_are_emitted_as_soon_as_they_close():
+    parser = JsonStreamParser(("records", "*"))
+
+    assert parser.feed('{"records": [{"a": 1}, {"a"') == [JsonEvent(("records", 0), {"a": 1})]
+    assert parser.feed(": 2}") == [JsonEvent(("records", 1), {"a": 2})]
+    assert parser.feed("]}") == []
+    assert parser.close() == []
+
+
+def test_scalars_split_across_pieces():
+    parser = JsonStreamParser(("*",))
+    assert parser.feed("[12") == []
+    assert parser.feed("3, tr") == [JsonEvent((0,), 123)]
+    assert parser.feed("ue]") == [JsonEvent((1,), True)]
+
+    root = JsonStreamParser(())
+    assert root.feed("4") == []
+    assert root.close() == [JsonEvent((), 4)]
+
+
+def test_only_the_open_item_is_kept():
+    parser = JsonStreamParser(("records", "*"))
+    parser.feed('{"records": [' + ", ".join(['{"a": "' + "x" * 100 + '"}'] * 100))
+    assert len(parser._window) < 200
+
+
+def test_invalid_documents():
+    with pytest.raises(ValueError, match="Unexpected"):
+        JsonStreamParser().feed("]")
+    parser = JsonStreamParser()
+    parser.feed('{"a": 1')
+    with pytest.raises(ValueError):
+        parser.close()
+    with pytest.raises(ValueError, match="closed"):
+        parser.feed("}")
+
+
+def test_schema_validation():
+    validate(DOCUMENT, SCHEMA)
+    assert schema_at(SCHEMA, ("records", 3)) == RECORD_SCHEMA
+    assert schema_at(SCHEMA, ("records", 0, "name")) == {"type": "string"}
+    assert schema_at(SCHEMA, ("unknown",)) is None
+
+    with pytest.raises(SchemaValidationError, match="records/1/note: matches none"):
+        validate({**DOCUMENT, "records": [DOCUMENT["records"][0], {**DOCUMENT["records"][1], "note": 1}]}, SCHEMA)
+    with pytest.raises(SchemaValidationError, match="total: expected integer, got bool"):
+        validate({**DOCUMENT, "total": True}, SCHEMA)
+    with pytest.raises(SchemaValidationError, match="<root>: unexpected field 'extra'"):
+        validate({**DOCUMENT, "extra": 1}, SCHEMA)
+    with pytest.raises(SchemaValidationError, match="missing required field 'total'"):
+        validate({"records": []}, SCHEMA)
+    # Paths validated already are skipped.
+    validate({"records": [{"bad": 1}], "total": 1}, SCHEMA, skip=lambda path: path == ("records", 0))
+
+
+@pytest.fixture
+def fake_server():
+    with FakeOpenAIServer() as server:
+        yield server
+
+
+def test_text_chat_structured_streams_validated_records(fake_server):
+    text_ai = TextAI(api_key="sk-fake", base_url=fake_server.base_url)
+    messages = [{"role": "user", "content": json.dumps(DOCUMENT)}]
+
+    stream = text_ai.text_chat_structured(messages, SCHEMA, ("records", "*"))
+    records = [event.value for event in stream]
+
+    assert records == DOCUMENT["records"]
+    assert stream.value == DOCUMENT
+    assert stream.finish_reason == "stop"
+
+
+def test_text_chat_structured_rejects_invalid_records(fake_server):
+    text_ai = TextAI(api_key="sk-fake", base_url=fake_server.base_url)
+    document = {"records": [DOCUMENT["records"][0], {"name": 1}], "total": 2}
+    stream = text_ai.text_chat_structured([{"role": "user", "content": json.dumps(document)}], SCHEMA, ("records", "*"))
+
+    iterator = iter(stream)
+    assert next(iterator).path == ("records", 0)
+    with pytest.raises(SchemaValidationError, match="records/1"):
+        next(iterator)
+
+
+def test_json_mode_without_a_schema(fake_server):
+    text_ai = AsyncTextAI(api_key="sk-fake", base_url=fake_server.base_url)
+
+    async def fields():
+        stream = await text_ai.text_chat_structured([{"role": "user", "content": '{"a": 1, "b": [2]}'}])
+        return [(event.path, event.value) async for event in stream], stream.value
+
+    assert asyncio.run(fields()) == ([(("a",), 1), (("b",), [2])], {"a": 1, "b": [2]})
@@ -0,0 +1,139 @@
+import asyncio
+import urllib.request
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+from base.metrics import CallRecord, Histogram, MetricsAggregator, metrics, payload_size, serve_prometheus, track_call
+from openai_backend.openai_image_backend import OpenAIImageBackend
+from openai_backend.openai_text_backend import OpenAITextBackend
+
+
+@pytest.fixture
+def aggregator():
+    aggregator = MetricsAggregator()
+    metrics.add_hook(aggregator)
+    yield aggregator
+    metrics.remove_hook(aggregator)
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.75) == 1.0
+    assert histogram.quantile(1.0) == float("inf")
+    assert histogram.sum == pytest.approx(2.65)
+
+
+def test_payload_size():
+    assert payload_size(b"abc") == 3
+    assert payload_size("é") == 2
+    assert payload_size([{"role": "user", "content": "hi"}]) == len('[{"role": "user", "content": "hi"}]')
+    assert payload_size(None) is None
+
+
+def test_track_call_records_usage_and_bytes(aggregator):
+    with track_call("openai", "chat", "gpt-4o", "hello") as call:
+        call.response = SimpleNamespace(usage=SimpleNamespace(prompt_tokens=3, completion_tokens=5))
+        call.response_payload = b"12345678"
+
+    assert aggregator.calls == {("openai", "chat", "gpt-4o"): 1}
+    assert aggregator.tokens[("openai", "chat", "gpt-4o", "prompt")] == 3
+    assert aggregator.tokens[("openai", "chat", "gpt-4o", "completion")] == 5
+    assert aggregator.payload_bytes[("openai", "chat", "gpt-4o", "request")] == 5
+    assert aggregator.payload_bytes[("openai", "chat", "gpt-4o", "response")] == 8
+
+
+def test_track_call_records_errors(aggregator):
+    with pytest.raises(TimeoutError), track_call("openai", "chat", "gpt-4o"):
+        raise TimeoutError
+
+    assert aggregator.errors == {("openai", "chat", "gpt-4o", "TimeoutError"): 1}
+    assert aggregator.summary()["openai/chat/gpt-4o"]["error_rate"] == 1.0
+
+
+def test_track_call_records_cancelled_calls(aggregator):
+    async def cancelled_call():
+        with track_call("openai", "chat", "gpt-4o"):
+            await asyncio.sleep(10)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(cancelled_call(), 0.01))
+
+    assert aggregator.errors == {("openai", "chat", "gpt-4o", "CancelledError"): 1}
+    assert aggregator.payload_bytes == {}
+
+
+def test_removed_hook_records_nothing():
+    hook = Mock()
+    metrics.add_hook(hook)
+    metrics.remove_hook(hook)
+
+    assert not metrics.enabled
+    with track_call("openai", "chat", "gpt-4o", "hello"):
+        pass
+
+    hook.record.assert_not_called()
+
+
+def test_prometheus_export():
+    aggregator = MetricsAggregator(buckets=(1.0,))
+    aggregator.record(CallRecord("openai", "chat", 'gpt-"4o"', 0.5, prompt_tokens=2, error="APIError"))
+
+    text = aggregator.to_prometheus()
+
+    labels = 'backend="openai",service="chat",model="gpt-\\"4o\\""'
+    assert "# TYPE ai_backend_request_duration_seconds histogram" in text
+    assert f'ai_backend_request_duration_seconds_bucket{{{labels},le="1.0"}} 1' in text
+    assert f'ai_backend_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+    assert f"ai_backend_request_duration_seconds_count{{{labels}}} 1" in text
+    assert f"ai_backend_requests_total{{{labels}}} 1" in text
+    assert f'ai_backend_request_errors_total{{{labels},error="APIError"}} 1' in text
+    assert f'ai_backend_tokens_total{{{labels},kind="prompt"}} 2' in text
+
+
+def test_serve_prometheus():
+    aggregator = MetricsAggregator()
+    aggregator.record(CallRecord("openai", "chat", "gpt-4o", 0.2))
+    server = serve_prometheus(aggregator, port=0)
+    try:
+        host, port = server.server_address[:2]
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+            body = response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert 'ai_backend_requests_total{backend="openai",service="chat",model="gpt-4o"} 1' in body
+
+
+def test_text_chat_is_tracked(aggregator):
+    client = Mock()
+    client.chat.completions.create.return_value = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="hi"))],
+        usage=SimpleNamespace(prompt_tokens=9, completion_tokens=1),
+    )
+    with patch("openai_backend.openai_text_backend.OpenAITextBackend.create_client", return_value=client):
+        backend = OpenAITextBackend()
+
+    with patch.object(backend, "log_request_response") as log_request_response:
+        backend.text_chat([{"role": "user", "content": "Hello"}])
+
+    labels = ("openai", "chat", "gpt-4o")
+    assert aggregator.calls[labels] == 1
+    assert aggregator.tokens[(*labels, "prompt")] == 9
+    log_request_response.assert_called_once()
+
+
+def test_failed_image_generation_is_tracked(aggregator):
+    client = Mock()
+    client.images.generate.side_effect = RuntimeError("boom")
+    with patch("openai_backend.openai_image_backend.OpenAIImageBackend.create_client", return_value=client):
+        backend = OpenAIImageBackend()
+
+    assert backend.generate_image("a cat") is None
+    assert aggregator.errors == {("openai", "image_generation", "dall-e-3", "RuntimeError"): 1}
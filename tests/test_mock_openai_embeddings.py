@@ -0,0 +1,75 @@
+import base64
+import threading
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+from openai_backend.openai_text_backend import OpenAITextBackend
+
+
+def fake_embedding(text):
+    return [float(len(text)), float(text.count("a")), 1.0]
+
+
+def fake_create(encoded):
+    lock = threading.Lock()
+    calls = []
+
+    def create(input, **config):  # noqa: A002
+        with lock:
+            calls.append((list(input), config))
+        data = []
+        # Return rows out of order to exercise re-ordering by index.
+        for index, text in reversed(list(enumerate(input))):
+            vector = np.asarray(fake_embedding(text), dtype=np.float32)
+            embedding = base64.b64encode(vector.tobytes()).decode() if encoded else vector.tolist()
+            data.append(Mock(index=index, embedding=embedding))
+        return Mock(data=data)
+
+    return create, calls
+
+
+@pytest.fixture
+def text_backend():
+    with patch("openai_backend.openai_text_backend.OpenAITextBackend.create_client", return_value=Mock()):
+        yield OpenAITextBackend()
+
+
+def test_generate_embeddings_batches_and_orders(text_backend):
+    create, calls = fake_create(encoded=True)
+    text_backend.client.embeddings.create.side_effect = create
+    texts = [f"text {'a' * i}" for i in range(25)]
+
+    embeddings = text_backend.generate_embeddings(texts, batch_size=4, max_concurrency=3)
+
+    assert embeddings.dtype == np.float32
+    assert embeddings.flags["C_CONTIGUOUS"]
+    assert embeddings.shape == (25, 3)
+    np.testing.assert_array_equal(embeddings, np.asarray([fake_embedding(text) for text in texts], dtype=np.float32))
+    assert len(calls) == 7
+    assert all(config["encoding_format"] == "base64" for _, config in calls)
+    assert all(config["model"] == "text-embedding-ada-002" for _, config in calls)
+
+
+def test_generate_embeddings_respects_token_budget(text_backend):
+    create, calls = fake_create(encoded=False)
+    text_backend.client.embeddings.create.side_effect = create
+    texts = ["x" * 400] * 10
+
+    embeddings = text_backend.generate_embeddings(texts, max_batch_tokens=300, encoding_format="float")
+
+    assert embeddings.shape == (10, 3)
+    assert [len(batch) for batch, _ in calls] == [2, 2, 2, 2, 2]
+
+
+def test_generate_embeddings_failure(text_backend):
+    text_backend.client.embeddings.create.side_effect = Exception("API Error")
+
+    assert text_backend.generate_embeddings(["a", "b"]) is None
+
+
+def test_generate_embedding_returns_first_vector(text_backend):
+    text_backend.client.embeddings.create.return_value = Mock(data=[Mock(embedding=[0.1, 0.2])])
+
+    assert text_backend.generate_embedding(["Hello"]) == [0.1, 0.2]
+    text_backend.client.embeddings.create.assert_called_once_with(input=["Hello"], model="text-embedding-ada-002")
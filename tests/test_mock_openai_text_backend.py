@@ -75,3 +75,37 @@ def test_text_chat_exception(text_backend):
         # The function in your backend to handle text chat should handle the exception
         response = text_backend.text_chat(["Hello, OpenAI!"])
         assert response is None
+
+
+def test_text_chat_many(text_backend, mock_openai_client):
+    messages_list = [[{"role": "user", "content": f"Question {i}"}] for i in range(5)]
+    item_kwargs = [{"max_tokens": i + 1} for i in range(5)]
+
+    results = text_backend.text_chat_many(messages_list, item_kwargs, max_concurrency=2, model="gpt-7")
+
+    assert [result.value for result in results] == ["\n\nHello there, how may I assist you today?"] * 5
+    assert mock_openai_client.chat.completions.create.call_count == 5
+    mock_openai_client.chat.completions.create.assert_any_call(
+        messages=messages_list[3], model="gpt-7", temperature=0.2, max_tokens=4
+    )
+
+
+def test_text_chat_many_captures_failures(text_backend, mock_openai_client):
+    successful_response = mock_openai_client.chat.completions.create.return_value
+    mock_openai_client.chat.completions.create.side_effect = [successful_response, Exception("API Error")]
+
+    results = text_backend.text_chat_many([["first"], ["second"]], max_concurrency=1)
+
+    assert results[0].ok
+    assert not results[1].ok
+    assert str(results[1].error) == "API Error"
+
+
+def test_text_chat_many_rejects_misaligned_kwargs(text_backend, mock_openai_client):
+    with pytest.raises(ValueError):
+        text_backend.text_chat_many([["first"], ["second"]], [{}])
+    with pytest.raises(ValueError):
+        text_backend.text_chat_many_as_completed([["first"]], [{}, {}])
+
+    # The mismatch is found before any request is sent.
+    mock_openai_client.chat.completions.create.assert_not_called()
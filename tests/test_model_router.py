@@ -0,0 +1,138 @@
+import asyncio
+import time
+
+import httpx
+import openai
+import pytest
+from ai_backend import AsyncTextAI, TextAI
+from base.fake_openai_server import FakeOpenAIServer, FakeServerSettings, Latency
+from base.model_router import ModelEstimate, ModelRouter
+
+MESSAGES = [{"role": "user", "content": "Hello there"}]
+
+
+def status_error(status_code):
+    request = httpx.Request("POST", "https://api.example.com/v1/chat/completions")
+    response = httpx.Response(status_code, request=request)
+    return openai.APIStatusError("failed", response=response, body=None)
+
+
+@pytest.fixture
+def fake_server():
+    settings = FakeServerSettings(model_latency={"slow": Latency(0.3), "fast": Latency(0.01)})
+    with FakeOpenAIServer(settings) as server:
+        yield server
+
+
+def test_unobserved_models_are_probed_then_fastest_wins():
+    router = ModelRouter(["large", "small"])
+
+    assert router.route() == ["large", "small"]
+    assert router.route() == ["small", "large"]
+    router.record("large", 2.0)
+    router.record("small", 0.5)
+
+    assert router.route() == ["small", "large"]
+    assert router.estimates()["large"] == ModelEstimate(latency=2.0, error_rate=0.0, samples=1)
+
+
+def test_estimates_are_smoothed():
+    router = ModelRouter(["model"], smoothing=0.5)
+    router.record("model", 1.0)
+    router.record("model", 3.0)
+    router.record("model", 1.0, status_error(503))
+
+    estimate = router.estimates()["model"]
+    assert estimate.latency == 2.0
+    assert estimate.error_rate == 0.5
+    assert estimate.samples == 3
+
+
+def test_unhealthy_models_are_last_and_invalid_requests_ignored():
+    router = ModelRouter(["large", "small"], smoothing=1.0)
+    router.record("large", 0.1)
+    router.record("small", 1.0)
+    router.record("large", 0.1, status_error(429))
+    router.record("small", 0.1, status_error(400))
+    router.record("unknown", 0.1)
+
+    assert router.route() == ["small", "large"]
+    assert router.estimates()["small"].error_rate == 0.0
+    assert "unknown" not in router.estimates()
+
+
+def test_latency_slo_prefers_the_first_model_that_fits():
+    router = ModelRouter(["large", "medium", "small"])
+    router.record("large", 3.0)
+    router.record("medium", 1.0)
+    router.record("small", 0.2)
+
+    assert router.route() == ["small", "medium", "large"]
+    assert router.route(latency_slo=5.0) == ["large", "medium", "small"]
+    assert router.route(latency_slo=1.5) == ["medium", "small", "large"]
+    assert router.route(latency_slo=0.1) == ["small", "medium", "large"]
+
+
+def test_stale_models_are_probed_again():
+    router = ModelRouter(["large", "small"], probe_interval=0.05)
+    router.record("large", 3.0)
+    router.record("small", 0.2)
+    assert router.route()[0] == "small"
+
+    time.sleep(0.06)
+    assert router.route()[0] == "large"
+    # One probe per interval, not every call.
+    assert router.route()[0] == "small"
+
+
+def test_invalid_router():
+    with pytest.raises(ValueError, match="at least one model"):
+        ModelRouter([])
+    with pytest.raises(ValueError, match="smoothing"):
+        ModelRouter(["model"], smoothing=0)
+
+
+def test_text_chat_routes_to_the_fastest_model(fake_server):
+    text_ai = TextAI(api_key="sk-fake", base_url=fake_server.base_url)
+    router = ModelRouter(["slow", "fast"])
+    text_ai.set_model_router(router)
+
+    for _ in range(4):
+        assert text_ai.text_chat(MESSAGES) == "echo: Hello there"
+    assert text_ai.text_chat(MESSAGES, model="slow") == "echo: Hello there"
+
+    estimates = router.estimates()
+    assert estimates["slow"].samples == 2
+    assert estimates["fast"].samples == 3
+    assert estimates["fast"].latency < estimates["slow"].latency
+
+
+def test_latency_slo_falls_back_to_a_faster_model(fake_server):
+    text_ai = TextAI(api_key="sk-fake", base_url=fake_server.base_url)
+    router = ModelRouter(["slow", "fast"])
+    text_ai.set_model_router(router)
+
+    started_at = time.perf_counter()
+    assert text_ai.text_chat(MESSAGES, latency_slo=0.1) == "echo: Hello there"
+    assert time.perf_counter() - started_at < 0.3
+
+    estimates = router.estimates()
+    assert estimates["slow"].error_rate > 0
+    assert estimates["slow"].latency >= 0.1
+    assert estimates["fast"].samples == 1
+    assert router.route(latency_slo=0.1)[0] == "fast"
+
+
+def test_async_text_chat_is_routed(fake_server):
+    text_ai = AsyncTextAI(api_key="sk-fake", base_url=fake_server.base_url)
+    router = ModelRouter(["slow", "fast"])
+    text_ai.backend.set_model_router(router)
+    router.record("slow", 0.3)
+
+    async def chat():
+        return await text_ai.text_chat(MESSAGES, latency_slo=0.1)
+
+    assert asyncio.run(chat()) == "echo: Hello there"
+    # The slow model is known to miss the SLO, so the untried one goes first.
+    assert router.estimates()["slow"].samples == 1
+    assert router.estimates()["fast"].samples == 1
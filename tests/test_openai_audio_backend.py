@@ -0,0 +1,295 @@
+import asyncio
+import io
+import mmap
+import time
+import wave
+from unittest.mock import Mock
+
+import pytest
+from base.audio_stream import SilencePolicy, iter_audio_chunks, iter_silence_chunks
+from pydub import AudioSegment
+from base.fake_openai_server import FakeOpenAIServer, FakeServerSettings, Latency
+from base.request_policy import RequestPolicy
+from base.transcript_stitching import TimedText
+from openai.types.audio import Transcription
+from openai_backend.openai_audio_backend import OpenAIAudioBackend
+
+from benchmarks.synthetic import make_audio, requires_ffmpeg
+
+TRANSCRIPTIONS = "/v1/audio/transcriptions"
+
+
+class WavAudioBackend(OpenAIAudioBackend):
+    """Uploads WAV chunks, which pydub writes without ffmpeg, and records what is stitched."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stitched = []
+
+    def _export_chunk(self, chunk):
+        buffer = io.BytesIO()
+        chunk.export(buffer, format="wav")
+        buffer.seek(0)
+        return buffer
+
+    def stitch_chunks(self, transcripts):
+        self.stitched.append([transcript.text for transcript in transcripts])
+        return super().stitch_chunks(transcripts)
+
+
+def wav_bytes(seconds):
+    return to_wav(make_audio(seconds))
+
+
+def to_wav(audio):
+    buffer = io.BytesIO()
+    audio.export(buffer, format="wav")
+    return buffer.getvalue()
+
+
+def speech_with_pauses(*pieces):
+    """Noise for positive lengths and silence for negative ones, in seconds."""
+    audio = AudioSegment.empty()
+    for seconds in pieces:
+        audio += make_audio(seconds) if seconds > 0 else AudioSegment.silent(-seconds * 1000, frame_rate=16000)
+    return to_wav(audio)
+
+
+def verbose_transcription(*segments):
+    """A verbose_json response as older SDKs return it, with (start, end, text) segments left as dicts."""
+    return Transcription.model_validate(
+        {
+            "text": "".join(text for _, _, text in segments),
+            "segments": [{"start": start, "end": end, "text": text} for start, end, text in segments],
+        }
+    )
+
+
+def chunk_sizes(transcriptions):
+    return [int(text.split()[1]) for text in transcriptions]
+
+
+@pytest.fixture
+def fake_server():
+    settings = FakeServerSettings(endpoint_latency={TRANSCRIPTIONS: Latency(0.1, 0.5)}, seed=1)
+    with FakeOpenAIServer(settings) as server:
+        yield server
+
+
+def test_chunks_are_transcribed_concurrently_and_kept_in_order(fake_server):
+    backend = WavAudioBackend(api_key="sk-fake", base_url=fake_server.base_url)
+    # Three full chunks and a short last one, so the order of the results can be told apart.
+    audio = wav_bytes(7)
+
+    started_at = time.perf_counter()
+    assert backend.voice_to_text(audio, chunk_length=2000, overlap=0, max_concurrency=4)
+    elapsed = time.perf_counter() - started_at
+
+    sizes = chunk_sizes(backend.stitched[0])
+    assert len(sizes) == 4
+    assert sizes[:3] == [sizes[0]] * 3
+    assert sizes[3] < sizes[0]
+    assert elapsed < 0.1 * 4
+
+
+def test_failed_chunks_are_retried_on_their_own(fake_server):
+    backend = WavAudioBackend(api_key="sk-fake", base_url=fake_server.base_url)
+    fake_server.state.fail_next(500, count=2)
+
+    assert backend.voice_to_text(wav_bytes(4), chunk_length=2000, overlap=0, max_concurrency=2)
+
+    assert len(backend.stitched[0]) == 2
+    assert [path for _, path, _ in fake_server.state.requests].count(TRANSCRIPTIONS) == 4
+
+
+def test_a_chunk_that_keeps_failing_fails_the_transcript(fake_server):
+    backend = WavAudioBackend(api_key="sk-fake", base_url=fake_server.base_url)
+    fake_server.state.fail_next(500, count=10)
+
+    assert backend.voice_to_text(wav_bytes(2), chunk_length=2000, overlap=0, max_chunk_attempts=2) is None
+    assert backend.stitched == []
+
+
+def test_request_policy_takes_precedence(fake_server):
+    backend = WavAudioBackend(api_key="sk-fake", base_url=fake_server.base_url)
+    backend.set_request_policy(RequestPolicy(max_attempts=4, initial_backoff=0.01))
+    fake_server.state.fail_next(429, count=3)
+
+    assert backend.voice_to_text(wav_bytes(2), chunk_length=2000, overlap=0, max_chunk_attempts=1)
+
+
+def test_async_chunks_are_transcribed_concurrently(fake_server):
+    backend = WavAudioBackend(api_key="sk-fake", base_url=fake_server.base_url)
+    fake_server.state.fail_next(500)
+
+    text = asyncio.run(backend.avoice_to_text(wav_bytes(7), chunk_length=2000, overlap=0, max_concurrency=4))
+
+    assert text
+    assert len(backend.stitched[0]) == 4
+    assert chunk_sizes(backend.stitched[0])[3] < chunk_sizes(backend.stitched[0])[0]
+
+
+def test_timestamps_are_read_from_dict_segments_and_words():
+    # Older SDKs return verbose_json as a plain Transcription, with segments and words left as dicts.
+    response = Transcription.model_validate(
+        {
+            "text": "Hello there.",
+            "segments": [{"id": 0, "start": 0.0, "end": 1.5, "text": " Hello there."}],
+            "words": [{"word": "Hello", "start": 0.0, "end": 0.5}, {"word": "there", "start": 0.6, "end": 1.0}],
+        }
+    )
+
+    transcript = OpenAIAudioBackend(api_key="sk-fake")._chunk_transcript(response, 2.0)
+
+    assert transcript.segments == [TimedText(0.0, 1.5, " Hello there.")]
+    assert transcript.words == [TimedText(0.0, 0.5, "Hello"), TimedText(0.6, 1.0, "there")]
+    assert transcript.duration == 2.0
+
+
+def test_overlaps_are_stitched_by_the_timestamps_of_dict_segments():
+    backend = WavAudioBackend(api_key="sk-fake")
+    client = Mock()
+    client.with_options.return_value = client
+    # The chunks cover 0-4 s and 2-4 s and their overlap is cut at 3 s, so each part of it is kept once.
+    client.audio.transcriptions.create.side_effect = [
+        verbose_transcription((0.0, 1.5, " one two"), (1.5, 2.8, " three four"), (2.8, 4.0, " five")),
+        verbose_transcription((0.0, 0.8, " four"), (0.8, 2.0, " five six")),
+    ]
+    backend.client = client
+
+    text = backend.voice_to_text(wav_bytes(4), chunk_length=3000, overlap=1000, max_concurrency=1)
+
+    assert text == "one two three four five six"
+
+
+@pytest.mark.parametrize(("chunk_length", "overlap"), [(2000, 0), (1500, 250), (999, 333)])
+def test_streamed_chunks_match_slicing_the_decoded_audio(chunk_length, overlap):
+    audio = make_audio(7.3)
+
+    streamed = list(iter_audio_chunks(wav_bytes(7.3), chunk_length, overlap))
+    sliced = [audio[i : i + chunk_length + overlap] for i in range(0, len(audio), chunk_length - overlap)]
+
+    assert [chunk.raw_data for chunk in streamed] == [chunk.raw_data for chunk in sliced]
+
+
+def test_audio_is_read_from_paths_files_and_memory_maps(tmp_path):
+    path = tmp_path / "speech.wav"
+    path.write_bytes(wav_bytes(5))
+    expected = [chunk.raw_data for chunk in iter_audio_chunks(wav_bytes(5), 2000, 100)]
+
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for source in (path, str(path), mapped):
+            assert [chunk.raw_data for chunk in iter_audio_chunks(source, 2000, 100)] == expected
+    with open(path, "rb") as file:
+        assert [chunk.raw_data for chunk in iter_audio_chunks(file, 2000, 100)] == expected
+
+
+def test_chunks_are_decoded_lazily(monkeypatch):
+    reads = []
+    readframes = wave.Wave_read.readframes
+
+    def counting_readframes(self, frames):
+        data = readframes(self, frames)
+        reads.append(len(data))
+        return data
+
+    monkeypatch.setattr(wave.Wave_read, "readframes", counting_readframes)
+    chunks = iter_audio_chunks(wav_bytes(60), 2000, 0)
+
+    first = next(chunks)
+    assert sum(reads) == len(first.raw_data) < len(wav_bytes(60)) / 20
+
+
+def test_unsupported_inputs_are_rejected_before_decoding():
+    with pytest.raises(ValueError, match="Unsupported audio input type"):
+        iter_audio_chunks(12, 2000, 0)
+    with pytest.raises(ValueError, match="longer than overlap"):
+        iter_audio_chunks(b"", 1000, 1000)
+
+
+@requires_ffmpeg
+def test_compressed_audio_is_decoded_through_ffmpeg():
+    buffer = io.BytesIO()
+    make_audio(5).export(buffer, format="mp3")
+    buffer.seek(0)
+
+    chunks = list(iter_audio_chunks(buffer, 2000, 0))
+
+    assert len(chunks) == 3
+    assert sum(len(chunk) for chunk in chunks) == pytest.approx(5000, abs=100)
+
+
+def test_chunks_are_cut_in_silence():
+    audio = speech_with_pauses(5, -1, 5, -1, 3)
+    policy = SilencePolicy(search_window=4000)
+
+    chunks = list(iter_silence_chunks(audio, 8000, policy))
+
+    assert [(chunk.start, chunk.end) for chunk in chunks] == [(0, 5500), (5500, 11500), (11500, 15000)]
+    assert [len(chunk.audio) for chunk in chunks] == [5500, 6000, 3500]
+
+
+def test_chunks_overlap_only_where_there_is_no_silence():
+    chunks = list(iter_silence_chunks(wav_bytes(10), 4000, SilencePolicy(fallback_overlap=500)))
+
+    assert chunks[0].start == 0
+    assert all(chunk.end - chunk.start <= 4000 for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert previous.end - current.start == 1000
+    assert chunks[-1].end == 10000
+
+
+def test_long_silences_are_trimmed_and_silent_chunks_skipped():
+    audio = speech_with_pauses(2, -5, 2, -8)
+    policy = SilencePolicy(search_window=2000, max_silence=1000)
+
+    chunks = list(iter_silence_chunks(audio, 6000, policy))
+
+    # Silences are cut in their middle and keep half a second on each side of the cut; the chunks of
+    # silence at the end are not uploaded at all.
+    assert [(chunk.start, chunk.end) for chunk in chunks] == [(0, 5000), (5000, 10000)]
+    assert [len(chunk.audio) for chunk in chunks] == [2500, 3000]
+
+
+def test_timestamps_after_trimmed_silences_are_placed_in_the_recording():
+    # Speech, six seconds of silence, then speech with a slightly quieter moment at 8.5 s. There is no
+    # silence near the end of the first chunk, so it is cut at that moment with a fallback overlap.
+    audio = make_audio(2) + AudioSegment.silent(6000, frame_rate=16000) + make_audio(0.5)
+    audio = to_wav(audio + (make_audio(0.1) - 10) + make_audio(5.4))
+    policy = SilencePolicy(search_window=2000, fallback_overlap=1000, max_silence=1000)
+    first, second = iter_silence_chunks(audio, 10000, policy)
+    assert first.gaps == ((2500, 5000),)
+    assert second.start < 8000
+    assert first.end > 8500
+
+    # The first chunk's timestamps are in its trimmed audio, where 8 s in the recording is 3 s in.
+    relative = second.start / 1000
+    backend = WavAudioBackend(api_key="sk-fake")
+    backend.set_silence_policy(policy)
+    client = Mock()
+    client.with_options.return_value = client
+    client.audio.transcriptions.create.side_effect = [
+        verbose_transcription((0.0, 2.0, " alpha beta"), (3.0, 3.5, " gamma"), (3.6, 4.5, " delta")),
+        verbose_transcription(
+            (8.0 - relative, 8.5 - relative, " gamma"),
+            (8.6 - relative, 9.5 - relative, " delta"),
+            (10.0 - relative, 14.0 - relative, " epsilon"),
+        ),
+    ]
+    backend.client = client
+
+    text = backend.voice_to_text(audio, chunk_length=10000, max_concurrency=1)
+
+    assert text == "alpha beta gamma delta epsilon"
+
+
+def test_silence_policy_uploads_less_audio(fake_server):
+    audio = speech_with_pauses(3, -1, 3, -1, 3, -1, 3)
+    backend = WavAudioBackend(api_key="sk-fake", base_url=fake_server.base_url)
+
+    assert backend.voice_to_text(audio, chunk_length=4500, overlap=500)
+    backend.set_silence_policy(SilencePolicy(search_window=2000))
+    assert backend.voice_to_text(audio, chunk_length=4500, overlap=500)
+
+    fixed, silence = (sum(chunk_sizes(texts)) for texts in backend.stitched)
+    assert silence < fixed * 0.85
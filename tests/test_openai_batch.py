@@ -0,0 +1,57 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from openai_backend.openai_batch import build_batch_jsonl
+from openai_backend.openai_text_backend import OpenAITextBackend
+
+from base.fake_openai_server import FakeOpenAIServer, FakeServerSettings
+
+
+@pytest.fixture
+def fake_server():
+    with FakeOpenAIServer(FakeServerSettings(polls_until_complete=2)) as server:
+        yield server
+
+
+@pytest.fixture
+def text_backend(fake_server, monkeypatch):
+    monkeypatch.setenv("OPENAI_BASE_URL", fake_server.base_url)
+    return OpenAITextBackend(api_key="sk-test")
+
+
+def test_build_batch_jsonl():
+    lines = build_batch_jsonl("/v1/embeddings", [{"input": "a"}, {"input": "b"}]).decode().splitlines()
+
+    assert [json.loads(line) for line in lines] == [
+        {"custom_id": "request-0", "method": "POST", "url": "/v1/embeddings", "body": {"input": "a"}},
+        {"custom_id": "request-1", "method": "POST", "url": "/v1/embeddings", "body": {"input": "b"}},
+    ]
+
+
+def test_text_chat_batch(text_backend, fake_server):
+    messages_list = [[{"role": "user", "content": f"question {i}"}] for i in range(3)] + [
+        [{"role": "user", "content": "fail"}]
+    ]
+
+    results = text_backend.text_chat_batch(messages_list, [{}, {"model": "gpt-7"}, {}, {}], poll_interval=0)
+
+    assert [result.value for result in results[:3]] == ["echo: question 0", "echo: question 1", "echo: question 2"]
+    assert not results[3].ok
+    assert "Invalid request" in str(results[3].error)
+
+    input_file = next(f for f in fake_server.state.files.values() if f["purpose"] == "batch")
+    bodies = [json.loads(line)["body"] for line in input_file["content"].decode().splitlines()]
+    assert bodies[0] == {"messages": messages_list[0], "model": "gpt-4o", "temperature": 0.2}
+    assert bodies[1]["model"] == "gpt-7"
+
+
+def test_generate_embedding_batch(text_backend):
+    results = text_backend.generate_embedding_batch(["a", "bbb"], poll_interval=0)
+
+    assert [result.value for result in results] == [[1.0, 1.0], [3.0, 1.0]]
+
+
+def test_batch_timeout(text_backend):
+    with patch("openai_backend.openai_batch.time.sleep"), pytest.raises(TimeoutError):
+        text_backend.text_chat_batch([["hello"]], poll_interval=0, timeout=0)
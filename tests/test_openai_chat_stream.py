@@ -0,0 +1,134 @@
+from unittest.mock import Mock, patch
+
+import pytest
+from base.metrics import metrics
+from openai.types import CompletionUsage
+from openai.types.chat import ChatCompletionChunk
+from openai_backend.openai_text_backend import OpenAITextBackend
+
+
+def make_chunk(content=None, finish_reason=None, usage=None, *, choices=True):
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": finish_reason}] if choices else [],
+            "usage": usage,
+        }
+    )
+
+
+def make_chunks():
+    usage = CompletionUsage(prompt_tokens=9, completion_tokens=3, total_tokens=12).model_dump()
+    return [
+        make_chunk("Hello"),
+        make_chunk(" there"),
+        make_chunk("!", finish_reason="stop"),
+        make_chunk(usage=usage, choices=False),
+    ]
+
+
+@pytest.fixture
+def text_backend():
+    mock_client = Mock()
+    mock_client.chat.completions.create.return_value = iter(make_chunks())
+    with patch("openai_backend.openai_text_backend.OpenAITextBackend.create_client", return_value=mock_client):
+        yield OpenAITextBackend()
+
+
+def test_text_chat_stream_yields_deltas(text_backend):
+    stream = text_backend.text_chat_stream([{"role": "user", "content": "Hi"}])
+
+    assert list(stream) == ["Hello", " there", "!"]
+    assert stream.content == "Hello there!"
+    assert stream.usage.completion_tokens == 3
+    assert stream.metrics.completion_tokens == 3
+    assert stream.metrics.time_to_first_token is not None
+    assert stream.metrics.time_to_first_token <= stream.metrics.duration
+
+    _, kwargs = text_backend.client.chat.completions.create.call_args
+    assert kwargs["stream"] is True
+    assert kwargs["stream_options"] == {"include_usage": True}
+
+
+def test_text_chat_stream_full_response(text_backend):
+    stream = text_backend.text_chat_stream([{"role": "user", "content": "Hi"}])
+
+    choice = stream.result(response_type="full")
+
+    assert choice.message.content == "Hello there!"
+    assert choice.message.role == "assistant"
+    assert choice.finish_reason == "stop"
+
+
+def test_text_chat_stream_exception(text_backend):
+    text_backend.client.chat.completions.create.side_effect = Exception("API Error")
+
+    assert text_backend.text_chat_stream(["Hello"]) is None
+
+
+@pytest.fixture
+def metrics_hook():
+    hook = Mock()
+    metrics.add_hook(hook)
+    yield hook
+    metrics.remove_hook(hook)
+
+
+def test_text_chat_stream_is_tracked_once_finished(text_backend, metrics_hook):
+    stream = text_backend.text_chat_stream([{"role": "user", "content": "Hi"}])
+    metrics_hook.record.assert_not_called()
+
+    stream.result()
+
+    (record,), _ = metrics_hook.record.call_args
+    assert record.service == "chat_stream"
+    assert record.error is None
+    assert (record.prompt_tokens, record.completion_tokens) == (9, 3)
+    assert record.response_bytes == len("Hello there!")
+    assert record.latency >= stream.metrics.duration
+    stream.close()
+    metrics_hook.record.assert_called_once()
+
+
+def test_failed_text_chat_stream_is_tracked(text_backend, metrics_hook):
+    def failing_chunks():
+        yield make_chunk("Hello")
+        raise ConnectionError
+
+    text_backend.client.chat.completions.create.return_value = failing_chunks()
+    stream = text_backend.text_chat_stream([{"role": "user", "content": "Hi"}])
+
+    # Leaving the loop early leaves the stream open.
+    for _ in stream:
+        break
+    metrics_hook.record.assert_not_called()
+
+    with pytest.raises(ConnectionError):
+        stream.result()
+    (record,), _ = metrics_hook.record.call_args
+    assert record.error == "ConnectionError"
+
+
+@pytest.mark.asyncio
+async def test_atext_chat_stream(text_backend):
+    async def async_chunks():
+        for chunk in make_chunks():
+            yield chunk
+
+    async_client = Mock()
+
+    async def create(**_):
+        return async_chunks()
+
+    async_client.chat.completions.create = create
+    text_backend._async_client = async_client
+
+    stream = await text_backend.atext_chat_stream([{"role": "user", "content": "Hi"}])
+    deltas = [delta async for delta in stream]
+
+    assert deltas == ["Hello", " there", "!"]
+    assert await stream.result() == "Hello there!"
+    assert stream.metrics.tokens_per_second is not None
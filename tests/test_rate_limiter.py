@@ -0,0 +1,152 @@
+import threading
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+from base.rate_limiter import RateLimiter, RateLimiterRegistry, TokenBucket, rate_limiters
+from openai_backend.openai_image_backend import OpenAIImageBackend
+from openai_backend.openai_text_backend import OpenAITextBackend
+
+
+def test_token_bucket_allows_burst_then_waits():
+    bucket = TokenBucket(capacity=2, refill_per_second=1)
+    now = bucket._updated_at
+
+    assert bucket.reserve(1, now) == 0
+    assert bucket.reserve(1, now) == 0
+    assert bucket.reserve(1, now) == pytest.approx(1.0)
+    # Later callers queue behind earlier reservations.
+    assert bucket.reserve(1, now) == pytest.approx(2.0)
+
+
+def test_token_bucket_refills_over_time():
+    bucket = TokenBucket(capacity=2, refill_per_second=1)
+    now = bucket._updated_at
+    bucket.reserve(2, now)
+
+    assert bucket.reserve(1, now + 1) == 0
+    assert bucket.reserve(1, now + 1) == pytest.approx(1.0)
+
+
+def test_token_bucket_caps_oversized_reservation():
+    bucket = TokenBucket(capacity=10, refill_per_second=10)
+    now = bucket._updated_at
+
+    assert bucket.reserve(50, now) == 0
+    assert bucket.reserve(10, now) == pytest.approx(1.0)
+
+
+def test_rate_limiter_sleeps_when_requests_exhausted():
+    limiter = RateLimiter(requests_per_minute=60)
+    limiter._requests._balance = 0
+
+    with patch("base.rate_limiter.time.sleep") as sleep:
+        limiter.acquire()
+
+    sleep.assert_called_once()
+    assert sleep.call_args.args[0] == pytest.approx(1.0, abs=0.01)
+
+
+def test_rate_limiter_reconcile_refunds_overestimate():
+    limiter = RateLimiter(tokens_per_minute=600)
+    limiter.acquire(600)
+
+    limiter.reconcile(600, 100)
+
+    assert limiter._tokens._balance == pytest.approx(500, abs=1)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_aacquire_waits_without_blocking():
+    limiter = RateLimiter(requests_per_minute=600)
+    limiter._requests._balance = 0
+
+    # The clock is frozen so a pause before the reservation, such as a garbage collection, refills nothing.
+    now = limiter._requests._updated_at
+    with patch("base.rate_limiter.asyncio.sleep") as sleep, patch("base.rate_limiter.time.monotonic", return_value=now):
+        await limiter.aacquire()
+
+    assert sleep.call_args.args[0] == pytest.approx(0.1, abs=0.01)
+
+
+def test_registry_is_keyed_by_api_key_and_model():
+    registry = RateLimiterRegistry()
+    limiter = registry.configure("sk-a", "gpt-4o", requests_per_minute=10)
+
+    assert registry.get("sk-a", "gpt-4o") is limiter
+    assert registry.get("sk-b", "gpt-4o") is None
+    assert registry.get("sk-a", "gpt-4o-mini") is None
+
+    registry.remove("sk-a", "gpt-4o")
+    assert registry.get("sk-a", "gpt-4o") is None
+
+
+def test_concurrent_acquire_respects_capacity():
+    limiter = RateLimiter(requests_per_minute=10)
+    delays = []
+    lock = threading.Lock()
+
+    def acquire():
+        delay = limiter._reserve(0)
+        with lock:
+            delays.append(delay)
+
+    threads = [threading.Thread(target=acquire) for _ in range(15)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(delay > 0 for delay in delays) == 5
+
+
+@pytest.fixture
+def shared_limits():
+    yield
+    rate_limiters.remove("sk-shared", "gpt-4o")
+    rate_limiters.remove("sk-shared", "dall-e-3")
+
+
+@pytest.mark.usefixtures("shared_limits")
+def test_backends_share_limits_per_api_key():
+    with patch("openai_backend.openai_text_backend.OpenAITextBackend.create_client"):
+        first = OpenAITextBackend(api_key="sk-shared")
+        second = OpenAITextBackend(api_key="sk-shared")
+
+    limiter = first.set_rate_limit("gpt-4o", requests_per_minute=100)
+
+    assert second.rate_limiter("gpt-4o") is limiter
+
+
+@pytest.mark.usefixtures("shared_limits")
+def test_text_chat_acquires_and_reconciles():
+    client = Mock()
+    client.chat.completions.create.return_value = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="hi"))], usage=SimpleNamespace(total_tokens=7)
+    )
+    with patch("openai_backend.openai_text_backend.OpenAITextBackend.create_client", return_value=client):
+        backend = OpenAITextBackend(api_key="sk-shared")
+    limiter = backend.set_rate_limit("gpt-4o", requests_per_minute=100, tokens_per_minute=1000)
+
+    with (
+        patch.object(limiter, "acquire", wraps=limiter.acquire) as acquire,
+        patch.object(limiter, "reconcile", wraps=limiter.reconcile) as reconcile,
+    ):
+        assert backend.text_chat([{"role": "user", "content": "x" * 40}], max_tokens=50) == "hi"
+
+    estimated = acquire.call_args.args[0]
+    # 3 framing + 2 role + 11 content tokens for the message, 3 priming the reply, then the completion budget.
+    assert estimated == 3 + 2 + 11 + 3 + 50
+    reconcile.assert_called_once_with(estimated, 7)
+
+
+@pytest.mark.usefixtures("shared_limits")
+def test_image_generation_counts_requests():
+    client = Mock()
+    with patch("openai_backend.openai_image_backend.OpenAIImageBackend.create_client", return_value=client):
+        backend = OpenAIImageBackend(api_key="sk-shared")
+    limiter = backend.set_rate_limit("dall-e-3", requests_per_minute=5)
+
+    backend.generate_image("a cat")
+
+    assert limiter._requests._balance == pytest.approx(4, abs=0.01)
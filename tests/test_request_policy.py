@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import httpx
+import openai
+import pytest
+from base.request_policy import LatencyTracker, RequestPolicy, is_retryable, last_request_stats
+from openai_backend.openai_text_backend import OpenAITextBackend
+
+
+def status_error(status_code):
+    response = httpx.Response(status_code, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+    return openai.APIStatusError("error", response=response, body=None)
+
+
+def test_is_retryable():
+    assert is_retryable(TimeoutError())
+    assert is_retryable(status_error(429))
+    assert is_retryable(status_error(503))
+    assert not is_retryable(status_error(400))
+    assert not is_retryable(ValueError())
+
+
+def test_backoff_is_capped_and_jittered():
+    policy = RequestPolicy(initial_backoff=1, max_backoff=4)
+
+    delays = [policy.backoff(10) for _ in range(200)]
+
+    assert all(0 <= delay <= 4 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(window=100)
+    for value in range(1, 101):
+        tracker.record(value / 100)
+
+    assert tracker.percentile(50) == pytest.approx(0.51)
+    assert tracker.percentile(100) == pytest.approx(1.0)
+
+
+def fast_policy(**kwargs):
+    policy = RequestPolicy(**kwargs)
+    policy.backoff = lambda _attempt: 0
+    return policy
+
+
+def test_call_retries_retryable_errors():
+    request = Mock(side_effect=[TimeoutError(), status_error(500), "ok"])
+
+    assert fast_policy(max_attempts=3).call(request) == "ok"
+    assert last_request_stats().attempts == 3
+
+
+def test_call_does_not_retry_other_errors():
+    request = Mock(side_effect=[ValueError("bad"), "ok"])
+
+    with pytest.raises(ValueError, match="bad"):
+        fast_policy(max_attempts=3).call(request)
+    assert request.call_count == 1
+
+
+def test_call_raises_last_error_when_attempts_run_out():
+    request = Mock(side_effect=[TimeoutError(), TimeoutError("last")])
+
+    with pytest.raises(TimeoutError, match="last"):
+        fast_policy(max_attempts=2).call(request)
+
+
+def test_call_passes_attempt_timeout():
+    request = Mock(return_value="ok")
+
+    RequestPolicy(attempt_timeout=2.5).call(request)
+
+    request.assert_called_once_with(2.5)
+
+
+def test_call_hedges_slow_attempt():
+    policy = RequestPolicy(hedge_percentile=50, hedge_min_samples=1)
+    policy.latencies.record(0.01)
+    calls = []
+    lock = threading.Lock()
+
+    def request(_timeout):
+        with lock:
+            calls.append(len(calls))
+            first = len(calls) == 1
+        if first:
+            time.sleep(0.5)
+            return "slow"
+        return "fast"
+
+    assert policy.call(request) == "fast"
+    stats = last_request_stats()
+    assert stats.hedges == 1
+    assert stats.elapsed < 0.5
+
+
+@pytest.mark.asyncio
+async def test_acall_retries_and_hedges():
+    policy = fast_policy(max_attempts=2, hedge_percentile=50, hedge_min_samples=1)
+    policy.latencies.record(0.01)
+    outcomes = iter([TimeoutError(), "slow", "fast"])
+
+    async def request(_timeout):
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        if outcome == "slow":
+            await asyncio.sleep(1)
+        return outcome
+
+    assert await policy.acall(request) == "fast"
+    stats = last_request_stats()
+    assert stats.attempts == 2
+    assert stats.hedges == 1
+
+
+@pytest.mark.asyncio
+async def test_acall_enforces_attempt_timeout():
+    policy = fast_policy(max_attempts=2, attempt_timeout=0.05)
+    outcomes = iter(["hang", "ok"])
+
+    async def request(_timeout):
+        if next(outcomes) == "hang":
+            await asyncio.sleep(1)
+        return "ok"
+
+    assert await policy.acall(request) == "ok"
+    assert last_request_stats().attempts == 2
+
+
+def test_text_chat_retries_with_policy():
+    client = Mock()
+    client.with_options.return_value = client
+    client.chat.completions.create.side_effect = [
+        status_error(429),
+        SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="hi"))], usage=None),
+    ]
+    with patch("openai_backend.openai_text_backend.OpenAITextBackend.create_client", return_value=client):
+        backend = OpenAITextBackend()
+    backend.set_request_policy(fast_policy(max_attempts=2, attempt_timeout=10))
+
+    assert backend.text_chat([{"role": "user", "content": "Hello"}]) == "hi"
+    client.with_options.assert_called_once_with(max_retries=0)
+    assert client.chat.completions.create.call_args.kwargs["timeout"] == 10
+    assert backend.last_request_stats.attempts == 2
@@ -0,0 +1,106 @@
+from unittest.mock import Mock, patch
+
+import pytest
+from base.response_cache import ResponseCache, request_key
+from openai.types.chat import ChatCompletion
+from openai_backend.openai_text_backend import OpenAITextBackend
+
+
+def test_request_key_is_order_independent():
+    messages = [{"role": "user", "content": "Hi"}]
+
+    assert request_key(messages, {"model": "a", "temperature": 0}) == request_key(
+        messages, {"temperature": 0, "model": "a"}
+    )
+    assert request_key(messages, {"model": "a"}) != request_key(messages, {"model": "b"})
+
+
+def test_lru_eviction_and_counters():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == {"hits": 3, "misses": 1, "evictions": 1, "expirations": 0, "size": 2}
+
+
+def test_ttl_expiry():
+    cache = ResponseCache(ttl=10)
+    with patch("base.response_cache.time.time", return_value=100.0):
+        cache.set("a", 1)
+    with patch("base.response_cache.time.time", return_value=105.0):
+        assert cache.get("a") == 1
+    with patch("base.response_cache.time.time", return_value=111.0):
+        assert cache.get("a") is None
+
+    assert cache.stats()["expirations"] == 1
+
+
+def test_persistent_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    cache = ResponseCache(path=path)
+    cache.set("a", {"content": "cached"})
+    cache.close()
+
+    reopened = ResponseCache(path=path)
+    assert reopened.get("a") == {"content": "cached"}
+    assert reopened.stats()["size"] == 1
+    reopened.close()
+
+
+def make_completion(content="Cached answer"):
+    return ChatCompletion.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        }
+    )
+
+
+@pytest.fixture
+def text_backend():
+    mock_client = Mock()
+    mock_client.chat.completions.create.return_value = make_completion()
+    with patch("openai_backend.openai_text_backend.OpenAITextBackend.create_client", return_value=mock_client):
+        backend = OpenAITextBackend()
+        backend.set_cache(ResponseCache())
+        yield backend
+
+
+def test_text_chat_uses_cache_for_deterministic_requests(text_backend):
+    messages = [{"role": "user", "content": "Hi"}]
+
+    first = text_backend.text_chat(messages, temperature=0)
+    second = text_backend.text_chat(messages, temperature=0, response_type="full")
+
+    assert first == "Cached answer"
+    assert second.message.content == "Cached answer"
+    assert text_backend.client.chat.completions.create.call_count == 1
+    assert text_backend.response_cache.stats()["hits"] == 1
+
+
+def test_text_chat_skips_cache_when_sampling(text_backend):
+    messages = [{"role": "user", "content": "Hi"}]
+
+    text_backend.text_chat(messages)
+    text_backend.text_chat(messages)
+
+    assert text_backend.client.chat.completions.create.call_count == 2
+    assert text_backend.response_cache.stats()["misses"] == 0
+
+
+def test_text_chat_forced_cache(text_backend):
+    text_backend.set_cache(text_backend.response_cache, force=True)
+    messages = [{"role": "user", "content": "Hi"}]
+
+    text_backend.text_chat(messages)
+    text_backend.text_chat(messages)
+
+    assert text_backend.client.chat.completions.create.call_count == 1
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from ai_backend import AsyncTextAI, TextAI
+from base.fake_openai_server import FakeOpenAIServer, FakeServerSettings, Latency
+from base.single_flight import SingleFlight, SingleFlightStats
+
+
+def wait_for_calls(single_flight, calls):
+    deadline = time.monotonic() + 5
+    while single_flight.stats.calls < calls and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_concurrent_identical_calls_share_one_result():
+    single_flight = SingleFlight()
+    release = threading.Event()
+    runs = []
+
+    def call():
+        runs.append(1)
+        release.wait()
+        return object()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(single_flight.do, "key", call) for _ in range(8)]
+        wait_for_calls(single_flight, 8)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(runs) == 1
+    assert all(result is results[0] for result in results)
+    assert single_flight.stats == SingleFlightStats(calls=8, coalesced=7)
+
+
+def test_errors_are_shared_and_keys_forgotten():
+    single_flight = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait()
+        error_message = "upstream failed"
+        raise RuntimeError(error_message)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(single_flight.do, "key", fail) for _ in range(3)]
+        wait_for_calls(single_flight, 3)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError, match="upstream failed"):
+                future.result()
+
+    assert single_flight.do("key", lambda: "fresh") == "fresh"
+    assert single_flight.do("other", lambda: "other") == "other"
+    assert single_flight.stats.coalesced == 2
+
+
+@pytest.mark.asyncio
+async def test_async_calls_share_one_task():
+    single_flight = SingleFlight()
+    runs = []
+
+    async def call():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    callers = [asyncio.ensure_future(single_flight.ado("key", call)) for _ in range(5)]
+    await asyncio.sleep(0)
+    callers[0].cancel()
+    results = await asyncio.gather(*callers[1:])
+
+    assert results == ["result"] * 4
+    assert len(runs) == 1
+    assert single_flight.stats == SingleFlightStats(calls=5, coalesced=4)
+    assert await single_flight.ado("key", call) == "result"
+    assert len(runs) == 2
+
+
+@pytest.fixture
+def slow_server():
+    with FakeOpenAIServer(FakeServerSettings(latency=Latency(median=0.3))) as server:
+        yield server
+
+
+def chat_requests(server):
+    return [path for _, path, _ in server.state.requests if path == "/v1/chat/completions"]
+
+
+def test_text_chat_coalesces_threads(slow_server):
+    text_ai = TextAI(api_key="sk-fake", base_url=slow_server.base_url)
+    single_flight = SingleFlight()
+    text_ai.set_single_flight(single_flight)
+    messages = [{"role": "user", "content": "Popular question"}]
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = list(executor.map(lambda _: text_ai.text_chat(messages), range(6)))
+
+    assert results == ["echo: Popular question"] * 6
+    assert len(chat_requests(slow_server)) == 1
+    assert single_flight.stats.coalesced == 5
+    assert text_ai.text_chat(messages, temperature=0.9) == "echo: Popular question"
+    assert len(chat_requests(slow_server)) == 2
+
+
+@pytest.mark.asyncio
+async def test_async_embeddings_coalesce(slow_server):
+    text_ai = AsyncTextAI(api_key="sk-fake", base_url=slow_server.base_url)
+    text_ai.backend.set_single_flight(SingleFlight())
+
+    results = await asyncio.gather(*(text_ai.generate_embedding("same text") for _ in range(4)))
+
+    assert results == [[9.0, 1.0]] * 4
+    assert [path for _, path, _ in slow_server.state.requests] == ["/v1/embeddings"]
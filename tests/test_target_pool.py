@@ -0,0 +1,189 @@
+import asyncio
+import time
+
+import httpx
+import openai
+import pytest
+from ai_backend import AsyncTextAI, TextAI
+from base.fake_openai_server import FakeOpenAIServer
+from base.request_policy import RequestPolicy
+from base.target_pool import PooledClient, Target, TargetPool, is_target_failure
+
+MESSAGES = [{"role": "user", "content": "Hello there"}]
+
+
+def status_error(status_code):
+    request = httpx.Request("POST", "https://api.example.com/v1/chat/completions")
+    response = httpx.Response(status_code, request=request)
+    return openai.APIStatusError("failed", response=response, body=None)
+
+
+@pytest.fixture
+def servers():
+    with FakeOpenAIServer() as first, FakeOpenAIServer() as second:
+        yield first, second
+
+
+def test_target_failures():
+    assert is_target_failure(status_error(429))
+    assert is_target_failure(status_error(503))
+    assert is_target_failure(TimeoutError())
+    assert not is_target_failure(status_error(400))
+    assert not is_target_failure(ValueError())
+
+
+def test_least_outstanding_target_is_chosen():
+    pool = TargetPool([("sk-a", "http://a"), ("sk-b", "http://b"), ("sk-c", "http://c")])
+
+    busy = [pool.acquire(), pool.acquire(), pool.acquire()]
+    assert len(set(busy)) == 3
+
+    pool.release(busy[1])
+    assert pool.acquire() == busy[1]
+    assert [stats.outstanding for stats in pool.stats().values()] == [1, 1, 1]
+
+
+def test_failed_target_is_ejected_then_probed():
+    pool = TargetPool([Target("sk-a", name="a"), Target("sk-b", name="b")], ejection_time=0.05)
+    a, b = pool.targets
+
+    pool.release(pool.acquire([b]), status_error(500))
+    assert pool.stats()["a"].ejections == 1
+    assert pool.stats()["a"].ejected_for > 0
+    assert [pool.acquire() for _ in range(3)] == [b, b, b]
+
+    time.sleep(0.06)
+    probe = pool.acquire()
+    assert probe == a
+    # Only one probe at a time while the ejected target has not proven itself.
+    assert pool.acquire() == b
+
+    pool.release(probe)
+    assert pool.stats()["a"].ejected_for == 0
+    assert pool.acquire() == a
+
+
+def test_ejections_back_off_and_fail_open():
+    pool = TargetPool([Target("sk-a", name="a")], ejection_time=0.05, max_ejection_time=0.08)
+    (a,) = pool.targets
+
+    pool.release(pool.acquire(), status_error(429))
+    # With every target ejected, the one due back first is still used.
+    assert pool.acquire() == a
+    pool.release(a, status_error(429))
+    assert 0.05 < pool.stats()["a"].ejected_for <= 0.08
+
+    with pytest.raises(LookupError):
+        pool.acquire([a])
+    with pytest.raises(ValueError, match="at least one target"):
+        TargetPool([])
+
+
+def test_cancelled_calls_do_not_clear_an_ejection():
+    pool = TargetPool([Target("sk-a", name="a")], ejection_time=30)
+    pool.release(pool.acquire(), status_error(503))
+
+    class HangingClient:
+        async def create(self):
+            await asyncio.sleep(10)
+
+    client = PooledClient(pool, lambda _: HangingClient(), is_async=True)
+
+    async def cancel_call():
+        # With every target ejected the call still goes out, and is abandoned before it is answered.
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.create(), 0.01)
+
+    asyncio.run(cancel_call())
+    stats = pool.stats()["a"]
+    assert stats.outstanding == 0
+    assert stats.ejected_for > 0
+
+
+def test_requests_are_spread_across_targets(servers):
+    text_ai = TextAI(api_key="sk-unused")
+    pool = text_ai.set_targets([(f"sk-{i}", server.base_url) for i, server in enumerate(servers)])
+
+    for _ in range(4):
+        assert text_ai.text_chat(MESSAGES) == "echo: Hello there"
+
+    assert [len(server.state.requests) for server in servers] == [2, 2]
+    assert [stats.requests for stats in text_ai.target_stats().values()] == [2, 2]
+    assert all(stats.outstanding == 0 for stats in pool.stats().values())
+    assert servers[1].state.requests[0][2] == "Bearer sk-1"
+
+
+def test_failing_target_fails_over_and_is_ejected(servers):
+    first, second = servers
+    text_ai = TextAI(api_key="sk-unused")
+    text_ai.set_targets(
+        TargetPool([Target("sk-0", first.base_url, "first"), Target("sk-1", second.base_url, "second")])
+    )
+    first.state.fail_next(500, count=5)
+
+    for _ in range(3):
+        assert text_ai.text_chat(MESSAGES) == "echo: Hello there"
+
+    stats = text_ai.target_stats()
+    # The first target failed once, without retries of its own, and then sat out its ejection.
+    assert len(first.state.requests) == 1
+    assert len(second.state.requests) == 3
+    assert stats["first"].failures == 1
+    assert stats["first"].ejected_for > 0
+
+
+def test_async_calls_use_the_pool(servers):
+    text_ai = AsyncTextAI(api_key="sk-unused")
+    text_ai.backend.set_targets([(f"sk-{i}", server.base_url) for i, server in enumerate(servers)])
+    servers[0].state.fail_next(429)
+
+    async def chat_concurrently():
+        return await asyncio.gather(*(text_ai.text_chat(MESSAGES) for _ in range(4)))
+
+    assert asyncio.run(chat_concurrently()) == ["echo: Hello there"] * 4
+    stats = list(text_ai.backend.target_stats().values())
+    assert stats[0].ejections == 1
+    assert sum(target.requests for target in stats) == 5
+
+
+def test_a_target_that_hangs_past_the_attempt_timeout_is_ejected():
+    pool = TargetPool([Target("sk-a", name="a")], ejection_time=30)
+
+    class HangingClient:
+        async def create(self):
+            await asyncio.sleep(10)
+
+    client = PooledClient(pool, lambda _: HangingClient(), is_async=True)
+    policy = RequestPolicy(max_attempts=1, attempt_timeout=0.01)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(policy.acall(lambda _timeout: client.create()))
+    stats = pool.stats()["a"]
+    assert stats.outstanding == 0
+    assert stats.failures == 1
+    assert stats.ejected_for > 0
+
+
+def test_a_batch_stays_on_one_target(servers):
+    text_ai = TextAI(api_key="sk-unused")
+    text_ai.set_targets([(f"sk-{i}", server.base_url) for i, server in enumerate(servers)])
+    # Let the other target take the first call, so each step of the batch would alternate without pinning.
+    assert text_ai.text_chat(MESSAGES) == "echo: Hello there"
+
+    results = text_ai.backend.text_chat_batch([MESSAGES, MESSAGES], poll_interval=0)
+
+    assert [result.value for result in results] == ["echo: Hello there"] * 2
+    # One target served only the chat; every step of the batch went to the other.
+    paths = sorted(([path for _, path, _ in server.state.requests] for server in servers), key=len)
+    assert paths[0] == ["/v1/chat/completions"]
+    assert all(stats.outstanding == 0 for stats in text_ai.target_stats().values())
+
+
+def test_clearing_targets_restores_the_backend_client(servers):
+    text_ai = TextAI(api_key="sk-own", base_url=servers[0].base_url)
+    text_ai.set_targets([("sk-1", servers[1].base_url)])
+    assert text_ai.set_targets(None) is None
+
+    assert text_ai.text_chat(MESSAGES) == "echo: Hello there"
+    assert text_ai.target_stats() == {}
+    assert servers[0].state.requests[0][2] == "Bearer sk-own"
@@ -0,0 +1,187 @@
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+from base.token_counter import (
+    REPLY_PRIMING_TOKENS,
+    TRUNCATION_MARKER,
+    ModelLimits,
+    TokenCounter,
+    TrimPolicy,
+    model_limits,
+)
+from openai_backend.openai_text_backend import OpenAITextBackend
+
+
+def message(role, content, **extra):
+    return {"role": role, "content": content, **extra}
+
+
+def conversation(turns):
+    messages = [message("system", "You are a helpful assistant.")]
+    for i in range(turns):
+        messages += [message("user", f"Question number {i} " * 5), message("assistant", f"Answer number {i} " * 5)]
+    return messages
+
+
+def counter_size(messages):
+    return TokenCounter("tiny").count_messages(messages)
+
+
+def test_model_limits():
+    assert model_limits("gpt-4o") == ModelLimits(128000, 16384)
+    assert model_limits("gpt-4o-2024-08-06") == model_limits("gpt-4o")
+    assert model_limits("gpt-4o-mini-2024-07-18") == model_limits("gpt-4o-mini")
+    assert model_limits("gpt-4-0613") == model_limits("gpt-4")
+    assert model_limits("my-fine-tune") is None
+
+
+def test_counts_are_cached_per_message():
+    counter = TokenCounter("gpt-4o")
+    messages = conversation(3)
+    total = counter.count_messages(messages)
+
+    with patch.object(counter, "_count_message", wraps=counter._count_message) as count_message:
+        assert counter.count_messages(messages) == total
+        messages.append(message("user", "One more thing"))
+        counter.count_messages(messages)
+
+    count_message.assert_called_once_with(messages[-1])
+
+
+def test_count_message_parts():
+    counter = TokenCounter("gpt-4o")
+    plain = counter.count_message(message("user", "hello"))
+
+    assert counter.count_message(message("user", "hello", name="alice")) > plain
+    assert counter.count_message(message("user", [{"type": "text", "text": "hello"}])) == plain
+    assert (
+        counter.count_message(
+            message("user", [{"type": "text", "text": "hello"}, {"type": "image_url", "image_url": {"url": "x"}}])
+        )
+        == plain + 85
+    )
+    tool_call = {"id": "1", "type": "function", "function": {"name": "lookup", "arguments": '{"q": "weather"}'}}
+    assert counter.count_message(message("assistant", None, tool_calls=[tool_call])) > counter.count_message(
+        message("assistant", None)
+    )
+    assert counter.count_messages([]) == REPLY_PRIMING_TOKENS
+
+
+def test_truncate_text():
+    counter = TokenCounter("gpt-4o")
+    text = "word " * 1000
+
+    truncated = counter.truncate_text(text, 50)
+
+    assert truncated.endswith(TRUNCATION_MARKER)
+    assert counter.count_text(truncated) <= 50
+    assert counter.truncate_text("short", 50) == "short"
+
+
+def test_trim_drops_oldest_and_keeps_system_pinned_and_last():
+    messages = conversation(6)
+    messages[3]["pinned"] = True
+    counter = TokenCounter("tiny", ModelLimits(context_window=10**6, max_output_tokens=100))
+    full = counter.count_messages([{key: value for key, value in m.items() if key != "pinned"} for m in messages])
+    counter.limits = ModelLimits(context_window=full // 2, max_output_tokens=100)
+
+    trimmed = TrimPolicy().apply(messages, counter)
+
+    assert counter.count_messages(trimmed) <= full // 2
+    assert trimmed[0] == messages[0]
+    assert message("user", "Question number 1 " * 5) in trimmed
+    assert trimmed[-1] == messages[-1]
+    assert message("user", "Question number 0 " * 5) not in trimmed
+    assert all("pinned" not in m for m in trimmed)
+    assert "pinned" in messages[3]
+
+
+def test_trim_drops_tool_results_with_their_call():
+    tool_call = {"id": "1", "type": "function", "function": {"name": "lookup", "arguments": "{}"}}
+    messages = [
+        message("assistant", None, tool_calls=[tool_call]),
+        message("tool", "result " * 50, tool_call_id="1"),
+        message("user", "Thanks"),
+    ]
+    counter = TokenCounter("tiny", ModelLimits(context_window=counter_size(messages[2:]), max_output_tokens=10))
+
+    assert TrimPolicy().apply(messages, counter) == [messages[2]]
+
+
+def test_trim_truncates_tool_outputs():
+    counter = TokenCounter("tiny", ModelLimits(context_window=10**6, max_output_tokens=10))
+    messages = [message("tool", "result " * 500, tool_call_id="1"), message("user", "Summarize")]
+
+    trimmed = TrimPolicy(max_tool_output_tokens=20).apply(messages, counter)
+
+    assert trimmed[0]["content"].endswith(TRUNCATION_MARKER)
+    assert counter.count_text(trimmed[0]["content"]) <= 20
+    assert trimmed[0]["tool_call_id"] == "1"
+    assert messages[0]["content"] == "result " * 500
+
+
+def test_trim_reserves_output_tokens():
+    messages = conversation(2)
+    size = counter_size(messages)
+    counter = TokenCounter("tiny", ModelLimits(context_window=size + 10, max_output_tokens=50))
+
+    assert TrimPolicy().apply(messages, counter, max_output_tokens=10) == messages
+    assert len(TrimPolicy().apply(messages, counter, max_output_tokens=20)) < len(messages)
+    with pytest.raises(ValueError, match="at most 50 tokens"):
+        TrimPolicy().apply(messages, counter, max_output_tokens=51)
+
+
+def test_trim_fails_before_sending_when_nothing_can_be_dropped():
+    messages = [message("system", "rules " * 100), message("user", "question " * 100)]
+    counter = TokenCounter("tiny", ModelLimits(context_window=50, max_output_tokens=10))
+
+    with pytest.raises(ValueError, match="leaves 50 for the prompt"):
+        TrimPolicy().apply(messages, counter)
+    with pytest.raises(ValueError):
+        TrimPolicy(drop_oldest=False).apply(conversation(3), counter)
+
+
+def test_trim_leaves_unknown_models_alone():
+    messages = conversation(50)
+
+    assert TrimPolicy().apply(messages, TokenCounter("my-fine-tune")) == messages
+
+
+def test_text_chat_sends_trimmed_messages():
+    client = Mock()
+    client.chat.completions.create.return_value = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="hi"))], usage=None
+    )
+    with patch("openai_backend.openai_text_backend.OpenAITextBackend.create_client", return_value=client):
+        backend = OpenAITextBackend()
+    backend.token_counter("gpt-4o").limits = ModelLimits(context_window=120, max_output_tokens=50)
+    backend.set_trim_policy(TrimPolicy())
+    messages = conversation(10)
+
+    assert backend.text_chat(messages, max_tokens=20) == "hi"
+    sent = client.chat.completions.create.call_args.kwargs["messages"]
+    assert sent[0] == messages[0]
+    assert sent[-1] == messages[-1]
+    assert backend.count_tokens(sent) <= 100
+
+    client.chat.completions.create.reset_mock()
+    assert backend.text_chat([message("user", "x" * 1000)]) is None
+    client.chat.completions.create.assert_not_called()
+
+
+def test_pinned_marker_is_removed_without_a_trim_policy():
+    client = Mock()
+    client.chat.completions.create.return_value = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="hi"))], usage=None
+    )
+    with patch("openai_backend.openai_text_backend.OpenAITextBackend.create_client", return_value=client):
+        backend = OpenAITextBackend()
+    messages = [message("system", "Be brief.", pinned=True), message("user", "Hello")]
+
+    assert backend.text_chat(messages) == "hi"
+    assert client.chat.completions.create.call_args.kwargs["messages"] == [
+        message("system", "Be brief."),
+        message("user", "Hello"),
+    ]
+    assert messages[0]["pinned"] is True
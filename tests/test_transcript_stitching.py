@@ -0,0 +1,86 @@
+import time
+
+from base.transcript_stitching import ChunkTranscript, TimedText, align_overlap, stitch_chunks
+from openai_backend.openai_audio_backend import OpenAIAudioBackend
+
+from benchmarks.synthetic import make_chunk_transcripts, make_transcript
+
+
+def timed_words(text, start, seconds_per_word=0.5):
+    return [
+        TimedText(start + i * seconds_per_word, start + (i + 1) * seconds_per_word, word)
+        for i, word in enumerate(text.split())
+    ]
+
+
+def test_overlaps_are_cut_at_their_middle_by_time():
+    # Chunk one covers 0-4 s, chunk two 3-7 s; each word takes half a second.
+    first = ChunkTranscript(
+        "one two three four five six seven eight",
+        0.0,
+        4.0,
+        words=timed_words("one two three four five six seven eight", 0),
+    )
+    # The first half of the overlap is taken from the earlier chunk, the second half from the later one.
+    second = ChunkTranscript(
+        "sefen ate nine ten eleven twelve thirteen fourteen",
+        3.0,
+        4.0,
+        words=timed_words("sefen ate nine ten eleven twelve thirteen fourteen", 0),
+    )
+
+    assert (
+        stitch_chunks([first, second])
+        == "one two three four five six seven ate nine ten eleven twelve thirteen fourteen"
+    )
+
+
+def test_segments_are_used_without_word_timestamps():
+    first = ChunkTranscript("a b. c d.", 0.0, 10.0, segments=[TimedText(0, 5, " a b."), TimedText(5, 9.5, " c d.")])
+    second = ChunkTranscript("d. e f.", 8.0, 10.0, segments=[TimedText(0, 1.5, " d."), TimedText(1.5, 9, " e f.")])
+
+    assert stitch_chunks([first, second]) == "a b. c d. e f."
+
+
+def test_text_alignment_tolerates_misheard_words():
+    left = "we reviewed every action item before the next call and audio quality was fine"
+    right = "quality was fine although some speakers overlapped"
+
+    cut = align_overlap(left, right, 40)
+
+    assert cut is not None
+    assert left[: cut[0]] + right[cut[1] :] == left.replace("fine", "fine although some speakers overlapped")
+    assert align_overlap("completely different words here", "nothing in common at all", 100) is None
+
+
+def test_chunks_without_timestamps_are_aligned_on_text():
+    transcripts = make_chunk_transcripts(4, 2000, 300)
+    expected = make_transcript(4 * 2000 + 300)
+
+    stitched = stitch_chunks([ChunkTranscript(text) for text in transcripts])
+
+    # Words cut at the edges of the synthetic chunks may differ; the rest is reproduced once.
+    assert abs(len(stitched) - len(expected)) < 40
+    assert stitched.split()[:300] == expected.split()[:300]
+
+
+def test_backend_text_stitching_keeps_its_contract():
+    backend = OpenAIAudioBackend(api_key="sk-fake")
+    text = make_transcript(3000)
+    stitched_text, current_text = text[:2000], text[1800:]
+
+    index = backend.find_best_overlap(stitched_text, current_text, 400)
+
+    assert 1780 <= index <= 1820
+    assert abs(len(backend.stitch_transcriptions([stitched_text, current_text], 400)) - 3000) < 20
+
+
+def test_stitching_time_grows_linearly():
+    def seconds(chunks):
+        transcripts = [ChunkTranscript(text) for text in make_chunk_transcripts(chunks, 9000, 400)]
+        started_at = time.perf_counter()
+        stitch_chunks(transcripts, 400)
+        return time.perf_counter() - started_at
+
+    # Ten times the transcript should take nowhere near a hundred times as long.
+    assert seconds(60) < 30 * max(seconds(6), 1e-3)
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from base.vector_index import VectorIndex
+
+
+def random_vectors(rows, dimensions=16, seed=0):
+    return np.random.default_rng(seed).standard_normal((rows, dimensions)).astype(np.float32)
+
+
+def brute_force(vectors, queries, k):
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    normalized_queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    return np.argsort(-(normalized_queries @ normalized.T), axis=1)[:, :k]
+
+
+def test_exact_search_matches_brute_force():
+    vectors = random_vectors(500)
+    queries = random_vectors(7, seed=1)
+    index = VectorIndex()
+    index.add(vectors[:200])
+    index.add(vectors[200:])
+
+    scores, ids = index.search(queries, k=5)
+
+    np.testing.assert_array_equal(ids, brute_force(vectors, queries, 5))
+    assert scores.shape == (7, 5)
+    assert np.all(np.diff(scores, axis=1) <= 0)
+    assert np.all(scores <= 1.0 + 1e-6)
+
+
+def test_search_single_embedding_with_custom_ids():
+    index = VectorIndex()
+    index.add([[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]], ids=[10, 20, 30])
+
+    scores, ids = index.search([2.0, 0.1], k=2)
+
+    assert ids.tolist() == [[10, 30]]
+    assert scores[0, 0] == pytest.approx(2.0 / np.sqrt(4.01))
+
+
+def test_search_pads_when_fewer_rows_than_k():
+    index = VectorIndex()
+    index.add([[1.0, 0.0]])
+
+    scores, ids = index.search([[1.0, 0.0]], k=3)
+
+    assert ids.tolist() == [[0, -1, -1]]
+    assert np.isneginf(scores[0, 1:]).all()
+
+
+def test_search_empty_index():
+    scores, ids = VectorIndex().search([[1.0, 0.0], [0.0, 1.0]], k=2)
+
+    assert ids.tolist() == [[-1, -1], [-1, -1]]
+    assert np.isneginf(scores).all()
+
+
+def test_partitioned_search_recall():
+    vectors = random_vectors(4000)
+    queries = vectors[:50] + 0.01 * random_vectors(50, seed=2)
+    index = VectorIndex(ivf_threshold=1000)
+    index.add(vectors)
+
+    _, ids = index.search(queries, k=1, nprobe=8)
+
+    assert index.is_partitioned
+    assert np.mean(ids[:, 0] == np.arange(50)) >= 0.9
+
+
+def test_partitions_cover_rows_added_later():
+    vectors = random_vectors(300)
+    index = VectorIndex(ivf_threshold=None)
+    index.add(vectors[:200])
+    index.build_partitions(n_lists=4)
+    index.add(vectors[200:])
+
+    _, ids = index.search(vectors[250], k=1, nprobe=4)
+
+    assert ids[0, 0] == 250
+
+
+def test_save_and_load_memory_mapped(tmp_path):
+    vectors = random_vectors(300)
+    index = VectorIndex(ivf_threshold=None)
+    index.add(vectors, ids=np.arange(1000, 1300))
+    index.build_partitions(n_lists=8)
+    index.save(str(tmp_path))
+
+    loaded = VectorIndex.load(str(tmp_path))
+
+    assert isinstance(loaded.vectors, np.memmap)
+    assert loaded.is_partitioned
+    np.testing.assert_array_equal(loaded.search(vectors[:3], k=3)[1], index.search(vectors[:3], k=3)[1])
+
+    loaded.add(vectors[:1], ids=[5000])
+    assert len(loaded) == 301
+    assert loaded.search(vectors[0], k=2, exact=True)[1][0].tolist() in ([1000, 5000], [5000, 1000])
+
+
+def test_dimension_mismatch():
+    index = VectorIndex(dimensions=3)
+    with pytest.raises(ValueError):
+        index.add([[1.0, 2.0]])